@@ -6,11 +6,31 @@ Hierarchical settings loading: defaults → config file → environment variable
 Modified: 2025-11-07
 """
 
+import copy
 import os
-import yaml
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, fields, is_dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+
+# Config formats probed next to the requested file, in order of preference.
+# TOML and JSON parse with C-implemented stdlib modules; PyYAML is only
+# imported when we actually fall back to a .yaml file.
+CONFIG_SUFFIXES = (".toml", ".json")
+
+# Environment variables that override file settings:
+# (variable, settings section, field, type)
+ENV_OVERRIDES = (
+    ("GITHUB_TOKEN", "github", "token", str),
+    ("GANGER_CACHE_PATH", "cache", "db_path", str),
+    ("GANGER_CACHE_TTL", "cache", "repos_ttl", int),
+)
+
+# Parsed config files keyed by (path, mtime_ns, size). The TUI and MCP server
+# call Settings.load() more than once per process; an unchanged file is only
+# parsed the first time.
+_PARSE_CACHE: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
 
 
 DEFAULT_FOLDER_DEFINITIONS: List[Dict[str, Any]] = [
@@ -118,128 +138,142 @@ class Settings:
         2. Config file (~/.config/ganger/config.yaml)
         3. Environment variables (override everything)
 
+        A ``config.toml`` or ``config.json`` next to a ``config.*`` file takes
+        precedence over it (see ``_resolve_config_path``).
+
         Args:
             config_path: Optional path to config file
 
         Returns:
             Settings instance
         """
-        settings = cls()
-
         # Load from config file
         if config_path is None:
             config_dir = Path.home() / ".config" / "ganger"
             config_path = config_dir / "config.yaml"
 
-        if config_path.exists():
-            with open(config_path) as f:
-                config_data = yaml.safe_load(f) or {}
-
-            # GitHub settings
-            if "github" in config_data:
-                gh = config_data["github"]
-                settings.github = GitHubSettings(
-                    auth_method=gh.get("auth_method", "auto"),
-                    token=gh.get("token"),
-                    cache_enabled=gh.get("cache_enabled", True),
-                    cache_ttl=gh.get("cache_ttl", 3600),
-                    rate_limit_buffer=gh.get("rate_limit_buffer", 100),
-                )
-
-            # Cache settings
-            if "cache" in config_data:
-                cache = config_data["cache"]
-                settings.cache = CacheSettings(
-                    db_path=cache.get("db_path", "~/.cache/ganger/ganger.db"),
-                    repos_ttl=cache.get("repos_ttl", 3600),
-                    metadata_ttl=cache.get("metadata_ttl", 86400),
-                    readme_ttl=cache.get("readme_ttl", 604800),
-                    load_on_startup=cache.get("load_on_startup", False),
-                )
-
-            # Folder settings
-            if "folders" in config_data:
-                folders = config_data["folders"]
-                settings.folders = FolderSettings(
-                    default_folders=folders.get(
-                        "default_folders",
-                        [folder.copy() for folder in DEFAULT_FOLDER_DEFINITIONS],
-                    )
-                )
-
-            # Behavior settings
-            if "behavior" in config_data:
-                behavior = config_data["behavior"]
-                settings.behavior = BehaviorSettings(
-                    confirm_unstar=behavior.get("confirm_unstar", True),
-                    auto_refresh=behavior.get("auto_refresh", False),
-                    sort_order=behavior.get("sort_order", "stars"),
-                    auto_categorize=behavior.get("auto_categorize", True),
-                )
-
-            # MCP settings
-            if "mcp" in config_data:
-                mcp = config_data["mcp"]
-                settings.mcp = MCPSettings(
-                    name=mcp.get("name", "ganger"),
-                    enable_session_state=mcp.get("enable_session_state", True),
-                    max_history=mcp.get("max_history", 50),
-                )
-
-        # Override with environment variables
-        github_token = os.getenv("GITHUB_TOKEN")
-        if github_token:
-            settings.github.token = github_token
-
-        cache_path_env = os.getenv("GANGER_CACHE_PATH")
-        if cache_path_env:
-            settings.cache.db_path = cache_path_env
-
-        cache_ttl_env = os.getenv("GANGER_CACHE_TTL")
-        if cache_ttl_env:
-            settings.cache.repos_ttl = int(cache_ttl_env)
+        config_path = _resolve_config_path(config_path)
+        if config_path is not None:
+            settings = _structure(cls, _read_config(config_path))
+        else:
+            settings = cls()
+
+        # Override with environment variables (empty values are ignored)
+        env = os.environ
+        for env_var, section, name, cast in ENV_OVERRIDES:
+            value = env.get(env_var)
+            if value:
+                setattr(getattr(settings, section), name, cast(value))
 
         return settings
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert settings to dictionary."""
-        return {
-            "github": {
-                "auth_method": self.github.auth_method,
-                "cache_enabled": self.github.cache_enabled,
-                "cache_ttl": self.github.cache_ttl,
-                "rate_limit_buffer": self.github.rate_limit_buffer,
-            },
-            "cache": {
-                "db_path": self.cache.db_path,
-                "repos_ttl": self.cache.repos_ttl,
-                "metadata_ttl": self.cache.metadata_ttl,
-                "readme_ttl": self.cache.readme_ttl,
-            },
-            "folders": {"default_folders": self.folders.default_folders},
-            "behavior": {
-                "confirm_unstar": self.behavior.confirm_unstar,
-                "auto_refresh": self.behavior.auto_refresh,
-                "sort_order": self.behavior.sort_order,
-                "auto_categorize": self.behavior.auto_categorize,
-            },
-            "mcp": {
-                "name": self.mcp.name,
-                "enable_session_state": self.mcp.enable_session_state,
-                "max_history": self.mcp.max_history,
-            },
-        }
-
-
+        """Convert settings to dictionary (the GitHub token is left out)."""
+        data = asdict(self)
+        data["github"].pop("token", None)
+        return data
+
+
+@lru_cache(maxsize=None)
+def _field_map(cls: type) -> Dict[str, Optional[type]]:
+    """Map each field of dataclass ``cls`` to its type if that is a dataclass, else None."""
+    return {f.name: (f.type if is_dataclass(f.type) else None) for f in fields(cls)}
+
+
+def _structure(cls: type, data: Dict[str, Any]) -> Any:
+    """Build dataclass ``cls`` from a parsed config mapping.
+
+    Walks ``data`` once: keys that match a field are passed to the
+    constructor (recursing into nested dataclasses), unknown keys and
+    sections are ignored, and missing fields keep the dataclass defaults.
+    """
+    field_map = _field_map(cls)
+    kwargs = {}
+    for key, value in data.items():
+        if key not in field_map:
+            continue
+        nested = field_map[key]
+        if nested is not None:
+            # An empty YAML section parses as None
+            value = _structure(nested, value or {})
+        kwargs[key] = value
+    return cls(**kwargs)
+
+
+def _resolve_config_path(config_path: Path) -> Optional[Path]:
+    """Return the config file to read, or None if there isn't one.
+
+    For the default ``config`` stem, ``config.toml`` and ``config.json``
+    siblings win over the requested path. Any other explicit path (e.g.
+    ``prod.yaml``) is used as-is.
+    """
+    if config_path.stem == "config":
+        for suffix in CONFIG_SUFFIXES:
+            candidate = config_path.with_suffix(suffix)
+            if candidate.is_file():
+                return candidate
+    if config_path.exists():
+        return config_path
+    return None
+
+
+def _parse_config(config_path: Path) -> Dict[str, Any]:
+    """Parse a config file according to its suffix."""
+    suffix = config_path.suffix.lower()
+    if suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:  # Python 3.10
+            import tomli as tomllib
+        return tomllib.loads(config_path.read_bytes().decode("utf-8"))
+    if suffix == ".json":
+        from ganger.utils import fastjson
+
+        return fastjson.loads(config_path.read_bytes()) or {}
+
+    import yaml
+
+    try:
+        loader = yaml.CSafeLoader
+    except AttributeError:  # PyYAML built without libyaml
+        loader = yaml.SafeLoader
+    # Bytes, not a text-mode file: PyYAML decodes UTF-8 itself, so the result
+    # doesn't depend on the locale's default encoding.
+    return yaml.load(config_path.read_bytes(), Loader=loader) or {}
+
+
+def _read_config(config_path: Path) -> Dict[str, Any]:
+    """Parse a config file, reusing the previous parse if the file is unchanged.
+
+    Callers get a deep copy so mutating the loaded settings can't leak into
+    the cached parse.
+    """
+    st = config_path.stat()
+    key = (str(config_path), st.st_mtime_ns, st.st_size)
+    cached = _PARSE_CACHE.get(key)
+    if cached is None:
+        cached = _parse_config(config_path)
+        _PARSE_CACHE[key] = cached
+    return copy.deepcopy(cached)
+
+
+@lru_cache(maxsize=1)
 def get_config_dir() -> Path:
-    """Get configuration directory, creating if needed."""
+    """Get configuration directory, creating if needed.
+
+    Memoized: the directory is resolved and created once per process.
+    """
     config_dir = Path.home() / ".config" / "ganger"
     config_dir.mkdir(parents=True, exist_ok=True)
     return config_dir
 
 
+@lru_cache(maxsize=1)
 def get_cache_dir() -> Path:
-    """Get cache directory, creating if needed."""
+    """Get cache directory, creating if needed.
+
+    Memoized: the directory is resolved and created once per process.
+    """
     cache_dir = Path.home() / ".cache" / "ganger"
     cache_dir.mkdir(parents=True, exist_ok=True)
     return cache_dir
@@ -4,23 +4,55 @@ GitHub authentication with dual support for OAuth and Personal Access Tokens.
 Modified: 2025-11-07
 """
 
-import json
 import logging
 import os
+import sys
 import time
-import webbrowser
+from enum import IntEnum
 from pathlib import Path
-from typing import Optional, Dict, Any, Callable
-from datetime import datetime
-
-import httpx
-from github import Github, GithubException
+from typing import TYPE_CHECKING, Optional, Dict, Any, Callable, Set
 
 from ganger.core.exceptions import AuthenticationError
+from ganger.utils import fastjson
+
+if TYPE_CHECKING:
+    from github import Github
+
+# httpx, webbrowser and PyGithub are imported inside the methods that use
+# them. status/logout never touch OAuth, and PyGithub alone is a few hundred
+# milliseconds of import time.
 
 
 logger = logging.getLogger(__name__)
 
+# Console banners, written in one go rather than line-by-line print() calls
+_RULE = "=" * 60
+_OAUTH_BANNER = (
+    f"\n{_RULE}\nGitHub Authentication Required\n{_RULE}\n"
+    "\n1. Visit: {verification_uri}\n"
+    "2. Enter code: {user_code}\n"
+    "\nWaiting for authorization (expires in {expires_in}s)...\n\n"
+)
+_PAT_BANNER = (
+    f"\n{_RULE}\nGitHub Personal Access Token Required\n{_RULE}\n"
+    "\n1. Visit: https://github.com/settings/tokens/new\n"
+    "2. Create a token with 'repo' and 'user' scopes\n"
+    "3. Enter the token below\n\n"
+)
+
+
+class AuthMethod(IntEnum):
+    """Authentication method selected for GitHubAuth."""
+
+    AUTO = 0
+    OAUTH = 1
+    PAT = 2
+
+    @classmethod
+    def parse(cls, value: str) -> Optional["AuthMethod"]:
+        """Map a config string ("auto", "oauth", "pat") to a member, None if unknown."""
+        return cls.__members__.get(value.upper()) if value else None
+
 
 class GitHubAuth:
     """
@@ -40,6 +72,23 @@ class GitHubAuth:
         "repo",  # Full repo access (needed for private starred repos)
     ]
 
+    # Fields of GET /user that get_user_info() returns
+    USER_INFO_FIELDS = (
+        "login",
+        "name",
+        "email",
+        "bio",
+        "public_repos",
+        "followers",
+        "following",
+        "created_at",
+    )
+
+    # Tokens that already passed _verify_token in this process. The TUI and
+    # CLI construct several GitHubAuth instances; only the first one pays the
+    # GitHub round-trip.
+    _verified_tokens: Set[str] = set()
+
     def __init__(
         self,
         token_file: Optional[Path] = None,
@@ -58,17 +107,40 @@ class GitHubAuth:
             oauth_callback: Optional callback(user_code, verification_url, expires_in)
                            called when OAuth device flow starts, for TUI integration
         """
-        if token_file is None:
-            config_dir = Path.home() / ".config" / "ganger"
-            config_dir.mkdir(parents=True, exist_ok=True)
-            token_file = config_dir / "token.json"
-
-        self.token_file = token_file
-        self.auth_method = auth_method
+        # Resolved lazily by the token_file property; env-token auth never
+        # needs the path at all.
+        self._token_file: Optional[Path] = token_file
+        self.auth_method = auth_method  # also sets self._auth_method
         self.silent = silent
         self.oauth_callback = oauth_callback
         self._token: Optional[str] = token
-        self._github_client: Optional[Github] = None
+        self._github_client: Optional["Github"] = None
+
+    @property
+    def token_file(self) -> Path:
+        """Token file path, defaulting to ~/.config/ganger/token.json.
+
+        The directory is not created here; _save_token creates it on write.
+        """
+        if self._token_file is None:
+            self._token_file = Path.home() / ".config" / "ganger" / "token.json"
+        return self._token_file
+
+    @token_file.setter
+    def token_file(self, value: Path) -> None:
+        self._token_file = value
+
+    @property
+    def auth_method(self) -> str:
+        """Configured authentication method, as passed in."""
+        return self._auth_method_name
+
+    @auth_method.setter
+    def auth_method(self, value: str) -> None:
+        # Unknown names parse to None, which enables neither OAuth nor the
+        # PAT prompt in authenticate().
+        self._auth_method_name = value
+        self._auth_method: Optional[AuthMethod] = AuthMethod.parse(value)
 
     def _log(self, message: str) -> None:
         """Log message, also print if not in silent mode."""
@@ -121,13 +193,14 @@ class GitHubAuth:
                     self.token_file.unlink()  # Remove invalid token
 
         # Try OAuth device flow if client ID is configured
-        if self.OAUTH_CLIENT_ID and self.auth_method in ["auto", "oauth"]:
+        method = self._auth_method
+        if self.OAUTH_CLIENT_ID and (method == AuthMethod.AUTO or method == AuthMethod.OAUTH):
             self._log("Starting OAuth device flow authentication...")
             self._oauth_device_flow()
             return
 
         # Fallback: prompt for PAT (only works in non-silent mode)
-        if self.auth_method in ["auto", "pat"] and not self.silent:
+        if (method == AuthMethod.AUTO or method == AuthMethod.PAT) and not self.silent:
             self._prompt_for_pat()
             return
 
@@ -147,12 +220,20 @@ class GitHubAuth:
         if not self._token:
             return False
 
+        from github import Github, GithubException
+
+        if self._token in GitHubAuth._verified_tokens:
+            if self._github_client is None:
+                self._github_client = Github(self._token)
+            return True
+
         try:
             # Try to get authenticated user
             g = Github(self._token)
             user = g.get_user()
             _ = user.login  # Force API call
             self._github_client = g
+            GitHubAuth._verified_tokens.add(self._token)
             return True
         except GithubException:
             return False
@@ -167,11 +248,10 @@ class GitHubAuth:
             True if token loaded successfully, False otherwise
         """
         try:
-            with open(self.token_file, "r") as f:
-                data = json.load(f)
-                self._token = data.get("access_token")
-                return self._token is not None
-        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            data = fastjson.loads(self.token_file.read_bytes())
+            self._token = data.get("access_token")
+            return self._token is not None
+        except (FileNotFoundError, fastjson.JSONDecodeError, KeyError):
             return False
 
     def _save_token(self, token: str, metadata: Optional[Dict[str, Any]] = None) -> None:
@@ -184,14 +264,13 @@ class GitHubAuth:
         """
         data = {
             "access_token": token,
-            "created_at": datetime.now().isoformat(),
+            "created_at": int(time.time()),  # epoch seconds
         }
         if metadata:
             data.update(metadata)
 
         self.token_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.token_file, "w") as f:
-            json.dump(data, f, indent=2)
+        self.token_file.write_bytes(fastjson.dumps(data, indent=True))
 
         # Set restrictive permissions (owner read/write only)
         self.token_file.chmod(0o600)
@@ -206,112 +285,165 @@ class GitHubAuth:
         3. Poll for authorization
         4. Save access token
 
+        If the calling thread already runs an event loop (e.g. authenticate()
+        invoked from a coroutine), asyncio.run() would refuse to start, so the
+        flow runs on its own loop in a worker thread and this call blocks
+        until it finishes.
+
         Raises:
             AuthenticationError: If OAuth flow fails
         """
-        # Step 1: Request device code
+        import asyncio
+
         try:
-            response = httpx.post(
-                "https://github.com/login/device/code",
-                headers={"Accept": "application/json"},
-                data={
-                    "client_id": self.OAUTH_CLIENT_ID,
-                    "scope": " ".join(self.SCOPES),
-                },
-                timeout=30,
-            )
-            response.raise_for_status()
-            device_data = response.json()
-        except Exception as e:
-            raise AuthenticationError(f"Failed to request device code: {e}")
-
-        # Step 2: Show user code and URL
-        user_code = device_data["user_code"]
-        verification_uri = device_data["verification_uri"]
-        expires_in = device_data["expires_in"]
-        interval = device_data.get("interval", 5)
-
-        # Call the OAuth callback if provided (for TUI integration)
-        if self.oauth_callback:
-            try:
-                self.oauth_callback(user_code, verification_uri, expires_in)
-            except Exception as e:
-                logger.warning(f"OAuth callback failed: {e}")
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self._oauth_device_flow_async())
+            return
 
-        if not self.silent:
-            print("\n" + "=" * 60)
-            print("GitHub Authentication Required")
-            print("=" * 60)
-            print(f"\n1. Visit: {verification_uri}")
-            print(f"2. Enter code: {user_code}")
-            print(f"\nWaiting for authorization (expires in {expires_in}s)...\n")
-        else:
-            logger.info(f"OAuth device flow: Visit {verification_uri} and enter code {user_code}")
+        from concurrent.futures import ThreadPoolExecutor
 
-        # Try to open browser automatically
-        try:
-            webbrowser.open(verification_uri)
-            self._log("✓ Opened browser automatically")
-        except Exception:
-            pass
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ganger-oauth") as pool:
+            pool.submit(asyncio.run, self._oauth_device_flow_async()).result()
 
-        # Step 3: Poll for authorization
-        device_code = device_data["device_code"]
-        start_time = time.time()
+    async def _oauth_device_flow_async(self) -> None:
+        """
+        Async implementation of the OAuth device flow.
 
-        while time.time() - start_time < expires_in:
-            time.sleep(interval)
+        Polling waits with ``asyncio.sleep`` so a caller that owns an event
+        loop can run it alongside other work.
 
+        Raises:
+            AuthenticationError: If OAuth flow fails
+        """
+        import asyncio
+        import httpx
+        import webbrowser
+
+        # One client for the whole flow so every poll reuses the same
+        # keep-alive connection instead of a fresh TCP+TLS handshake.
+        async with httpx.AsyncClient(
+            base_url="https://github.com",
+            headers={"Accept": "application/json"},
+            timeout=30,
+        ) as client:
+            # Step 1: Request device code
             try:
-                token_response = httpx.post(
-                    "https://github.com/login/oauth/access_token",
-                    headers={"Accept": "application/json"},
+                response = await client.post(
+                    "/login/device/code",
                     data={
                         "client_id": self.OAUTH_CLIENT_ID,
-                        "device_code": device_code,
-                        "grant_type": "urn:ietf:params:oauth:grant-type:device_code",
+                        "scope": " ".join(self.SCOPES),
                     },
-                    timeout=30,
                 )
-                token_response.raise_for_status()
-                token_data = token_response.json()
-
-                # Check for errors
-                if "error" in token_data:
-                    error = token_data["error"]
-                    if error == "authorization_pending":
-                        # Still waiting
-                        if not self.silent:
-                            print(".", end="", flush=True)
-                        continue
-                    elif error == "slow_down":
-                        # Increase polling interval
-                        interval += 5
-                        continue
-                    elif error == "expired_token":
-                        raise AuthenticationError("Device code expired")
-                    elif error == "access_denied":
-                        raise AuthenticationError("Authorization denied by user")
-                    else:
-                        raise AuthenticationError(f"OAuth error: {error}")
-
-                # Success!
-                if "access_token" in token_data:
-                    self._token = token_data["access_token"]
-                    self._save_token(self._token, token_data)
-
-                    if self._verify_token():
+                response.raise_for_status()
+                device_data = response.json()
+            except Exception as e:
+                raise AuthenticationError(f"Failed to request device code: {e}")
+
+            # Step 2: Show user code and URL
+            user_code = device_data["user_code"]
+            verification_uri = device_data["verification_uri"]
+            expires_in = device_data["expires_in"]
+            interval = device_data.get("interval", 5)
+
+            # Call the OAuth callback if provided (for TUI integration)
+            if self.oauth_callback:
+                try:
+                    self.oauth_callback(user_code, verification_uri, expires_in)
+                except Exception as e:
+                    logger.warning(f"OAuth callback failed: {e}")
+
+            if not self.silent:
+                sys.stdout.write(
+                    _OAUTH_BANNER.format(
+                        verification_uri=verification_uri,
+                        user_code=user_code,
+                        expires_in=expires_in,
+                    )
+                )
+                sys.stdout.flush()
+            else:
+                logger.info(f"OAuth device flow: Visit {verification_uri} and enter code {user_code}")
+
+            # Try to open browser automatically
+            try:
+                webbrowser.open(verification_uri)
+                self._log("✓ Opened browser automatically")
+            except Exception:
+                pass
+
+            # Step 3: Poll for authorization
+            device_code = device_data["device_code"]
+            start_time = time.time()
+            pending_polls = 0
+
+            while time.time() - start_time < expires_in:
+                await asyncio.sleep(interval)
+
+                try:
+                    token_response = await client.post(
+                        "/login/oauth/access_token",
+                        data={
+                            "client_id": self.OAUTH_CLIENT_ID,
+                            "device_code": device_code,
+                            "grant_type": "urn:ietf:params:oauth:grant-type:device_code",
+                        },
+                    )
+                    token_response.raise_for_status()
+                    token_data = token_response.json()
+
+                    # Check for errors
+                    if "error" in token_data:
+                        error = token_data["error"]
+                        if error == "authorization_pending":
+                            # Still waiting; flush the first dot so the user
+                            # sees progress at once, then every tenth poll
+                            # rather than on each one
+                            pending_polls += 1
+                            if not self.silent:
+                                sys.stdout.write(".")
+                                if pending_polls % 10 == 1:
+                                    sys.stdout.flush()
+                            continue
+                        elif error == "slow_down":
+                            # Increase polling interval
+                            interval += 5
+                            continue
+                        elif error == "expired_token":
+                            raise AuthenticationError("Device code expired")
+                        elif error == "access_denied":
+                            raise AuthenticationError("Authorization denied by user")
+                        else:
+                            raise AuthenticationError(f"OAuth error: {error}")
+
+                    # Success!
+                    if "access_token" in token_data:
+                        self._token = token_data["access_token"]
+                        self._save_token(self._token, token_data)
+
+                        # A freshly exchanged token is good; the login lookup
+                        # for the success message doubles as verification.
+                        from github import Github
+
+                        # Network errors and malformed responses surface as
+                        # more than GithubException; any of them means the
+                        # token could not be verified.
+                        try:
+                            self._github_client = Github(self._token)
+                            login = self._github_client.get_user().login
+                        except Exception:
+                            raise AuthenticationError("Token verification failed")
+                        GitHubAuth._verified_tokens.add(self._token)
+
                         self._log("\n✓ Authentication successful!")
-                        user = self._github_client.get_user()
-                        self._log(f"✓ Logged in as: {user.login}")
+                        self._log(f"✓ Logged in as: {login}")
                         return
-                    else:
-                        raise AuthenticationError("Token verification failed")
 
-            except httpx.HTTPError as e:
-                raise AuthenticationError(f"Failed to poll for token: {e}")
+                except httpx.HTTPError as e:
+                    raise AuthenticationError(f"Failed to poll for token: {e}")
 
-        raise AuthenticationError("Authentication timed out")
+            raise AuthenticationError("Authentication timed out")
 
     def _prompt_for_pat(self) -> None:
         """
@@ -328,12 +460,8 @@ class GitHubAuth:
                 "Set GITHUB_TOKEN environment variable or run 'ganger auth'."
             )
 
-        print("\n" + "=" * 60)
-        print("GitHub Personal Access Token Required")
-        print("=" * 60)
-        print("\n1. Visit: https://github.com/settings/tokens/new")
-        print("2. Create a token with 'repo' and 'user' scopes")
-        print("3. Enter the token below\n")
+        sys.stdout.write(_PAT_BANNER)
+        sys.stdout.flush()
 
         import getpass
 
@@ -351,7 +479,7 @@ class GitHubAuth:
         else:
             raise AuthenticationError("Invalid token")
 
-    def get_github_client(self) -> Github:
+    def get_github_client(self) -> "Github":
         """
         Get authenticated GitHub client (PyGithub).
 
@@ -365,6 +493,8 @@ class GitHubAuth:
             if not self._token:
                 raise AuthenticationError("Not authenticated. Run authenticate() first.")
 
+            from github import Github
+
             self._github_client = Github(self._token)
 
         return self._github_client
@@ -391,6 +521,8 @@ class GitHubAuth:
             self.token_file.unlink()
             self._log(f"✓ Deleted token file: {self.token_file}")
 
+        if self._token:
+            GitHubAuth._verified_tokens.discard(self._token)
         self._token = None
         self._github_client = None
         self._log("✓ Credentials revoked")
@@ -399,22 +531,29 @@ class GitHubAuth:
         """
         Get authenticated user information.
 
+        Fetched with one GET /user and read straight from the JSON, rather
+        than through PyGithub's lazily-populated AuthenticatedUser.
+
         Returns:
             Dictionary with user info (login, name, email, etc.)
 
         Raises:
-            AuthenticationError: If not authenticated
+            AuthenticationError: If not authenticated or the token is rejected
         """
-        client = self.get_github_client()
-        user = client.get_user()
-
-        return {
-            "login": user.login,
-            "name": user.name,
-            "email": user.email,
-            "bio": user.bio,
-            "public_repos": user.public_repos,
-            "followers": user.followers,
-            "following": user.following,
-            "created_at": user.created_at.isoformat() if user.created_at else None,
-        }
+        import httpx
+
+        token = self.get_token()
+        response = httpx.get(
+            "https://api.github.com/user",
+            headers={
+                "Authorization": f"token {token}",
+                "Accept": "application/vnd.github+json",
+            },
+            timeout=30,
+        )
+        if response.status_code == 401:
+            raise AuthenticationError("GitHub rejected the stored token")
+        response.raise_for_status()
+        data = response.json()
+
+        return {key: data.get(key) for key in self.USER_INFO_FIELDS}
@@ -7,15 +7,18 @@ Shared state between TUI and MCP interfaces.
 Modified: 2025-11-07
 """
 
+import asyncio
 import aiosqlite
 import logging
+import operator
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Iterable, AsyncIterator
+from typing import List, Optional, Dict, Any, Iterable, AsyncIterator, Sequence, Set, Tuple, Union
 from datetime import datetime, timedelta
 
 from ganger.core.models import StarredRepo, VirtualFolder, RepoMetadata
 from ganger.core.exceptions import CacheError
+from ganger.utils import fastjson
 
 
 logger = logging.getLogger(__name__)
@@ -47,6 +50,85 @@ class PersistentCache:
     STARRED_SYNC_TOTAL_COUNT_KEY = "starred_sync_total_count"
     STARRED_SYNC_COMPLETE_KEY = "starred_sync_complete"
     STARRED_SYNC_UPDATED_AT_KEY = "starred_sync_updated_at"
+    # Newest starred_at among cached repos as of the last complete sync;
+    # every star at or before it is known to be cached.
+    STARRED_SYNC_LAST_STARRED_AT_KEY = "starred_sync_last_starred_at"
+    # Page order the saved cursor belongs to. A cursor is only valid for the
+    # query that issued it, so one saved under another order (or before the
+    # marker existed) must not be resumed.
+    STARRED_SYNC_ORDER_KEY = "starred_sync_order"
+    STARRED_SYNC_ORDER = "starred_at_desc"
+
+    # get_repo buffers accessed_at stamps and writes them in one batch once
+    # this many are pending (and on close), so reads don't each commit.
+    ACCESS_FLUSH_THRESHOLD = 64
+
+    # StarredRepo.to_dict() keys bound by _upsert_starred_repos, in the
+    # order of its INSERT column list (cached_at/accessed_at follow).
+    _REPO_UPSERT_COLUMNS = (
+        "id", "full_name", "name", "owner", "description", "stars_count",
+        "forks_count", "watchers_count", "language", "topics", "is_archived",
+        "is_private", "is_fork", "created_at", "updated_at", "pushed_at",
+        "starred_at", "url", "clone_url", "homepage", "default_branch", "license",
+    )
+    # Built once: pulls those keys out of a to_dict() result as one tuple in C.
+    _repo_upsert_values = operator.itemgetter(*_REPO_UPSERT_COLUMNS)
+
+    # Hot-path statements, kept as fixed text so the connection's statement
+    # cache (sqlite3 keeps 128 per connection) compiles each one once for
+    # the life of the shared connection.
+    _UPSERT_REPO_SQL = """
+        INSERT INTO starred_repos (
+            id, full_name, name, owner, description, stars_count, forks_count,
+            watchers_count, language, topics, is_archived, is_private, is_fork,
+            created_at, updated_at, pushed_at, starred_at, url, clone_url,
+            homepage, default_branch, license, cached_at, accessed_at
+        ) VALUES (
+            ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+        )
+        ON CONFLICT(id) DO UPDATE SET
+            full_name = excluded.full_name,
+            name = excluded.name,
+            owner = excluded.owner,
+            description = excluded.description,
+            stars_count = excluded.stars_count,
+            forks_count = excluded.forks_count,
+            watchers_count = excluded.watchers_count,
+            language = excluded.language,
+            topics = excluded.topics,
+            is_archived = excluded.is_archived,
+            is_private = excluded.is_private,
+            is_fork = excluded.is_fork,
+            created_at = excluded.created_at,
+            updated_at = excluded.updated_at,
+            pushed_at = excluded.pushed_at,
+            starred_at = excluded.starred_at,
+            url = excluded.url,
+            clone_url = excluded.clone_url,
+            homepage = excluded.homepage,
+            default_branch = excluded.default_branch,
+            license = excluded.license,
+            cached_at = excluded.cached_at,
+            accessed_at = excluded.accessed_at
+    """
+    _SELECT_REPOS_SQL = "SELECT * FROM starred_repos ORDER BY stars_count DESC"
+    # Membership terms per get_all_folder_stats query (SQLite caps compounds at 500)
+    _STATS_UNION_TERMS = 400
+    _SELECT_REPO_SQL = "SELECT * FROM starred_repos WHERE id = ?"
+    _TOUCH_REPO_SQL = "UPDATE starred_repos SET accessed_at = ? WHERE id = ?"
+    _SELECT_METADATA_SQL = "SELECT value FROM metadata WHERE key = ?"
+    _SELECT_METADATA_ROW_SQL = "SELECT * FROM repo_metadata WHERE repo_id = ?"
+    _SELECT_METADATA_ROW_NO_README_SQL = """
+        SELECT repo_id, readme_format, has_issues, open_issues_count,
+               has_wiki, has_projects, has_pages, cached_at
+        FROM repo_metadata WHERE repo_id = ?
+    """
+    # Ids are passed as one JSON array so the text doesn't vary with the
+    # batch size (an IN list of N placeholders is a new statement per N).
+    _SELECT_USER_TAGS_SQL = (
+        "SELECT repo_id, tag FROM user_tags"
+        " WHERE repo_id IN (SELECT value FROM json_each(?)) ORDER BY tag ASC"
+    )
 
     def __init__(self, db_path: Optional[Path] = None, ttl_seconds: int = 3600):
         """
@@ -64,23 +146,82 @@ class PersistentCache:
         self.db_path = db_path
         self.ttl_seconds = ttl_seconds
         self._connection: Optional[aiosqlite.Connection] = None
+        self._lock: Optional[asyncio.Lock] = None
+        # Last sync-completion time seen by this process. Only trusted while
+        # it is still within the TTL; anything else re-reads the metadata
+        # row, since another process sharing the DB may have synced since.
+        self._sync_updated_at: Optional[datetime] = None
+        self._pending_access: Dict[str, str] = {}
+        # Bumped whenever this process creates or deletes a folder, so
+        # callers can tell when something derived from the folder list
+        # (e.g. FolderManager's match index) is out of date.
+        self.folders_version = 0
 
     @asynccontextmanager
-    async def _connect(
-        self,
-        *,
-        row_factory: Optional[type] = None,
-    ) -> AsyncIterator[aiosqlite.Connection]:
-        """Open a database connection with foreign keys enabled."""
-        db = await aiosqlite.connect(self.db_path)
-        try:
-            await db.execute("PRAGMA foreign_keys = ON")
-            if row_factory is not None:
-                db.row_factory = row_factory
-            yield db
-        finally:
+    async def _connect(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow the shared database connection.
+
+        The connection is opened on first use (foreign keys on, rows as
+        ``aiosqlite.Row``) and kept for the life of the cache, so SQLite's
+        page cache and the aiosqlite worker thread survive between calls.
+        Access is serialized with a lock so two coroutines never interleave
+        statements inside one transaction. Anything a caller leaves
+        uncommitted (e.g. after an exception) is rolled back on exit, which
+        matches the old close-per-call behaviour.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._connection is None:
+                db = await aiosqlite.connect(self.db_path)
+                await self._apply_pragmas(db, self.db_path)
+                db.row_factory = aiosqlite.Row
+                self._connection = db
+            db = self._connection
+            try:
+                yield db
+            finally:
+                if db.in_transaction:
+                    await db.rollback()
+
+    @staticmethod
+    async def _apply_pragmas(db: aiosqlite.Connection, db_path: Any) -> None:
+        """Tune a freshly opened connection.
+
+        WAL lets TUI reads proceed while a sync is writing, and
+        ``synchronous=NORMAL`` is durable under WAL except across power loss,
+        which a rebuildable cache can tolerate. In-memory databases have no
+        journal file and no file to map, so only the per-connection settings
+        apply to them.
+        """
+        await db.execute("PRAGMA foreign_keys = ON")
+        await db.execute("PRAGMA temp_store = MEMORY")
+        await db.execute("PRAGMA cache_size = -65536")  # 64 MiB
+        await db.execute("PRAGMA busy_timeout = 5000")
+        if str(db_path) == ":memory:" or str(db_path).startswith("file::memory:"):
+            return
+        await db.execute("PRAGMA journal_mode = WAL")
+        await db.execute("PRAGMA synchronous = NORMAL")
+        await db.execute("PRAGMA mmap_size = 268435456")  # 256 MiB
+
+    async def close(self) -> None:
+        """Close the shared database connection. The cache reopens it on next use.
+
+        Buffered ``accessed_at`` stamps are written first.
+        """
+        if self._connection is not None:
+            if self._pending_access:
+                async with self._connect() as db:
+                    await self._flush_access_times(db)
+            db, self._connection = self._connection, None
             await db.close()
 
+    async def __aenter__(self) -> "PersistentCache":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
     @staticmethod
     async def _get_schema_version(db: aiosqlite.Connection) -> int:
         """Read the stored schema version."""
@@ -280,20 +421,60 @@ class PersistentCache:
         """)
 
     @staticmethod
-    async def _delete_repo_metadata(
-        db: aiosqlite.Connection,
-        repo_ids: Iterable[str],
-    ) -> None:
-        """Delete cached metadata for the specified repo ids."""
-        repo_ids = tuple(repo_ids)
-        if not repo_ids:
-            return
-
-        placeholders = ", ".join("?" for _ in repo_ids)
-        await db.execute(
-            f"DELETE FROM repo_metadata WHERE repo_id IN ({placeholders})",
-            repo_ids,
+    async def _ensure_search_index(db: aiosqlite.Connection) -> None:
+        """Create the FTS5 index over starred_repos and its sync triggers.
+
+        The index is external-content: it stores only the token index and
+        reads column values back from ``starred_repos`` by rowid. Triggers
+        keep it in step with every insert/update/delete. When the virtual
+        table is first created on a DB that already holds repos, a
+        ``rebuild`` populates it from the existing rows.
+        """
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'starred_repos_fts'"
         )
+        exists = await cursor.fetchone() is not None
+
+        await db.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS starred_repos_fts USING fts5(
+                full_name, description, topics,
+                content='starred_repos', content_rowid='rowid'
+            )
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS starred_repos_fts_ai
+            AFTER INSERT ON starred_repos BEGIN
+                INSERT INTO starred_repos_fts (rowid, full_name, description, topics)
+                VALUES (new.rowid, new.full_name, new.description, new.topics);
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS starred_repos_fts_ad
+            AFTER DELETE ON starred_repos BEGIN
+                INSERT INTO starred_repos_fts (starred_repos_fts, rowid, full_name, description, topics)
+                VALUES ('delete', old.rowid, old.full_name, old.description, old.topics);
+            END
+        """)
+        # Sync upserts rewrite every column on every row; only reindex when
+        # a searchable value actually changed.
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS starred_repos_fts_au
+            AFTER UPDATE OF full_name, description, topics ON starred_repos
+            WHEN old.full_name IS NOT new.full_name
+              OR old.description IS NOT new.description
+              OR old.topics IS NOT new.topics
+            BEGIN
+                INSERT INTO starred_repos_fts (starred_repos_fts, rowid, full_name, description, topics)
+                VALUES ('delete', old.rowid, old.full_name, old.description, old.topics);
+                INSERT INTO starred_repos_fts (rowid, full_name, description, topics)
+                VALUES (new.rowid, new.full_name, new.description, new.topics);
+            END
+        """)
+
+        if not exists:
+            await db.execute(
+                "INSERT INTO starred_repos_fts (starred_repos_fts) VALUES ('rebuild')"
+            )
 
     async def initialize(self) -> None:
         """
@@ -401,7 +582,11 @@ class PersistentCache:
             await db.execute("CREATE INDEX IF NOT EXISTS idx_repo_language ON starred_repos(language)")
             await db.execute("CREATE INDEX IF NOT EXISTS idx_repo_updated ON starred_repos(updated_at)")
             await db.execute("CREATE INDEX IF NOT EXISTS idx_repo_stars ON starred_repos(stars_count)")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_repo_cached_at ON starred_repos(cached_at)")
             await db.execute("CREATE INDEX IF NOT EXISTS idx_folder_repo ON folder_repos(folder_id, repo_id)")
+            # Reverse lookup for ON DELETE CASCADE from starred_repos and stub
+            # reparenting; the (folder_id, repo_id) keys can't serve repo_id alone.
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_folder_repos_repo ON folder_repos(repo_id)")
 
             # Metadata table for schema version
             await db.execute("""
@@ -445,6 +630,8 @@ class PersistentCache:
                 "CREATE INDEX IF NOT EXISTS idx_user_tags_tag ON user_tags(tag)"
             )
 
+            await self._ensure_search_index(db)
+
             # Idempotent kind repair — runs every startup. See docstring.
             await self._repair_folder_kinds(db)
 
@@ -456,47 +643,63 @@ class PersistentCache:
             )
 
             await db.commit()
+            # Migrations toggle foreign_keys, and the pragma is a no-op inside
+            # the transaction they run in. Re-assert it now that the
+            # connection outlives this call.
+            await db.execute("PRAGMA foreign_keys = ON")
 
     # ==================== Starred Repos Operations ====================
 
-    async def get_starred_repos(self, force_refresh: bool = False) -> Optional[List[StarredRepo]]:
+    async def get_starred_repos(
+        self, force_refresh: bool = False, include_user_tags: bool = True
+    ) -> Optional[List[StarredRepo]]:
         """
         Get all starred repos from cache.
 
         Args:
             force_refresh: Ignore TTL and force fresh data
+            include_user_tags: Hydrate user_tags (skip for listings that don't
+                show them; repos then carry empty user_tags)
 
         Returns:
             List of StarredRepo objects, or None if cache expired/empty
         """
-        async with self._connect(row_factory=aiosqlite.Row) as db:
+        async with self._connect() as db:
             # Check if cache is expired. Use the sync-completion timestamp as the
             # freshness marker — NOT MAX(cached_at) across rows. Incremental syncs
             # write rows with staggered timestamps, so any single old row would
             # otherwise expire the whole cache. If the metadata key is missing
             # (migrated DB or never-synced state) we trust the cache; the next
             # successful sync will populate the key.
-            if not force_refresh:
+            if not force_refresh and not self._sync_is_fresh():
                 sync_updated_at = await self._get_metadata_value(
                     db,
                     self.STARRED_SYNC_UPDATED_AT_KEY,
                 )
                 if sync_updated_at:
-                    newest_time = datetime.fromisoformat(sync_updated_at)
-                    if datetime.now() - newest_time > timedelta(seconds=self.ttl_seconds):
+                    self._sync_updated_at = datetime.fromisoformat(sync_updated_at)
+                    if not self._sync_is_fresh():
                         return None  # Cache expired
 
-            # Get all repos
-            cursor = await db.execute("SELECT * FROM starred_repos ORDER BY stars_count DESC")
-            rows = await cursor.fetchall()
+            # Get all repos, converting each chunk as it arrives
+            cursor = await db.execute(self._SELECT_REPOS_SQL)
+            repos: List[StarredRepo] = []
+            while rows := await cursor.fetchmany(500):
+                repos.extend(map(StarredRepo.from_row, rows))
 
-            if not rows:
+            if not repos:
                 return None
 
-            repos = [StarredRepo.from_dict(dict(row)) for row in rows]
-            await self._hydrate_user_tags(db, repos)
+            if include_user_tags:
+                await self._hydrate_user_tags(db, repos)
             return repos
 
+    def _sync_is_fresh(self) -> bool:
+        """True if the memoized sync timestamp is within the TTL."""
+        if self._sync_updated_at is None:
+            return False
+        return datetime.now() - self._sync_updated_at <= timedelta(seconds=self.ttl_seconds)
+
     async def set_starred_repos(
         self,
         repos: List[StarredRepo],
@@ -509,15 +712,23 @@ class PersistentCache:
             repos: List of StarredRepo objects to cache
             prune_missing: Remove repos that are not present in this snapshot
         """
-        await self.upsert_starred_repos(repos)
-        if prune_missing:
-            await self.prune_starred_repos(repo.id for repo in repos)
-        await self.set_starred_sync_state(
-            cached_count=len(repos),
-            total_count=len(repos),
-            cursor=None,
-            complete=True,
-        )
+        async with self._connect() as db:
+            # Stub upgrades commit on their own; everything after runs in one
+            # transaction so a snapshot costs a single commit.
+            await self._upgrade_stubs_for_batch(db, repos)
+            await db.execute("BEGIN")
+            await self._upsert_starred_repos(db, repos)
+            if prune_missing:
+                await self._prune_starred_repos(db, (repo.id for repo in repos))
+            updated_at = await self._write_starred_sync_state(
+                db,
+                cached_count=len(repos),
+                total_count=len(repos),
+                cursor=None,
+                complete=True,
+            )
+            await db.commit()
+        self._sync_updated_at = updated_at
 
     async def upsert_starred_repos(self, repos: List[StarredRepo]) -> None:
         """Insert or update a batch of cached starred repos without pruning.
@@ -541,39 +752,40 @@ class PersistentCache:
         ``is_stub=1`` rows are always preserved — they represent imports
         referencing repos the user hasn't actually starred yet, and must
         survive prune until the next sync upgrades them in place. This is
-        why the SELECT and the bulk-delete branch both filter on
-        ``is_stub = 0``.
+        why the stale-id sweep filters on ``is_stub = 0``.
         """
         async with self._connect() as db:
-            keep_repo_ids = tuple(dict.fromkeys(keep_repo_ids))
+            await self._prune_starred_repos(db, keep_repo_ids)
+            await db.commit()
 
-            # Only consider non-stub rows as candidates for deletion.
-            cursor = await db.execute(
-                "SELECT id FROM starred_repos WHERE is_stub = 0"
-            )
-            existing_repo_ids = {row[0] for row in await cursor.fetchall()}
-            stale_repo_ids = existing_repo_ids - set(keep_repo_ids)
+    @staticmethod
+    async def _prune_starred_repos(
+        db: aiosqlite.Connection,
+        keep_repo_ids: Iterable[str],
+    ) -> None:
+        """Delete non-stub repos missing from ``keep_repo_ids`` on an existing connection.
 
-            if stale_repo_ids:
-                await self._delete_repo_metadata(db, stale_repo_ids)
-                placeholders = ", ".join("?" for _ in stale_repo_ids)
-                await db.execute(
-                    f"DELETE FROM starred_repos WHERE id IN ({placeholders})",
-                    tuple(stale_repo_ids),
-                )
-            elif not keep_repo_ids:
-                # Wipe non-stubs only. Stubs and their metadata survive.
-                cursor = await db.execute(
-                    "SELECT id FROM starred_repos WHERE is_stub = 0"
-                )
-                victims = [row[0] for row in await cursor.fetchall()]
-                if victims:
-                    await self._delete_repo_metadata(db, victims)
-                    await db.execute(
-                        "DELETE FROM starred_repos WHERE is_stub = 0"
-                    )
+        The snapshot ids go into a temp table so the sweep is two set-based
+        DELETEs rather than a Python-side diff with one bound parameter per
+        stale id. An empty snapshot wipes every non-stub row.
+        """
+        await db.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS keep_repo_ids (id TEXT PRIMARY KEY)"
+        )
+        await db.execute("DELETE FROM keep_repo_ids")
+        await db.executemany(
+            "INSERT OR IGNORE INTO keep_repo_ids (id) VALUES (?)",
+            ((repo_id,) for repo_id in keep_repo_ids),
+        )
 
-            await db.commit()
+        stale = """
+            SELECT id FROM starred_repos
+             WHERE is_stub = 0
+               AND id NOT IN (SELECT id FROM keep_repo_ids)
+        """
+        await db.execute(f"DELETE FROM repo_metadata WHERE repo_id IN ({stale})")
+        await db.execute(f"DELETE FROM starred_repos WHERE id IN ({stale})")
+        await db.execute("DELETE FROM keep_repo_ids")
 
     @staticmethod
     async def _upgrade_stubs_for_batch(
@@ -735,54 +947,19 @@ class PersistentCache:
         repos: List[StarredRepo],
     ) -> None:
         """Insert or update repo rows on an existing connection."""
+        if not repos:
+            return
+
+        # Positional tuples in column order; cheaper to bind than dicts.
         now = datetime.now().isoformat()
+        values = PersistentCache._repo_upsert_values
         rows = []
         for repo in repos:
             data = repo.to_dict()
-            data["cached_at"] = now
-            data["accessed_at"] = now
-            rows.append(data)
+            data["topics"] = fastjson.dumps(data["topics"]).decode()
+            rows.append(values(data) + (now, now))
 
-        if not rows:
-            return
-
-        await db.executemany("""
-            INSERT INTO starred_repos (
-                id, full_name, name, owner, description, stars_count, forks_count,
-                watchers_count, language, topics, is_archived, is_private, is_fork,
-                created_at, updated_at, pushed_at, starred_at, url, clone_url,
-                homepage, default_branch, license, cached_at, accessed_at
-            ) VALUES (
-                :id, :full_name, :name, :owner, :description, :stars_count, :forks_count,
-                :watchers_count, :language, :topics, :is_archived, :is_private, :is_fork,
-                :created_at, :updated_at, :pushed_at, :starred_at, :url, :clone_url,
-                :homepage, :default_branch, :license, :cached_at, :accessed_at
-            )
-            ON CONFLICT(id) DO UPDATE SET
-                full_name = excluded.full_name,
-                name = excluded.name,
-                owner = excluded.owner,
-                description = excluded.description,
-                stars_count = excluded.stars_count,
-                forks_count = excluded.forks_count,
-                watchers_count = excluded.watchers_count,
-                language = excluded.language,
-                topics = excluded.topics,
-                is_archived = excluded.is_archived,
-                is_private = excluded.is_private,
-                is_fork = excluded.is_fork,
-                created_at = excluded.created_at,
-                updated_at = excluded.updated_at,
-                pushed_at = excluded.pushed_at,
-                starred_at = excluded.starred_at,
-                url = excluded.url,
-                clone_url = excluded.clone_url,
-                homepage = excluded.homepage,
-                default_branch = excluded.default_branch,
-                license = excluded.license,
-                cached_at = excluded.cached_at,
-                accessed_at = excluded.accessed_at
-        """, rows)
+        await db.executemany(PersistentCache._UPSERT_REPO_SQL, rows)
 
     @staticmethod
     async def _get_metadata_value(
@@ -790,7 +967,7 @@ class PersistentCache:
         key: str,
     ) -> Optional[str]:
         """Read a single metadata value using an existing connection."""
-        cursor = await db.execute("SELECT value FROM metadata WHERE key = ?", (key,))
+        cursor = await db.execute(PersistentCache._SELECT_METADATA_SQL, (key,))
         row = await cursor.fetchone()
         if not row:
             return None
@@ -798,16 +975,18 @@ class PersistentCache:
 
     async def get_starred_sync_state(self) -> Dict[str, Any]:
         """Return resumable sync metadata for starred repo collection."""
-        async with self._connect(row_factory=aiosqlite.Row) as db:
+        async with self._connect() as db:
             cursor = await db.execute("""
                 SELECT key, value FROM metadata
-                WHERE key IN (?, ?, ?, ?, ?)
+                WHERE key IN (?, ?, ?, ?, ?, ?, ?)
             """, (
                 self.STARRED_SYNC_CURSOR_KEY,
                 self.STARRED_SYNC_CACHED_COUNT_KEY,
                 self.STARRED_SYNC_TOTAL_COUNT_KEY,
                 self.STARRED_SYNC_COMPLETE_KEY,
                 self.STARRED_SYNC_UPDATED_AT_KEY,
+                self.STARRED_SYNC_LAST_STARRED_AT_KEY,
+                self.STARRED_SYNC_ORDER_KEY,
             ))
             rows = await cursor.fetchall()
 
@@ -819,12 +998,17 @@ class PersistentCache:
             return int(value)
 
         updated_at = values.get(self.STARRED_SYNC_UPDATED_AT_KEY)
+        last_starred_at = values.get(self.STARRED_SYNC_LAST_STARRED_AT_KEY)
         return {
             "cursor": values.get(self.STARRED_SYNC_CURSOR_KEY) or None,
             "cached_count": _to_int(values.get(self.STARRED_SYNC_CACHED_COUNT_KEY)) or 0,
             "total_count": _to_int(values.get(self.STARRED_SYNC_TOTAL_COUNT_KEY)),
             "complete": values.get(self.STARRED_SYNC_COMPLETE_KEY) == "1",
             "updated_at": datetime.fromisoformat(updated_at) if updated_at else None,
+            "last_starred_at": (
+                datetime.fromisoformat(last_starred_at) if last_starred_at else None
+            ),
+            "order": values.get(self.STARRED_SYNC_ORDER_KEY) or None,
         }
 
     async def set_starred_sync_state(
@@ -836,24 +1020,59 @@ class PersistentCache:
         complete: bool,
     ) -> None:
         """Persist resumable sync metadata for starred repo collection."""
-        updated_at = datetime.now().isoformat()
+        async with self._connect() as db:
+            updated_at = await self._write_starred_sync_state(
+                db,
+                cached_count=cached_count,
+                total_count=total_count,
+                cursor=cursor,
+                complete=complete,
+            )
+            await db.commit()
+        self._sync_updated_at = updated_at
+
+    @classmethod
+    async def _write_starred_sync_state(
+        cls,
+        db: aiosqlite.Connection,
+        *,
+        cached_count: int,
+        total_count: Optional[int],
+        cursor: Optional[str],
+        complete: bool,
+    ) -> datetime:
+        """Write sync metadata on an existing connection without committing.
+
+        A complete sync also records the newest cached ``starred_at`` as the
+        watermark incremental syncs page back to.
+
+        Returns:
+            The sync timestamp that was written
+        """
+        now = datetime.now()
+        updated_at = now.isoformat()
         entries = (
-            (self.STARRED_SYNC_CURSOR_KEY, cursor or ""),
-            (self.STARRED_SYNC_CACHED_COUNT_KEY, str(cached_count)),
+            (cls.STARRED_SYNC_CURSOR_KEY, cursor or ""),
+            (cls.STARRED_SYNC_CACHED_COUNT_KEY, str(cached_count)),
             (
-                self.STARRED_SYNC_TOTAL_COUNT_KEY,
+                cls.STARRED_SYNC_TOTAL_COUNT_KEY,
                 "" if total_count is None else str(total_count),
             ),
-            (self.STARRED_SYNC_COMPLETE_KEY, "1" if complete else "0"),
-            (self.STARRED_SYNC_UPDATED_AT_KEY, updated_at),
+            (cls.STARRED_SYNC_COMPLETE_KEY, "1" if complete else "0"),
+            (cls.STARRED_SYNC_UPDATED_AT_KEY, updated_at),
+            (cls.STARRED_SYNC_ORDER_KEY, cls.STARRED_SYNC_ORDER),
         )
-
-        async with self._connect() as db:
-            await db.executemany(
-                "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
-                entries,
+        await db.executemany(
+            "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+            entries,
+        )
+        if complete:
+            await db.execute(
+                "INSERT OR REPLACE INTO metadata (key, value) "
+                "SELECT ?, MAX(starred_at) FROM starred_repos WHERE is_stub = 0",
+                (cls.STARRED_SYNC_LAST_STARRED_AT_KEY,),
             )
-            await db.commit()
+        return now
 
     async def get_repo(self, repo_id: str) -> Optional[StarredRepo]:
         """
@@ -865,25 +1084,75 @@ class PersistentCache:
         Returns:
             StarredRepo object, or None if not found
         """
-        async with self._connect(row_factory=aiosqlite.Row) as db:
+        async with self._connect() as db:
 
-            cursor = await db.execute("SELECT * FROM starred_repos WHERE id = ?", (repo_id,))
+            cursor = await db.execute(self._SELECT_REPO_SQL, (repo_id,))
             row = await cursor.fetchone()
 
             if not row:
                 return None
 
-            # Update accessed_at
-            await db.execute(
-                "UPDATE starred_repos SET accessed_at = ? WHERE id = ?",
-                (datetime.now().isoformat(), repo_id),
-            )
-            await db.commit()
+            # Record accessed_at; written in batches, not per read
+            self._pending_access[repo_id] = datetime.now().isoformat()
+            if len(self._pending_access) >= self.ACCESS_FLUSH_THRESHOLD:
+                await self._flush_access_times(db)
 
-            repo = StarredRepo.from_dict(dict(row))
+            repo = StarredRepo.from_row(row)
             await self._hydrate_user_tags(db, [repo])
             return repo
 
+    async def search_repos(self, query: str, limit: int = 100) -> List[StarredRepo]:
+        """
+        Full-text search cached repos by name, description and topics.
+
+        Each whitespace-separated word in ``query`` is matched as a prefix
+        and all words must match. Words are quoted before reaching FTS5, so
+        punctuation in user input is never parsed as query syntax.
+
+        Args:
+            query: Free-text search string
+            limit: Maximum number of results
+
+        Returns:
+            Matching repos, best match first
+        """
+        match = self._fts_match_expression(query)
+        if match is None:
+            return []
+
+        async with self._connect() as db:
+            cursor = await db.execute(
+                """
+                SELECT r.* FROM starred_repos_fts f
+                JOIN starred_repos r ON r.rowid = f.rowid
+                WHERE starred_repos_fts MATCH ?
+                ORDER BY f.rank
+                LIMIT ?
+                """,
+                (match, limit),
+            )
+            repos = [StarredRepo.from_row(row) for row in await cursor.fetchall()]
+            await self._hydrate_user_tags(db, repos)
+            return repos
+
+    @staticmethod
+    def _fts_match_expression(query: str) -> Optional[str]:
+        """Turn free text into an FTS5 MATCH expression of quoted prefix terms."""
+        terms = ['"{}"*'.format(word.replace('"', '""')) for word in query.split()]
+        return " ".join(terms) or None
+
+    async def _flush_access_times(self, db: aiosqlite.Connection) -> None:
+        """Write buffered accessed_at stamps in one transaction."""
+        pending = [(at, repo_id) for repo_id, at in self._pending_access.items()]
+        self._pending_access.clear()
+        if not pending:
+            return
+        await db.executemany(
+            self._TOUCH_REPO_SQL,
+            pending,
+        )
+        await db.commit()
+
     async def invalidate_repos(self) -> None:
         """Invalidate (clear) all starred repos from cache."""
         async with self._connect() as db:
@@ -897,9 +1166,12 @@ class PersistentCache:
                     (self.STARRED_SYNC_TOTAL_COUNT_KEY,),
                     (self.STARRED_SYNC_COMPLETE_KEY,),
                     (self.STARRED_SYNC_UPDATED_AT_KEY,),
+                    (self.STARRED_SYNC_LAST_STARRED_AT_KEY,),
+                    (self.STARRED_SYNC_ORDER_KEY,),
                 ),
             )
             await db.commit()
+        self._sync_updated_at = None
 
     # ==================== Virtual Folders Operations ====================
 
@@ -910,32 +1182,26 @@ class PersistentCache:
         Returns:
             List of VirtualFolder objects
         """
-        async with self._connect(row_factory=aiosqlite.Row) as db:
-
-            cursor = await db.execute(
-                "SELECT * FROM virtual_folders ORDER BY created_at ASC"
-            )
+        async with self._connect() as db:
+            # One query for every folder's count: all-stars counts the repo
+            # cache itself, every other folder counts its folder_repos links.
+            cursor = await db.execute("""
+                SELECT vf.*,
+                       CASE WHEN vf.id = 'all-stars'
+                            THEN (SELECT COUNT(*) FROM starred_repos)
+                            ELSE COALESCE(c.cnt, 0)
+                       END AS repo_count
+                  FROM virtual_folders vf
+                  LEFT JOIN (
+                      SELECT folder_id, COUNT(*) AS cnt
+                        FROM folder_repos
+                       GROUP BY folder_id
+                  ) c ON c.folder_id = vf.id
+                 ORDER BY vf.created_at ASC
+            """)
             rows = await cursor.fetchall()
 
-            folders = []
-            for row in rows:
-                folder_dict = dict(row)
-
-                if row["id"] == "all-stars":
-                    count_cursor = await db.execute(
-                        "SELECT COUNT(*) as count FROM starred_repos"
-                    )
-                else:
-                    count_cursor = await db.execute(
-                        "SELECT COUNT(*) as count FROM folder_repos WHERE folder_id = ?",
-                        (row["id"],),
-                    )
-                count_row = await count_cursor.fetchone()
-                folder_dict["repo_count"] = count_row["count"] if count_row else 0
-
-                folders.append(VirtualFolder.from_dict(folder_dict))
-
-            return folders
+        return [VirtualFolder.from_dict(dict(row)) for row in rows]
 
     async def create_virtual_folder(
         self,
@@ -960,6 +1226,84 @@ class PersistentCache:
             CacheError: If folder with same name exists, kind is not allowed,
                 or kind="system" is requested by an external caller.
         """
+        self._check_folder_kind(folder, _internal)
+
+        async with self._connect() as db:
+            data = self._folder_row(folder, datetime.now().isoformat())
+
+            try:
+                await db.execute("""
+                    INSERT INTO virtual_folders
+                        (id, name, auto_tags, description, created_at, updated_at, kind)
+                    VALUES
+                        (:id, :name, :auto_tags, :description, :created_at, :updated_at, :kind)
+                """, data)
+                await db.commit()
+            except aiosqlite.IntegrityError:
+                raise CacheError(f"Folder with name '{folder.name}' already exists")
+
+            self.folders_version += 1
+            return folder
+
+    async def create_virtual_folders(
+        self,
+        folders: List[VirtualFolder],
+        *,
+        _internal: bool = False,
+    ) -> List[VirtualFolder]:
+        """
+        Create several virtual folders in one transaction, skipping existing ones.
+
+        Unlike ``create_virtual_folder``, a folder whose id or name is already
+        taken is not an error; it is simply left out of the result.
+
+        Args:
+            folders: VirtualFolder objects to create
+            _internal: See ``create_virtual_folder``
+
+        Returns:
+            The folders that were actually created
+
+        Raises:
+            CacheError: If a kind is not allowed (nothing is written)
+        """
+        for folder in folders:
+            self._check_folder_kind(folder, _internal)
+        if not folders:
+            return []
+
+        now = datetime.now().isoformat()
+        async with self._connect() as db:
+            cursor = await db.execute("SELECT id, name FROM virtual_folders")
+            taken = set()
+            for row in await cursor.fetchall():
+                taken.update((("id", row["id"]), ("name", row["name"])))
+
+            created = []
+            for folder in folders:
+                keys = (("id", folder.id), ("name", folder.name))
+                if any(key in taken for key in keys):
+                    continue
+                taken.update(keys)
+                created.append(folder)
+
+            if created:
+                await db.execute("BEGIN")
+                await db.executemany(
+                    """
+                    INSERT OR IGNORE INTO virtual_folders
+                        (id, name, auto_tags, description, created_at, updated_at, kind)
+                    VALUES
+                        (:id, :name, :auto_tags, :description, :created_at, :updated_at, :kind)
+                    """,
+                    [self._folder_row(folder, now) for folder in created],
+                )
+                await db.commit()
+                self.folders_version += 1
+        return created
+
+    def _check_folder_kind(self, folder: VirtualFolder, internal: bool) -> None:
+        """Validate (and for reserved ids, force) a folder's kind before insert."""
         # Reserved IDs always land at kind="system". This catches legacy
         # callers that create the all-stars folder without specifying kind,
         # and ensures the data invariant (all-stars is system) holds even if
@@ -967,40 +1311,29 @@ class PersistentCache:
         # this, but doing it at insert time avoids an inconsistent window.
         if folder.id in ("all-stars",):
             folder.kind = "system"
-            _internal = True
+            internal = True
 
         if folder.kind not in self.ALLOWED_FOLDER_KINDS:
             raise CacheError(
                 f"Invalid folder kind '{folder.kind}'. "
                 f"Allowed: {self.ALLOWED_FOLDER_KINDS}"
             )
-        if folder.kind == "system" and not _internal:
+        if folder.kind == "system" and not internal:
             raise CacheError(
                 "kind='system' folders are reserved for internal use "
                 "(e.g. all-stars). External callers cannot create them."
             )
 
-        async with self._connect() as db:
-            data = folder.to_dict()
-
-            now = datetime.now().isoformat()
-            if data["created_at"] is None:
-                data["created_at"] = now
-            if data["updated_at"] is None:
-                data["updated_at"] = now
-
-            try:
-                await db.execute("""
-                    INSERT INTO virtual_folders
-                        (id, name, auto_tags, description, created_at, updated_at, kind)
-                    VALUES
-                        (:id, :name, :auto_tags, :description, :created_at, :updated_at, :kind)
-                """, data)
-                await db.commit()
-            except aiosqlite.IntegrityError:
-                raise CacheError(f"Folder with name '{folder.name}' already exists")
-
-            return folder
+    @staticmethod
+    def _folder_row(folder: VirtualFolder, now: str) -> Dict[str, Any]:
+        """virtual_folders row for ``folder``, defaulting missing timestamps to ``now``."""
+        data = folder.to_dict()
+        data["auto_tags"] = fastjson.dumps(data["auto_tags"]).decode()
+        if data["created_at"] is None:
+            data["created_at"] = now
+        if data["updated_at"] is None:
+            data["updated_at"] = now
+        return data
 
     async def delete_virtual_folder(self, folder_id: str) -> None:
         """
@@ -1013,6 +1346,7 @@ class PersistentCache:
             await db.execute("DELETE FROM virtual_folders WHERE id = ?", (folder_id,))
             # folder_repos entries are deleted automatically via CASCADE
             await db.commit()
+        self.folders_version += 1
 
     async def get_folder_repos(self, folder_id: str) -> List[StarredRepo]:
         """
@@ -1031,7 +1365,7 @@ class PersistentCache:
 
         All branches hydrate ``user_tags`` via a single keyed query.
         """
-        async with self._connect(row_factory=aiosqlite.Row) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 "SELECT id, auto_tags, kind FROM virtual_folders WHERE id = ?",
                 (folder_id,),
@@ -1073,14 +1407,174 @@ class PersistentCache:
             await self._hydrate_user_tags(db, repos)
             return repos
 
+    async def get_folder_repo_ids(self, folder_id: str) -> Set[str]:
+        """
+        Get the ids of the repos in a virtual folder.
+
+        Same membership as ``get_folder_repos`` for every folder kind, but
+        only ids are selected: no JOIN, no ordering, no StarredRepo objects.
+
+        Args:
+            folder_id: Folder ID
+
+        Returns:
+            Set of repository IDs
+        """
+        async with self._connect() as db:
+            repo_ids: Set[str] = set()
+            for sql, params in await self._folder_member_queries(db, folder_id):
+                cursor = await db.execute(sql, params)
+                repo_ids.update(row[0] for row in await cursor.fetchall())
+            return repo_ids
+
+    async def get_folder_stats(self, folder_id: str) -> Dict[str, Any]:
+        """
+        Aggregate a virtual folder's repos in SQL.
+
+        Membership matches ``get_folder_repos``; one GROUP BY language query
+        returns a row per language, so no StarredRepo objects are built.
+
+        Args:
+            folder_id: Folder ID
+
+        Returns:
+            Dict with ``repo_count``, ``total_stars`` and ``languages``
+            (language -> repo count, most common first)
+        """
+        stats: Dict[str, Any] = {"repo_count": 0, "total_stars": 0, "languages": {}}
+        async with self._connect() as db:
+            queries = await self._folder_member_queries(db, folder_id)
+            if not queries:
+                return stats
+            members = " UNION ".join(sql for sql, _ in queries)
+            params = [param for _, query_params in queries for param in query_params]
+            # Ties go to the language with the most-starred repo.
+            cursor = await db.execute(
+                f"""
+                SELECT language, COUNT(*), COALESCE(SUM(stars_count), 0)
+                FROM starred_repos
+                WHERE id IN ({members})
+                GROUP BY language
+                ORDER BY COUNT(*) DESC, MAX(stars_count) DESC
+                """,
+                params,
+            )
+            for language, count, stars in await cursor.fetchall():
+                stats["repo_count"] += count
+                stats["total_stars"] += stars
+                if language:
+                    stats["languages"][language] = count
+        return stats
+
+    async def get_all_folder_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregate every virtual folder's repos at once.
+
+        Same numbers as ``get_folder_stats``, but membership for a batch of
+        folders is tagged with the folder id and grouped by
+        ``(folder_id, language)`` in one query, instead of one round trip
+        per folder.
+
+        Returns:
+            Dict of folder_id -> stats dict, for every stored folder
+        """
+        all_stats: Dict[str, Dict[str, Any]] = {}
+        async with self._connect() as db:
+            cursor = await db.execute(
+                "SELECT id, kind, auto_tags FROM virtual_folders"
+            )
+            folder_rows = await cursor.fetchall()
+
+            parts: List[Tuple[str, Sequence[Any]]] = []
+            for row in folder_rows:
+                folder_id = row["id"]
+                all_stats[folder_id] = {"repo_count": 0, "total_stars": 0, "languages": {}}
+                for sql, params in self._member_queries(folder_id, row["kind"], row["auto_tags"]):
+                    parts.append((f"SELECT ?, * FROM ({sql})", (folder_id, *params)))
+
+            # Stay under SQLite's 500-term compound SELECT limit; a folder's
+            # (at most two) terms never straddle a batch boundary.
+            start = 0
+            while start < len(parts):
+                end = min(start + self._STATS_UNION_TERMS, len(parts))
+                if (
+                    end < len(parts)
+                    and end - 1 > start
+                    and parts[end][1][0] == parts[end - 1][1][0]
+                ):
+                    end -= 1
+                batch = parts[start:end]
+                start = end
+                members = " UNION ".join(sql for sql, _ in batch)
+                params = [param for _, part_params in batch for param in part_params]
+                cursor = await db.execute(
+                    f"""
+                    WITH members(folder_id, repo_id) AS ({members})
+                    SELECT m.folder_id, r.language, COUNT(*),
+                           COALESCE(SUM(r.stars_count), 0)
+                    FROM members m JOIN starred_repos r ON r.id = m.repo_id
+                    GROUP BY m.folder_id, r.language
+                    ORDER BY COUNT(*) DESC, MAX(r.stars_count) DESC
+                    """,
+                    params,
+                )
+                for folder_id, language, count, stars in await cursor.fetchall():
+                    stats = all_stats[folder_id]
+                    stats["repo_count"] += count
+                    stats["total_stars"] += stars
+                    if language:
+                        stats["languages"][language] = count
+        return all_stats
+
+    async def _folder_member_queries(
+        self, db: aiosqlite.Connection, folder_id: str
+    ) -> List[Tuple[str, Sequence[Any]]]:
+        """Id-selecting queries whose union is the folder's membership.
+
+        Returns an empty list for a missing folder (other than the implicit
+        ``all-stars``) or a folder that can't match anything.
+        """
+        cursor = await db.execute(
+            "SELECT auto_tags, kind FROM virtual_folders WHERE id = ?",
+            (folder_id,),
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            kind = "system" if folder_id == "all-stars" else None
+            auto_tags_raw = None
+        else:
+            kind, auto_tags_raw = row["kind"], row["auto_tags"]
+        return self._member_queries(folder_id, kind, auto_tags_raw)
+
+    @staticmethod
+    def _member_queries(
+        folder_id: str, kind: Optional[str], auto_tags_raw: Optional[str]
+    ) -> List[Tuple[str, Sequence[Any]]]:
+        """Build ``_folder_member_queries`` for an already-loaded folder row."""
+        queries: List[Tuple[str, Sequence[Any]]] = []
+        if kind == "system":
+            if folder_id != "all-stars":
+                raise CacheError(f"Unknown system folder id: {folder_id!r}")
+            queries.append(("SELECT id FROM starred_repos", ()))
+        if kind in ("curated", "hybrid"):
+            queries.append(
+                ("SELECT repo_id FROM folder_repos WHERE folder_id = ?", (folder_id,))
+            )
+        if kind in ("rule", "hybrid"):
+            clause = PersistentCache._auto_tag_clause(auto_tags_raw)
+            if clause is not None:
+                where, params = clause
+                queries.append((f"SELECT id FROM starred_repos WHERE {where}", params))
+        if kind not in (None, "system", "curated", "rule", "hybrid"):
+            raise CacheError(f"Unknown folder kind: {kind!r}")
+        return queries
+
     @staticmethod
     async def _get_all_stars(db: aiosqlite.Connection) -> List[StarredRepo]:
         """Return all starred repos ordered by stars_count DESC."""
-        cursor = await db.execute(
-            "SELECT * FROM starred_repos ORDER BY stars_count DESC"
-        )
+        cursor = await db.execute(PersistentCache._SELECT_REPOS_SQL)
         rows = await cursor.fetchall()
-        return [StarredRepo.from_dict(dict(row)) for row in rows]
+        return [StarredRepo.from_row(row) for row in rows]
 
     @staticmethod
     async def _get_repos_matching_auto_tags(
@@ -1088,43 +1582,52 @@ class PersistentCache:
     ) -> List[StarredRepo]:
         """Return repos whose ``topics`` intersect with the folder's auto_tags.
 
-        Topics are stored as JSON-encoded lists in ``starred_repos.topics``;
-        we use SQLite's ``LIKE`` against the JSON fragment ``"<tag>"`` (with
-        quotes) so we don't false-match on substrings of other tags.
-        Language is also matched as a special case for parity with
-        ``VirtualFolder.matches_repo``.
+        Topics are stored as JSON-encoded lists in ``starred_repos.topics``
+        and matched element-wise with SQLite's ``json_each`` (see
+        ``_auto_tag_clause``). Language is also matched as a special case for
+        parity with ``VirtualFolder.matches_repo``.
         """
-        import json
-
-        if not auto_tags_raw:
-            return []
-        try:
-            tags = json.loads(auto_tags_raw)
-        except (TypeError, ValueError):
+        clause = PersistentCache._auto_tag_clause(auto_tags_raw)
+        if clause is None:
             return []
-        if not tags:
-            return []
-
-        # Build dynamic OR query — one clause per tag for either topics
-        # JSON-substring match or language equality.
-        topic_clauses = []
-        params: List[Any] = []
-        for tag in tags:
-            tag_lower = tag.lower()
-            # JSON list serialization always wraps strings in double quotes,
-            # so ``"<tag>"`` is a safe substring marker that won't false-match.
-            topic_clauses.append("LOWER(topics) LIKE ?")
-            params.append(f'%"{tag_lower}"%')
-            topic_clauses.append("LOWER(language) = ?")
-            params.append(tag_lower)
-
-        where = " OR ".join(topic_clauses)
+        where, params = clause
         cursor = await db.execute(
             f"SELECT * FROM starred_repos WHERE {where} ORDER BY stars_count DESC",
             params,
         )
         rows = await cursor.fetchall()
-        return [StarredRepo.from_dict(dict(row)) for row in rows]
+        return [StarredRepo.from_row(row) for row in rows]
+
+    @staticmethod
+    def _auto_tag_clause(
+        auto_tags: Union[str, List[str], None],
+    ) -> Optional[Tuple[str, List[Any]]]:
+        """Build the starred_repos WHERE clause for a folder's auto_tags.
+
+        ``auto_tags`` is the stored JSON text or an already-decoded list.
+        A repo matches if any topic or its language equals a tag,
+        case-insensitively; the same rule as ``VirtualFolder.matches_repo``.
+        Topics are compared element-wise via ``json_each`` rather than by
+        substring, so no escaping or quoting tricks are involved.
+
+        Returns None when there are no usable tags (nothing can match).
+        """
+        if isinstance(auto_tags, str):
+            try:
+                auto_tags = fastjson.loads(auto_tags)
+            except ValueError:
+                return None
+        if not auto_tags:
+            return None
+
+        tags = list(dict.fromkeys(tag.lower() for tag in auto_tags))
+        placeholders = ", ".join("?" for _ in tags)
+        where = (
+            "EXISTS (SELECT 1 FROM json_each(starred_repos.topics)"
+            f" WHERE LOWER(json_each.value) IN ({placeholders}))"
+            f" OR LOWER(language) IN ({placeholders})"
+        )
+        return where, tags + tags
 
     @staticmethod
     async def _get_curated_folder_repos(
@@ -1144,7 +1647,7 @@ class PersistentCache:
             (folder_id,),
         )
         rows = await cursor.fetchall()
-        return [StarredRepo.from_dict(dict(row)) for row in rows]
+        return [StarredRepo.from_row(row) for row in rows]
 
     @classmethod
     async def _get_hybrid_folder_repos(
@@ -1166,9 +1669,20 @@ class PersistentCache:
         deduped_auto = [r for r in auto if r.id not in manual_ids]
         return manual + deduped_auto
 
+    # Re-adding an existing link leaves the row (added_at, position) alone,
+    # except that a manual add promotes an auto-matched link to manual.
+    # Unlike INSERT OR REPLACE this never deletes the row, so an auto match
+    # can't demote a manual link or wipe its position.
+    _LINK_REPO_SQL = """
+        INSERT INTO folder_repos (folder_id, repo_id, is_manual, added_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(folder_id, repo_id) DO UPDATE SET is_manual = 1
+         WHERE excluded.is_manual AND NOT folder_repos.is_manual
+    """
+
     async def add_repo_to_folder(
         self, repo_id: str, folder_id: str, is_manual: bool = True
-    ) -> None:
+    ) -> bool:
         """
         Add a repo to a virtual folder.
 
@@ -1176,13 +1690,175 @@ class PersistentCache:
             repo_id: Repository ID
             folder_id: Folder ID
             is_manual: True if manually added, False if auto-matched
+
+        Returns:
+            True if a link was created (or an auto link became manual),
+            False if the link already existed unchanged
         """
         async with self._connect() as db:
-            await db.execute("""
-                INSERT OR REPLACE INTO folder_repos (folder_id, repo_id, is_manual, added_at)
-                VALUES (?, ?, ?, ?)
-            """, (folder_id, repo_id, is_manual, datetime.now().isoformat()))
+            cursor = await db.execute(
+                self._LINK_REPO_SQL,
+                (folder_id, repo_id, is_manual, datetime.now().isoformat()),
+            )
+            await db.commit()
+            return cursor.rowcount > 0
+
+    async def add_repos_to_folder(
+        self, folder_id: str, repo_ids: Iterable[str], is_manual: bool = False
+    ) -> int:
+        """
+        Add many repos to a virtual folder in one transaction.
+
+        Args:
+            folder_id: Folder ID
+            repo_ids: Repository IDs to link
+            is_manual: True if manually added, False if auto-matched
+
+        Returns:
+            Number of distinct repos linked (new or already present)
+        """
+        now = datetime.now().isoformat()
+        rows = [(folder_id, repo_id, is_manual, now) for repo_id in dict.fromkeys(repo_ids)]
+        if not rows:
+            return 0
+        async with self._connect() as db:
+            await db.execute("BEGIN")
+            await db.executemany(self._LINK_REPO_SQL, rows)
+            await db.commit()
+        return len(rows)
+
+    async def move_repos_to_folder(
+        self, folder_id: str, moves: Iterable[Tuple[str, str]]
+    ) -> int:
+        """
+        Move many repos into a virtual folder in one transaction.
+
+        Each repo is unlinked from its source folder and linked to
+        ``folder_id`` as manual, like ``remove_repo_from_folder`` followed
+        by ``add_repo_to_folder``.
+
+        Args:
+            folder_id: Destination folder ID
+            moves: (repo_id, source_folder_id) pairs
+
+        Returns:
+            Number of distinct moves applied
+        """
+        moves = list(dict.fromkeys(moves))
+        if not moves:
+            return 0
+        now = datetime.now().isoformat()
+        async with self._connect() as db:
+            await db.execute("BEGIN")
+            await db.executemany(
+                "DELETE FROM folder_repos WHERE folder_id = ? AND repo_id = ?",
+                [(source_id, repo_id) for repo_id, source_id in moves],
+            )
+            await db.executemany(
+                self._LINK_REPO_SQL,
+                [(folder_id, repo_id, True, now) for repo_id in dict.fromkeys(r for r, _ in moves)],
+            )
+            await db.commit()
+        return len(moves)
+
+    async def add_repos_to_folders_bulk(
+        self, pairs: Iterable[Tuple[str, str]]
+    ) -> Dict[str, int]:
+        """
+        Link many (folder_id, repo_id) pairs as auto-matched, in one transaction.
+
+        Existing memberships for the folders involved are read once and
+        skipped, so only new links are written and counted; a link that
+        already exists (manual or not) is left untouched.
+
+        Args:
+            pairs: (folder_id, repo_id) pairs to link
+
+        Returns:
+            Dictionary mapping folder_id -> number of new links created
+        """
+        pairs = list(dict.fromkeys(pairs))
+        stats: Dict[str, int] = {folder_id: 0 for folder_id, _ in pairs}
+        if not pairs:
+            return stats
+
+        async with self._connect() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            cursor = await db.execute(
+                "SELECT folder_id, repo_id FROM folder_repos"
+                " WHERE folder_id IN (SELECT value FROM json_each(?))",
+                (fastjson.dumps(list(stats)).decode(),),
+            )
+            existing = set(map(tuple, await cursor.fetchall()))
+
+            now = datetime.now().isoformat()
+            rows = [
+                (folder_id, repo_id, False, now)
+                for folder_id, repo_id in pairs
+                if (folder_id, repo_id) not in existing
+            ]
+            await db.executemany(self._LINK_REPO_SQL, rows)
+            await db.commit()
+
+        for folder_id, _, _, _ in rows:
+            stats[folder_id] += 1
+        return stats
+
+    async def link_auto_tag_matches(self, folder_id: str, auto_tags: List[str]) -> int:
+        """
+        Link every cached repo matching ``auto_tags`` to a folder, in SQL.
+
+        One ``INSERT ... SELECT`` replaces loading every repo and calling
+        ``VirtualFolder.matches_repo`` in Python. Links are non-manual;
+        existing links (manual or not) are left untouched.
+
+        Args:
+            folder_id: Folder ID
+            auto_tags: Tags to match against repo topics and language
+
+        Returns:
+            Number of new links created
+        """
+        stats = await self.link_auto_tag_matches_bulk([(folder_id, auto_tags)])
+        return stats[folder_id]
+
+    async def link_auto_tag_matches_bulk(
+        self, folders: Iterable[Tuple[str, List[str]]]
+    ) -> Dict[str, int]:
+        """
+        Run ``link_auto_tag_matches`` for many folders in one transaction.
+
+        Args:
+            folders: (folder_id, auto_tags) pairs
+
+        Returns:
+            Dictionary mapping folder_id -> number of new links created
+        """
+        stats: Dict[str, int] = {}
+        statements = []
+        for folder_id, auto_tags in folders:
+            stats[folder_id] = 0
+            clause = self._auto_tag_clause(auto_tags)
+            if clause is not None:
+                statements.append((folder_id, *clause))
+        if not statements:
+            return stats
+
+        now = datetime.now().isoformat()
+        async with self._connect() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            for folder_id, where, params in statements:
+                cursor = await db.execute(
+                    f"""
+                    INSERT INTO folder_repos (folder_id, repo_id, is_manual, added_at)
+                    SELECT ?, id, 0, ? FROM starred_repos WHERE {where}
+                    ON CONFLICT(folder_id, repo_id) DO NOTHING
+                    """,
+                    [folder_id, now, *params],
+                )
+                stats[folder_id] += cursor.rowcount
             await db.commit()
+        return stats
 
     async def remove_repo_from_folder(self, repo_id: str, folder_id: str) -> None:
         """
@@ -1348,11 +2024,7 @@ class PersistentCache:
         if not repos:
             return
         ids = [r.id for r in repos]
-        placeholders = ",".join("?" for _ in ids)
-        cursor = await db.execute(
-            f"SELECT repo_id, tag FROM user_tags WHERE repo_id IN ({placeholders}) ORDER BY tag ASC",
-            ids,
-        )
+        cursor = await db.execute(self._SELECT_USER_TAGS_SQL, (fastjson.dumps(ids).decode(),))
         rows = await cursor.fetchall()
         bucket: Dict[str, List[str]] = {repo_id: [] for repo_id in ids}
         for repo_id, tag in rows:
@@ -1362,21 +2034,30 @@ class PersistentCache:
 
     # ==================== Repo Metadata Operations ====================
 
-    async def get_repo_metadata(self, repo_id: str) -> Optional[RepoMetadata]:
+    async def get_repo_metadata(
+        self, repo_id: str, include_readme: bool = True
+    ) -> Optional[RepoMetadata]:
         """
         Get extended metadata for a repo.
 
         Args:
             repo_id: Repository ID
+            include_readme: Load ``readme_content``. Pass False when only the
+                flags and counters are needed; the README (possibly
+                megabytes) is then never read or decoded, and
+                ``readme_content`` is None.
 
         Returns:
             RepoMetadata object, or None if not cached
         """
-        async with self._connect(row_factory=aiosqlite.Row) as db:
+        sql = (
+            self._SELECT_METADATA_ROW_SQL
+            if include_readme
+            else self._SELECT_METADATA_ROW_NO_README_SQL
+        )
+        async with self._connect() as db:
 
-            cursor = await db.execute(
-                "SELECT * FROM repo_metadata WHERE repo_id = ?", (repo_id,)
-            )
+            cursor = await db.execute(sql, (repo_id,))
             row = await cursor.fetchone()
 
             if not row:
@@ -1414,23 +2095,26 @@ class PersistentCache:
         Returns:
             Number of entries removed
         """
-        cutoff_time = datetime.now() - timedelta(seconds=self.ttl_seconds)
+        cutoff = (datetime.now() - timedelta(seconds=self.ttl_seconds)).isoformat()
 
         async with self._connect() as db:
+            # Take the write lock up front so no other writer can refresh or
+            # add rows between the two deletes; the count is the rowcount of
+            # the delete itself rather than a separate SELECT.
+            await db.execute("BEGIN IMMEDIATE")
+            await db.execute(
+                """
+                DELETE FROM repo_metadata WHERE repo_id IN (
+                    SELECT id FROM starred_repos WHERE cached_at < ?
+                )
+                """,
+                (cutoff,),
+            )
             cursor = await db.execute(
-                "SELECT id FROM starred_repos WHERE cached_at < ?",
-                (cutoff_time.isoformat(),),
+                "DELETE FROM starred_repos WHERE cached_at < ?", (cutoff,)
             )
-            repo_ids = [row[0] for row in await cursor.fetchall()]
-            count = len(repo_ids)
-
-            if count > 0:
-                await self._delete_repo_metadata(db, repo_ids)
-                await db.execute(
-                    "DELETE FROM starred_repos WHERE cached_at < ?",
-                    (cutoff_time.isoformat(),),
-                )
-                await db.commit()
+            count = cursor.rowcount
+            await db.commit()
 
             return count
 
@@ -1441,33 +2125,21 @@ class PersistentCache:
         Returns:
             Dictionary with cache stats
         """
-        async with self._connect(row_factory=aiosqlite.Row) as db:
-
-            # Count repos
-            cursor = await db.execute("SELECT COUNT(*) as count FROM starred_repos")
-            row = await cursor.fetchone()
-            repo_count = row["count"] if row else 0
-
-            # Count folders
-            cursor = await db.execute("SELECT COUNT(*) as count FROM virtual_folders")
-            row = await cursor.fetchone()
-            folder_count = row["count"] if row else 0
-
-            # Count metadata entries
-            cursor = await db.execute("SELECT COUNT(*) as count FROM repo_metadata")
-            row = await cursor.fetchone()
-            metadata_count = row["count"] if row else 0
-
-            # Get oldest cached repo
-            cursor = await db.execute("SELECT MIN(cached_at) as oldest FROM starred_repos")
+        async with self._connect() as db:
+            cursor = await db.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM starred_repos) AS repos_count,
+                    (SELECT COUNT(*) FROM virtual_folders) AS folders_count,
+                    (SELECT COUNT(*) FROM repo_metadata) AS metadata_count,
+                    (SELECT MIN(cached_at) FROM starred_repos) AS oldest_cache
+            """)
             row = await cursor.fetchone()
-            oldest_cache = row["oldest"] if row else None
 
             return {
-                "repos_count": repo_count,
-                "folders_count": folder_count,
-                "metadata_count": metadata_count,
-                "oldest_cache": oldest_cache,
+                "repos_count": row["repos_count"],
+                "folders_count": row["folders_count"],
+                "metadata_count": row["metadata_count"],
+                "oldest_cache": row["oldest_cache"],
                 "db_path": str(self.db_path),
                 "ttl_seconds": self.ttl_seconds,
             }
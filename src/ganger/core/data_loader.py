@@ -7,7 +7,9 @@ Modified: 2025-11-08
 
 import asyncio
 import logging
-from typing import List, Optional, Callable, Awaitable
+from contextlib import aclosing
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
 
 from .github_client import GitHubAPIClient
 from .exceptions import CacheError
@@ -53,6 +55,14 @@ class DataLoader:
         self.progress_callback = progress_callback
         self.repo_sync_callback = repo_sync_callback
 
+    async def close(self) -> None:
+        """Close the cache's database connection.
+
+        For shutdown paths that own the loader; the cache reopens the
+        connection lazily if it is used again.
+        """
+        await self.cache.close()
+
     async def _report_progress(self, label: str, current: int, total: int) -> None:
         """Report progress if callback is set."""
         if self.progress_callback:
@@ -81,26 +91,60 @@ class DataLoader:
         try:
             # Try cache first unless force refresh
             sync_state = await self.cache.get_starred_sync_state()
+            can_resume_incrementally = hasattr(type(self.api_client), "get_starred_repos_page")
             if not force_refresh:
                 cached_repos = await self.cache.get_starred_repos()
                 if cached_repos:
-                    can_resume_incrementally = hasattr(type(self.api_client), "get_starred_repos_page")
                     if sync_state["complete"] or not can_resume_incrementally:
                         logger.info(f"Loaded {len(cached_repos)} repos from cache")
                         return cached_repos
 
-                    logger.info(
-                        "Resuming starred repo sync from cached snapshot at %s/%s",
-                        len(cached_repos),
-                        sync_state["total_count"] or "?",
-                    )
-                    repos = await self._load_starred_repos_incrementally(
-                        start_cursor=sync_state["cursor"],
-                        existing_repos=cached_repos,
-                        total_count=sync_state["total_count"],
-                    )
-                    logger.info(f"Fetched {len(repos)} starred repos from GitHub")
-                    return repos
+                    if (
+                        sync_state["cursor"]
+                        and sync_state["order"] != PersistentCache.STARRED_SYNC_ORDER
+                    ):
+                        # The cursor came from a query with another page
+                        # order; resuming it could skip stars and then prune
+                        # against an incomplete id set.
+                        logger.info(
+                            "Discarding starred sync cursor saved under page order %s; "
+                            "running a full sync",
+                            sync_state["order"] or "unknown",
+                        )
+                    else:
+                        logger.info(
+                            "Resuming starred repo sync from cached snapshot at %s/%s",
+                            len(cached_repos),
+                            sync_state["total_count"] or "?",
+                        )
+                        repos = await self._load_starred_repos_incrementally(
+                            start_cursor=sync_state["cursor"],
+                            existing_repos=cached_repos,
+                            total_count=sync_state["total_count"],
+                        )
+                        logger.info(f"Fetched {len(repos)} starred repos from GitHub")
+                        return repos
+
+                last_starred_at = sync_state["last_starred_at"]
+                if can_resume_incrementally and sync_state["complete"] and last_starred_at:
+                    # Expired but complete: only stars newer than the last
+                    # sync's watermark need fetching.
+                    stale_repos = await self.cache.get_starred_repos(force_refresh=True)
+                    if stale_repos:
+                        try:
+                            logger.info("Fetching stars added since %s", last_starred_at)
+                            repos = await self._load_starred_repos_incrementally(
+                                existing_repos=stale_repos,
+                                total_count=sync_state["total_count"],
+                                starred_after=last_starred_at,
+                            )
+                            logger.info(f"Loaded {len(repos)} starred repos")
+                            return repos
+                        except Exception as incremental_error:
+                            logger.warning(
+                                "Incremental star sync failed, running a full sync: %s",
+                                incremental_error,
+                            )
 
             await self.cache.set_starred_sync_state(
                 cached_count=0,
@@ -149,56 +193,116 @@ class DataLoader:
         start_cursor: Optional[str] = None,
         existing_repos: Optional[List[StarredRepo]] = None,
         total_count: Optional[int] = None,
+        starred_after: Optional[datetime] = None,
     ) -> List[StarredRepo]:
-        """Fetch starred repos page by page so the TUI can update mid-sync."""
-        repo_map = {repo.id: repo for repo in (existing_repos or [])}
-        repo_ids = set(repo_map)
-        cursor = start_cursor
+        """Fetch starred repos page by page so the TUI can update mid-sync.
+
+        Pages come from ``_iter_starred_pages`` and each is written to the
+        cache before the next is consumed, so only one page of repos is held
+        in memory at a time.
+
+        With ``starred_after``, pages (newest first) stop at the first star
+        already covered by the cache and nothing is pruned. If GitHub's total
+        then disagrees with the cached count, stars were removed elsewhere and
+        every page is walked again as a full sync. Only counts are compared, so
+        an unstar balanced by a star this pass didn't fetch (one not dated
+        after the watermark) leaves them equal; that stale entry lingers
+        until the next full sync (``force_refresh``).
+        """
+        # Only ids are kept across pages; each page's repos are dropped once
+        # they're in the cache.
+        existing_repos = existing_repos or []
+        repo_ids = {repo.id for repo in existing_repos}
+        stub_ids = {repo.id for repo in existing_repos if repo.is_stub}
 
         if repo_ids:
             await self._report_repo_sync(len(repo_ids), total_count)
 
-        while True:
-            page = await asyncio.to_thread(
-                self.api_client.get_starred_repos_page,
-                cursor,
-            )
-
-            page_repos = page["repos"]
-            total_count = page.get("total_count")
+        async with aclosing(self._iter_starred_pages(start_cursor, starred_after)) as pages:
+            async for page in pages:
+                await self._store_starred_page(page, repo_ids)
+                total_count = page.get("total_count")
+
+        if starred_after is not None:
+            starred_count = len(repo_ids - stub_ids)
+            if total_count is not None and total_count != starred_count:
+                logger.info(
+                    "Cached %s stars but GitHub reports %s; running a full sync",
+                    starred_count,
+                    total_count,
+                )
+                return await self._load_starred_repos_incrementally(total_count=total_count)
+        else:
+            await self.cache.prune_starred_repos(repo_ids)
+        await self.cache.set_starred_sync_state(
+            cached_count=len(repo_ids),
+            total_count=total_count or len(repo_ids),
+            cursor=None,
+            complete=True,
+        )
 
-            if page_repos:
-                await self.cache.upsert_starred_repos(page_repos)
-                for repo in page_repos:
-                    repo_map[repo.id] = repo
-                    repo_ids.add(repo.id)
+        refreshed_repos = await self.cache.get_starred_repos(force_refresh=True)
+        return refreshed_repos or []
 
-            await self.cache.set_starred_sync_state(
-                cached_count=len(repo_ids),
-                total_count=total_count,
-                cursor=page["end_cursor"],
-                complete=not page["has_next_page"],
-            )
+    async def _iter_starred_pages(
+        self,
+        start_cursor: Optional[str] = None,
+        starred_after: Optional[datetime] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield GraphQL pages of starred repos as they arrive.
+
+        GraphQL pages are cursor-chained, so the next request goes out (on a
+        worker thread) as soon as a page is yielded, overlapping the
+        consumer's work on it. Close the generator (e.g. with
+        ``contextlib.aclosing``) to cancel a prefetch that is no longer wanted.
+        """
 
-            if total_count and total_count > 0:
-                await self._report_progress("Syncing", len(repo_ids), total_count)
-            await self._report_repo_sync(len(repo_ids), total_count)
+        def fetch(cursor: Optional[str]) -> asyncio.Task:
+            if starred_after is None:
+                call = asyncio.to_thread(self.api_client.get_starred_repos_page, cursor)
+            else:
+                call = asyncio.to_thread(
+                    self.api_client.get_starred_repos_page,
+                    cursor,
+                    starred_after=starred_after,
+                )
+            return asyncio.create_task(call)
 
-            if not page["has_next_page"]:
-                break
+        next_page: Optional[asyncio.Task] = fetch(start_cursor)
+        try:
+            while next_page is not None:
+                page = await next_page
+                next_page = fetch(page["end_cursor"]) if page["has_next_page"] else None
+                yield page
+        finally:
+            if next_page is not None and not next_page.cancel():
+                # Already finished: retrieve its error so it isn't logged as
+                # "never retrieved" on top of the one being raised.
+                next_page.exception()
+
+    async def _store_starred_page(
+        self,
+        page: Dict[str, Any],
+        repo_ids: Set[str],
+    ) -> None:
+        """Cache one fetched page and record resumable sync progress."""
+        page_repos = page["repos"]
+        total_count = page.get("total_count")
 
-            cursor = page["end_cursor"]
+        if page_repos:
+            await self.cache.upsert_starred_repos(page_repos)
+            repo_ids.update(repo.id for repo in page_repos)
 
-        await self.cache.prune_starred_repos(repo_ids)
         await self.cache.set_starred_sync_state(
             cached_count=len(repo_ids),
-            total_count=total_count or len(repo_ids),
-            cursor=None,
-            complete=True,
+            total_count=total_count,
+            cursor=page["end_cursor"],
+            complete=not page["has_next_page"],
         )
 
-        refreshed_repos = await self.cache.get_starred_repos(force_refresh=True)
-        return refreshed_repos or []
+        if total_count and total_count > 0:
+            await self._report_progress("Syncing", len(repo_ids), total_count)
+        await self._report_repo_sync(len(repo_ids), total_count)
 
     async def ensure_default_folders(self) -> List[VirtualFolder]:
         """Create default folders if they don't exist.
@@ -211,64 +315,81 @@ class DataLoader:
             List of all virtual folders
         """
         try:
-            # Check if "All Stars" folder exists
             existing_folders = await self.cache.get_virtual_folders()
-            all_stars_exists = any(f.name == "All Stars" for f in existing_folders)
-
-            if not all_stars_exists:
-                # Create "All Stars" folder. ``_internal=True`` is required
-                # because kind="system" is reserved for cache-internal callers.
-                all_stars = VirtualFolder(
-                    id="all-stars",
-                    name="All Stars",
-                    auto_tags=[],
-                    repo_count=0,
-                    kind="system",
+            existing_names = {f.name for f in existing_folders}
+            wanted: List[VirtualFolder] = []
+
+            if "All Stars" not in existing_names:
+                # kind="system" is reserved; the cache forces it (and allows
+                # it) for the all-stars id.
+                wanted.append(
+                    VirtualFolder(
+                        id="all-stars",
+                        name="All Stars",
+                        auto_tags=[],
+                        repo_count=0,
+                        kind="system",
+                    )
                 )
-                try:
-                    await self.cache.create_virtual_folder(all_stars, _internal=True)
-                    logger.info("Created 'All Stars' folder")
-                except CacheError as e:
-                    # Folder already exists (race condition or concurrent creation)
-                    logger.debug(f"All Stars folder already exists: {e}")
-
-            # Create language/topic folders from config
-            if self.settings.folders.default_folders:
-                for folder_config in self.settings.folders.default_folders:
-                    name = folder_config.get("name")
-                    auto_tags = folder_config.get("auto_tags", [])
-
-                    # Check if folder already exists
-                    exists = any(f.name == name for f in existing_folders)
-                    if not exists:
-                        # Default folders from config are auto-tag-driven, so
-                        # they're "rule" folders. The startup repair pass
-                        # would correct this anyway, but emitting the right
-                        # kind up front avoids the round trip.
-                        kind = folder_config.get("kind") or (
-                            "rule" if auto_tags else "curated"
-                        )
-                        folder = VirtualFolder(
-                            id=name.lower().replace(" ", "-"),
-                            name=name,
-                            auto_tags=auto_tags,
-                            repo_count=0,
-                            kind=kind,
-                        )
-                        try:
-                            await self.cache.create_virtual_folder(folder)
-                            logger.info(f"Created folder '{name}' with tags {auto_tags}")
-                        except CacheError as e:
-                            # Folder already exists (race condition or concurrent creation)
-                            logger.debug(f"Folder '{name}' already exists: {e}")
 
-            # Return all folders
-            return await self.cache.get_virtual_folders()
+            # Language/topic folders from config
+            for folder_config in self.settings.folders.default_folders or []:
+                name = folder_config.get("name")
+                if name in existing_names:
+                    continue
+                auto_tags = folder_config.get("auto_tags", [])
+                # Default folders from config are auto-tag-driven, so
+                # they're "rule" folders. The startup repair pass
+                # would correct this anyway, but emitting the right
+                # kind up front avoids the round trip.
+                kind = folder_config.get("kind") or (
+                    "rule" if auto_tags else "curated"
+                )
+                wanted.append(
+                    VirtualFolder(
+                        id=name.lower().replace(" ", "-"),
+                        name=name,
+                        auto_tags=auto_tags,
+                        repo_count=0,
+                        kind=kind,
+                    )
+                )
+
+            if not wanted:
+                return existing_folders
+
+            # One transaction for all of them. Folders another process
+            # created in the meantime are skipped, not errors.
+            try:
+                created = await self.cache.create_virtual_folders(wanted)
+            except CacheError as e:
+                logger.warning(f"Could not create default folders: {e}")
+                created = []
+            for folder in created:
+                logger.info(f"Created folder '{folder.name}' with tags {folder.auto_tags}")
+
+            # New folders sort after the existing ones (ORDER BY created_at),
+            # so there's no need to read the whole list back.
+            return existing_folders + created
 
         except Exception as e:
             logger.error(f"Error ensuring default folders: {e}", exc_info=True)
             raise
 
+    async def sync_folders(self, repos: List[StarredRepo]) -> None:
+        """Run the post-load folder passes concurrently.
+
+        The All Stars refresh and auto-categorization touch disjoint
+        folders, and each one logs rather than raises its own errors.
+
+        Args:
+            repos: All starred repositories
+        """
+        await asyncio.gather(
+            self.sync_all_stars_folder(repos),
+            self.auto_categorize_all(repos),
+        )
+
     async def sync_all_stars_folder(self, all_repos: List[StarredRepo]) -> None:
         """Refresh progress for the special All Stars folder.
 
@@ -308,7 +429,7 @@ class DataLoader:
             # Report completion
             await self._report_progress("Categorizing", total, total)
 
-            total_categorized = sum(len(r) for r in categorized.values())
+            total_categorized = sum(categorized.values())
             logger.info(f"Auto-categorized {total_categorized} repos into {len(categorized)} folders")
 
         except Exception as e:
@@ -7,8 +7,9 @@ Modified: 2025-11-07
 """
 
 import uuid
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 
 from ganger.core.cache import PersistentCache
 from ganger.core.models import VirtualFolder, StarredRepo, Clipboard, ClipboardItem
@@ -33,6 +34,15 @@ class FolderManager:
         """
         self.cache = cache
         self.clipboard = Clipboard()
+        # Lowercased auto_tag -> folder ids: over every tagged folder for
+        # suggest_folders_for_repo, and over rule/hybrid folders only for
+        # auto-categorization. Rebuilt when cache.folders_version moves
+        # past _match_index_version.
+        self._match_index: Optional[Dict[str, List[str]]] = None
+        self._categorize_index: Dict[str, List[str]] = {}
+        self._categorize_folders: List[VirtualFolder] = []
+        self._match_index_version = -1
+        self._match_index_folders: Dict[str, VirtualFolder] = {}
 
     async def get_all_folders(self) -> List[VirtualFolder]:
         """
@@ -145,9 +155,21 @@ class FolderManager:
         """
         return await self.cache.get_folder_repos(folder_id)
 
+    async def get_folder_repo_ids(self, folder_id: str) -> Set[str]:
+        """
+        Get the ids of the repos in a folder, without loading the repos.
+
+        Args:
+            folder_id: Folder ID
+
+        Returns:
+            Set of repository IDs in this folder
+        """
+        return await self.cache.get_folder_repo_ids(folder_id)
+
     async def add_repo_to_folder(
         self, repo_id: str, folder_id: str, is_manual: bool = True
-    ) -> None:
+    ) -> bool:
         """
         Add a repo to a folder.
 
@@ -155,8 +177,11 @@ class FolderManager:
             repo_id: Repository ID
             folder_id: Folder ID
             is_manual: True if manually added, False if auto-matched
+
+        Returns:
+            False if the link already existed unchanged
         """
-        await self.cache.add_repo_to_folder(repo_id, folder_id, is_manual)
+        return await self.cache.add_repo_to_folder(repo_id, folder_id, is_manual)
 
     async def remove_repo_from_folder(self, repo_id: str, folder_id: str) -> None:
         """
@@ -201,52 +226,59 @@ class FolderManager:
         Auto-categorize all repos into folders based on auto_tags.
 
         This will:
-        1. Get all repos (if not provided)
-        2. Get all folders with auto_tags
-        3. Match repos to folders
-        4. Add repos to matching folders (as non-manual)
+        1. Get all folders with auto_tags
+        2. Match repos to folders
+        3. Add repos to matching folders (as non-manual)
+
+        Without ``repos`` every cached repo is categorized, and the matching
+        runs inside SQLite (one INSERT ... SELECT per folder, all in one
+        transaction) instead of loading the repos into Python. With ``repos``
+        the matches are written for all folders in one transaction.
 
         Args:
-            repos: Optional list of repos to categorize (fetches from cache if None)
+            repos: Optional list of repos to categorize (all cached repos if None)
 
         Returns:
-            Dictionary mapping folder_id -> number of repos added
+            Dictionary mapping folder_id -> number of new links created
         """
-        # Get repos
+        await self._ensure_match_index()
+        folders_with_tags = self._categorize_folders
+
         if repos is None:
-            repos = await self.cache.get_starred_repos()
-            if repos is None:
-                repos = []
-
-        # Auto-categorization only applies to rule/hybrid folders. Curated
-        # folders are user-curated by definition; system folders manage their
-        # own membership.
-        folders = await self.cache.get_virtual_folders()
-        folders_with_tags = [
-            f for f in folders if f.auto_tags and f.kind in ("rule", "hybrid")
-        ]
-
-        stats = {}
-
-        for folder in folders_with_tags:
-            added_count = 0
-
-            for repo in repos:
-                if folder.matches_repo(repo):
-                    # Add to folder (non-manual)
-                    try:
-                        await self.cache.add_repo_to_folder(
-                            repo.id, folder.id, is_manual=False
-                        )
-                        added_count += 1
-                    except Exception:
-                        # Repo might already be in folder
-                        pass
-
-            stats[folder.id] = added_count
+            return await self.cache.link_auto_tag_matches_bulk(
+                (folder.id, folder.auto_tags) for folder in folders_with_tags
+            )
 
+        # Same rule as VirtualFolder.matches_repo, inverted: each repo's
+        # keys are looked up in a tag -> folders index, so a repo only
+        # touches the folders it actually shares a tag with.
+        tag_index = self._categorize_index
+        pairs = []
+        for repo in repos:
+            pairs.extend((folder_id, repo.id) for folder_id in self._match_folders(tag_index, repo))
+
+        # One transaction for every folder (non-manual links)
+        stats = {folder.id: 0 for folder in folders_with_tags}
+        stats.update(await self.cache.add_repos_to_folders_bulk(pairs))
         return stats
 
+    @staticmethod
+    def _build_tag_index(folders: List[VirtualFolder]) -> Dict[str, List[str]]:
+        """Map each lowercased auto_tag to the ids of the folders that use it."""
+        tag_index: Dict[str, List[str]] = defaultdict(list)
+        for folder in folders:
+            for tag in folder.auto_tag_keys():
+                tag_index[tag].append(folder.id)
+        return tag_index
+
+    @staticmethod
+    def _match_folders(tag_index: Dict[str, List[str]], repo: StarredRepo) -> List[str]:
+        """Ids of the indexed folders whose auto_tags match ``repo``."""
+        folder_ids: Dict[str, None] = {}
+        for key in repo.match_keys():
+            folder_ids.update(dict.fromkeys(tag_index.get(key, ())))
+        return list(folder_ids)
+
     async def auto_categorize_repo(self, repo: StarredRepo) -> List[str]:
         """
         Auto-categorize a single repo into matching folders.
@@ -257,24 +289,11 @@ class FolderManager:
         Returns:
             List of folder IDs the repo was added to
         """
-        folders = await self.cache.get_virtual_folders()
-        folders_with_tags = [
-            f for f in folders if f.auto_tags and f.kind in ("rule", "hybrid")
-        ]
-
-        matched_folder_ids = []
-
-        for folder in folders_with_tags:
-            if folder.matches_repo(repo):
-                try:
-                    await self.cache.add_repo_to_folder(
-                        repo.id, folder.id, is_manual=False
-                    )
-                    matched_folder_ids.append(folder.id)
-                except Exception:
-                    # Repo might already be in folder
-                    pass
-
+        await self._ensure_match_index()
+        matched_folder_ids = self._match_folders(self._categorize_index, repo)
+        await self.cache.add_repos_to_folders_bulk(
+            (folder_id, repo.id) for folder_id in matched_folder_ids
+        )
         return matched_folder_ids
 
     async def create_default_folders(
@@ -290,8 +309,13 @@ class FolderManager:
             List of created VirtualFolder objects
         """
         created = []
+        # Probe names up front so existing folders (the common case after
+        # the first run) are skipped without a failed INSERT each.
+        existing_names = {f.name for f in await self.cache.get_virtual_folders()}
 
         for folder_config in default_folders:
+            if folder_config["name"] in existing_names:
+                continue
             tags = folder_config.get("auto_tags", []) or []
             # Default-folder configs from config.yaml are auto-tag-driven, so
             # they're "rule" folders unless explicitly overridden. The "kind"
@@ -306,7 +330,7 @@ class FolderManager:
                 )
                 created.append(folder)
             except CacheError:
-                # Folder already exists, skip
+                # Created concurrently by another process, skip
                 pass
 
         return created
@@ -347,15 +371,20 @@ class FolderManager:
         """
         items = self.clipboard.paste()
 
+        # Move (remove from source, add to target) or copy (just add to
+        # target); each kind is applied in a single transaction.
+        moves = []
+        copies = []
         for item in items:
             if item.operation == "cut" and item.source_folder_id:
-                # Move (remove from source, add to target)
-                await self.move_repo(
-                    item.repo.id, item.source_folder_id, target_folder_id
-                )
+                moves.append((item.repo.id, item.source_folder_id))
             else:
-                # Copy (just add to target)
-                await self.copy_repo(item.repo.id, target_folder_id)
+                copies.append(item.repo.id)
+
+        if moves:
+            await self.cache.move_repos_to_folder(target_folder_id, moves)
+        if copies:
+            await self.cache.add_repos_to_folder(target_folder_id, copies, is_manual=True)
 
         pasted_count = len(items)
 
@@ -394,41 +423,70 @@ class FolderManager:
         Returns:
             Dictionary with folder statistics
         """
-        repos = await self.get_folder_repos(folder_id)
+        stats = await self.cache.get_folder_stats(folder_id)
+        return self._summarize_stats(folder_id, stats)
 
-        # Calculate stats
-        total_stars = sum(repo.stars_count for repo in repos)
-        languages = {}
-        for repo in repos:
-            if repo.language:
-                languages[repo.language] = languages.get(repo.language, 0) + 1
+    async def get_all_folder_stats(self) -> Dict[str, Dict[str, any]]:
+        """
+        Get statistics for every folder in one batch.
+
+        Returns:
+            Dictionary of folder ID -> statistics, as from get_folder_stats
+        """
+        all_stats = await self.cache.get_all_folder_stats()
+        return {
+            folder_id: self._summarize_stats(folder_id, stats)
+            for folder_id, stats in all_stats.items()
+        }
+
+    @staticmethod
+    def _summarize_stats(folder_id: str, stats: Dict[str, any]) -> Dict[str, any]:
+        """Add the derived fields to the cache's raw folder aggregates."""
+        repo_count = stats["repo_count"]
+        total_stars = stats["total_stars"]
+        languages = stats["languages"]
 
         return {
             "folder_id": folder_id,
-            "repo_count": len(repos),
+            "repo_count": repo_count,
             "total_stars": total_stars,
-            "avg_stars": total_stars // len(repos) if repos else 0,
+            "avg_stars": total_stars // repo_count if repo_count else 0,
             "languages": languages,
-            "top_language": max(languages.items(), key=lambda x: x[1])[0]
-            if languages
-            else None,
+            # Most common first
+            "top_language": next(iter(languages), None),
         }
 
     async def suggest_folders_for_repo(self, repo: StarredRepo) -> List[VirtualFolder]:
         """
         Suggest folders for a repo based on auto_tags.
 
+        Looks the repo's keys up in a tag -> folder index that is kept
+        between calls and rebuilt only after folders are created or deleted.
+
         Args:
             repo: StarredRepo to find folders for
 
         Returns:
             List of matching VirtualFolder objects
         """
-        folders = await self.cache.get_virtual_folders()
-        suggestions = []
-
-        for folder in folders:
-            if folder.auto_tags and folder.matches_repo(repo):
-                suggestions.append(folder)
-
-        return suggestions
+        tag_index = await self._ensure_match_index()
+        folders = self._match_index_folders
+        # Keep the folder list's (creation) order
+        positions = {folder_id: i for i, folder_id in enumerate(folders)}
+        matched = sorted(self._match_folders(tag_index, repo), key=positions.__getitem__)
+        return [folders[folder_id] for folder_id in matched]
+
+    async def _ensure_match_index(self) -> Dict[str, List[str]]:
+        """Return the tag -> folder ids index, rebuilding both if folders changed."""
+        version = self.cache.folders_version
+        if self._match_index is None or self._match_index_version != version:
+            folders = [f for f in await self.cache.get_virtual_folders() if f.auto_tags]
+            self._match_index = self._build_tag_index(folders)
+            # Auto-categorization only applies to rule/hybrid folders. Curated
+            # folders are user-curated by definition; system folders manage
+            # their own membership.
+            self._categorize_folders = [f for f in folders if f.kind in ("rule", "hybrid")]
+            self._categorize_index = self._build_tag_index(self._categorize_folders)
+            self._match_index_folders = {folder.id: folder for folder in folders}
+            self._match_index_version = version
+        return self._match_index
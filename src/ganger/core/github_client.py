@@ -8,9 +8,16 @@ Modified: 2025-11-07
 
 import base64
 import logging
-from typing import List, Optional, Dict, Any
-from datetime import datetime
-
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from types import MappingProxyType
+from typing import List, Optional, Dict, Any, Iterator, Mapping, NamedTuple, Tuple
+from urllib.parse import parse_qs, urlparse
+from datetime import datetime, timezone
+
+import httpx
+from dateutil import parser as date_parser
 from github import Github, GithubException
 from ghapi.all import GhApi
 
@@ -22,20 +29,131 @@ from ganger.core.exceptions import (
     RepoNotFoundError,
     AuthenticationError,
 )
+from ganger.utils import fastjson
 from ganger.utils.rate_limiter import RateLimiter
+from ganger.utils.ttl_cache import TTLCache
+
 
+try:
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover - HTTP/2 needs the httpx[http2] extra
+    _HTTP2 = False
+else:
+    _HTTP2 = True
 
 logger = logging.getLogger(__name__)
 
+# Stand-in for absent/null nested GraphQL objects; never mutated.
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+class _ConditionalBody(NamedTuple):
+    """Decoded body of a REST GET, as kept for If-None-Match revalidation.
+
+    Only the parts callers read are kept, not the ``httpx.Response``, so a
+    cached page isn't also held as raw bytes. ``payload`` is shared with the
+    cache; callers must not mutate it.
+    """
+
+    etag: Optional[str]
+    payload: Any
+    links: Dict[str, Dict[str, str]]
+
+# Candidate README paths (and formats), in the order a hit is preferred.
+# Each becomes an aliased `object(expression:)` in one query; REST's readme
+# endpoint is only used if the GraphQL query fails outright.
+_README_PATHS = (
+    ("README.md", "markdown"),
+    ("README.markdown", "markdown"),
+    ("readme.md", "markdown"),
+    ("README.rst", "rst"),
+    ("README.txt", "txt"),
+    ("README", "txt"),
+    ("docs/README.md", "markdown"),
+    (".github/README.md", "markdown"),
+)
+_README_BLOBS = "\n".join(
+    f'    readme{i}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}'
+    for i, (path, _) in enumerate(_README_PATHS)
+)
+_README_FIELDS = f"""
+    databaseId
+    hasIssuesEnabled
+    hasWikiEnabled
+    hasProjectsEnabled
+    openIssues: issues(states: OPEN) {{ totalCount }}
+    openPullRequests: pullRequests(states: OPEN) {{ totalCount }}
+{_README_BLOBS}
+"""
+# Fields read by _build_starred_repo_from_graphql_edge
+_REPO_NODE_FIELDS = """
+    id
+    nameWithOwner
+    name
+    owner { login }
+    description
+    stargazerCount
+    forkCount
+    watchers { totalCount }
+    primaryLanguage { name }
+    repositoryTopics(first: 10) {
+      nodes { topic { name } }
+    }
+    isArchived
+    isPrivate
+    isFork
+    createdAt
+    updatedAt
+    pushedAt
+    url
+    sshUrl
+    homepageUrl
+    defaultBranchRef { name }
+    licenseInfo { name }
+"""
+_README_QUERY = f"""
+query($owner: String!, $name: String!) {{
+  repository(owner: $owner, name: $name) {{{_README_FIELDS}  }}
+}}
+"""
+# Repo fields and README in one round-trip, for get_repo_with_readme
+_REPO_DETAILS_QUERY = f"""
+query($owner: String!, $name: String!) {{
+  repository(owner: $owner, name: $name) {{{_REPO_NODE_FIELDS}{_README_FIELDS}  }}
+}}
+"""
+
 
 class GitHubAPIClient:
     """
     GitHub API client providing high-level operations for starred repos.
 
-    Combines PyGithub (REST) for mutations and ghapi (GraphQL) for efficient
-    bulk queries. This class is the main service layer used by both TUI and MCP.
+    Raw REST and GraphQL requests share one long-lived httpx connection
+    pool, so only the first request pays for the TLS handshake; PyGithub
+    is kept for search and as the README fallback. This class is the main
+    service layer used by both TUI and MCP. Call ``close()`` when done.
     """
 
+    REST_API_URL = "https://api.github.com"
+    # GitHub's maximum page size, and how many REST pages to fetch at once.
+    REST_PAGE_SIZE = 100
+    REST_PAGE_WORKERS = 8
+
+    # Short-lived memoization for calls the UI polls. Rate status is cheap
+    # to be a few seconds stale; repo lookups are dropped on star/unstar.
+    RATE_LIMIT_CACHE_TTL = 5
+    REPO_CACHE_TTL = 60
+    REPO_CACHE_SIZE = 512
+
+    # Decoded body of the last 200 per REST URL, revalidated with
+    # If-None-Match; a 304 costs no rate limit, carries no body and reuses
+    # the decoded payload without re-parsing. Bounded by the raw body bytes
+    # of the entries (the decoded form is a few times larger), and kept no
+    # longer than the MCP server's default cache TTL.
+    ETAG_CACHE_TTL = 60 * 60
+    ETAG_CACHE_SIZE = 1024
+    ETAG_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
     def __init__(self, auth: GitHubAuth, rate_limit_buffer: int = 100):
         """
         Initialize GitHub API client.
@@ -52,6 +170,122 @@ class GitHubAPIClient:
         # Cache for current user
         self._user = None
 
+        self._rate_cache = TTLCache(maxsize=1, ttl=self.RATE_LIMIT_CACHE_TTL)
+        self._repo_cache = TTLCache(maxsize=self.REPO_CACHE_SIZE, ttl=self.REPO_CACHE_TTL)
+        self._etag_cache = TTLCache(
+            maxsize=self.ETAG_CACHE_SIZE,
+            ttl=self.ETAG_CACHE_TTL,
+            maxweight=self.ETAG_CACHE_MAX_BYTES,
+        )
+
+        # Created on first use; see _http_client()
+        self._http: Optional[httpx.Client] = None
+        self._http_lock = threading.Lock()
+
+    def _http_client(self) -> httpx.Client:
+        """Return the shared keep-alive client for raw REST and GraphQL calls.
+
+        Safe to call from the worker threads blocking calls run on.
+        """
+        http = self._http
+        if http is None:
+            with self._http_lock:
+                if self._http is None:
+                    self._http = httpx.Client(
+                        base_url=self.REST_API_URL,
+                        headers={
+                            "Authorization": f"token {self.auth.get_token()}",
+                            "Accept": "application/vnd.github+json",
+                        },
+                        timeout=30,
+                        http2=_HTTP2,
+                        event_hooks={"response": [self._observe_rate_limit]},
+                    )
+                http = self._http
+        return http
+
+    def _observe_rate_limit(self, response: httpx.Response) -> None:
+        """Sync the rate limiter with the quota headers GitHub sent back.
+
+        Only the core REST quota is tracked; search and GraphQL responses
+        report their own separate limits.
+        """
+        if response.headers.get("X-RateLimit-Resource", "core") == "core":
+            self.rate_limiter.update_from_headers(response.headers)
+
+    def close(self) -> None:
+        """Close the shared HTTP connection pool (reopened if used again)."""
+        with self._http_lock:
+            http, self._http = self._http, None
+        if http is not None:
+            http.close()
+
+    @staticmethod
+    def _check_response(response: httpx.Response) -> httpx.Response:
+        """Map HTTP error statuses to Ganger errors; 404 is left to the caller."""
+        if response.status_code == 401:
+            raise AuthenticationError("GitHub authentication failed")
+        if response.status_code in (403, 429) and "rate limit" in response.text.lower():
+            raise RateLimitExceededError(response.text)
+        if response.status_code >= 400:
+            raise GangerError(f"GitHub API error: {response.status_code} {response.text}")
+        return response
+
+    def _get_conditional(
+        self,
+        http: httpx.Client,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        not_found: Optional[str] = None,
+    ) -> Tuple[_ConditionalBody, bool]:
+        """GET and decode ``path``, revalidating any previous copy with its ETag.
+
+        Args:
+            http: Shared HTTP client
+            path: REST path
+            params: Query parameters
+            headers: Extra request headers
+            not_found: If set, a 404 raises RepoNotFoundError with this message
+
+        Returns:
+            Tuple of (body, not_modified). On a 304 the stored body is
+            returned and ``not_modified`` is True; the request didn't count
+            against the rate limit.
+        """
+        request = http.build_request("GET", path, params=params, headers=headers)
+        key = self._etag_key(request.url)
+        cached = self._etag_cache.get(key)
+        if cached is not None:
+            request.headers["If-None-Match"] = cached.etag
+
+        response = http.send(request)
+        if response.status_code == 304 and cached is not None:
+            return cached, True
+        if response.status_code == 404 and not_found is not None:
+            raise RepoNotFoundError(not_found)
+        self._check_response(response)
+
+        body = _ConditionalBody(
+            response.headers.get("ETag"), self._decode(response), response.links
+        )
+        if body.etag:
+            self._etag_cache.set(key, body, weight=len(response.content))
+        return body, False
+
+    @staticmethod
+    def _etag_key(url: httpx.URL) -> str:
+        """ETag cache key for a request URL (GitHub paths are case-insensitive)."""
+        return str(url).lower()
+
+    @staticmethod
+    def _decode(response: httpx.Response) -> Any:
+        """Decode a JSON response body (orjson when installed)."""
+        try:
+            return fastjson.loads(response.content)
+        except fastjson.JSONDecodeError as e:
+            raise GangerError(f"Invalid JSON from GitHub API: {e}")
+
     def get_starred_repos(
         self, max_count: Optional[int] = None, use_graphql: bool = True
     ) -> List[StarredRepo]:
@@ -79,50 +313,75 @@ class GitHubAPIClient:
             return self._get_starred_rest(max_count)
 
     def _get_starred_rest(self, max_count: Optional[int] = None) -> List[StarredRepo]:
-        """Get starred repos using REST API (PyGithub)."""
-        try:
-            user = self.rest_api.get_user()
-            starred = user.get_starred()
+        """Get starred repos using the REST API.
 
-            repos = []
-            for i, repo in enumerate(starred):
-                if max_count and i >= max_count:
-                    break
-
-                # REST does not expose starred_at; leave it unset instead of inventing a value.
-                starred_repo = StarredRepo.from_github_response(
-                    repo,
-                    starred_at=None,
-                    include_topics=False,
-                )
-                repos.append(starred_repo)
-
-            self.rate_limiter.track_request("list_starred")
+        Page 1 is fetched first; its ``Link: rel="last"`` header gives the
+        page count, and the remaining pages are then fetched concurrently
+        (in page order). The ``star+json`` media type adds each star's real
+        ``starred_at`` and the REST payload already carries topics.
+        """
+        per_page = min(max_count, self.REST_PAGE_SIZE) if max_count else self.REST_PAGE_SIZE
 
-            return repos
+        http = self._http_client()
+        try:
+            first, not_modified = self._get_starred_rest_page(http, 1, per_page)
+            if not not_modified:
+                self.rate_limiter.track_request("list_starred")
+            last_page = self._last_page_number(first.links)
+            if max_count:
+                last_page = min(last_page, -(-max_count // per_page))
+
+            items = list(first.payload)
+            if last_page > 1:
+                with ThreadPoolExecutor(
+                    max_workers=min(self.REST_PAGE_WORKERS, last_page - 1),
+                    thread_name_prefix="ganger-rest",
+                ) as pool:
+                    pages = pool.map(
+                        lambda page: self._get_starred_rest_page(http, page, per_page),
+                        range(2, last_page + 1),
+                    )
+                    for body, not_modified in pages:
+                        if not not_modified:
+                            self.rate_limiter.track_request("list_starred")
+                        items.extend(body.payload)
+        except httpx.HTTPError as e:
+            raise GangerError(f"GitHub API error: {e}")
+
+        if max_count:
+            items = items[:max_count]
+        return [
+            StarredRepo.from_rest_json(item["repo"], item.get("starred_at"))
+            for item in items
+        ]
+
+    def _get_starred_rest_page(
+        self, http: httpx.Client, page: int, per_page: int
+    ) -> Tuple[_ConditionalBody, bool]:
+        """Fetch one decoded page of ``/user/starred``.
+
+        Returns the page and whether it was unchanged (see ``_get_conditional``).
+        """
+        return self._get_conditional(
+            http,
+            "/user/starred",
+            params={"per_page": per_page, "page": page},
+            headers={"Accept": "application/vnd.github.star+json"},
+        )
 
-        except GithubException as e:
-            if e.status == 401:
-                raise AuthenticationError("GitHub authentication failed")
-            elif e.status == 403 and "rate limit" in str(e).lower():
-                raise RateLimitExceededError(str(e))
-            else:
-                raise GangerError(f"GitHub API error: {e}")
+    @staticmethod
+    def _last_page_number(links: Mapping[str, Mapping[str, str]]) -> int:
+        """Page number of the ``rel="last"`` link, or 1 when there's only one page."""
+        last = links.get("last")
+        if not last:
+            return 1
+        query = parse_qs(urlparse(last["url"]).query)
+        return int(query.get("page", ["1"])[0])
 
     def _get_starred_graphql(self) -> List[StarredRepo]:
         """Get starred repos using GraphQL (faster for bulk operations)."""
-        repos = []
-        cursor = None
-        has_next_page = True
-
         try:
-            while has_next_page:
-                page = self.get_starred_repos_page(cursor=cursor)
-                repos.extend(page["repos"])
-                has_next_page = page["has_next_page"]
-                cursor = page["end_cursor"]
-
-            return repos
+            return [repo for page in self.iter_starred_pages() for repo in page]
 
         except (AuthenticationError, GangerError, RateLimitExceededError):
             raise
@@ -131,43 +390,98 @@ class GitHubAPIClient:
             logger.warning("GraphQL query failed, falling back to REST API: %s", e)
             return self._get_starred_rest()
 
+    def iter_starred_pages(self) -> Iterator[List[StarredRepo]]:
+        """Yield starred repos one GraphQL page at a time.
+
+        Pages are cursor-chained, so they're still requested one at a time,
+        but the next request goes out (on a worker thread) as soon as a
+        page's ``endCursor`` is known, and overlaps with parsing that page
+        and with whatever the caller does with it.
+
+        Yields:
+            Lists of up to 100 StarredRepo objects, newest star first
+        """
+        # Not a context manager: its exit waits for the worker, so closing
+        # the generator early would block for a whole GraphQL round-trip.
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ganger-graphql")
+        try:
+            pending = pool.submit(self._fetch_starred_page, None)
+            while pending is not None:
+                data = pending.result()
+                page_info = data.get("pageInfo", {})
+                pending = None
+                if page_info.get("hasNextPage", False):
+                    pending = pool.submit(
+                        self._fetch_starred_page, page_info.get("endCursor")
+                    )
+                yield [
+                    self._build_starred_repo_from_graphql_edge(edge)
+                    for edge in data.get("edges", [])
+                ]
+        finally:
+            # Abandoned early: a request already in flight can't be
+            # cancelled, so let it finish in the background and drop its
+            # result instead of waiting for it.
+            pool.shutdown(wait=False, cancel_futures=True)
+
     def get_starred_repos_page(
         self,
         cursor: Optional[str] = None,
         page_size: int = 100,
+        starred_after: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """Fetch a single GraphQL page of starred repositories, newest first.
+
+        Args:
+            cursor: ``endCursor`` of the previous page, or None for the first
+            page_size: Number of stars per page
+            starred_after: Only return stars newer than this; once an older
+                star is reached the page reports no next page
+
+        Returns:
+            Dict with ``repos``, ``total_count``, ``has_next_page`` and ``end_cursor``
+        """
+        data = self._fetch_starred_page(cursor, page_size)
+        page_info = data.get("pageInfo", {})
+        repos = [self._build_starred_repo_from_graphql_edge(edge) for edge in data.get("edges", [])]
+        has_next_page = page_info.get("hasNextPage", False)
+
+        if starred_after is not None:
+            if starred_after.tzinfo is None:
+                # GitHub timestamps are UTC; cached ones may be naive.
+                starred_after = starred_after.replace(tzinfo=timezone.utc)
+            for index, repo in enumerate(repos):
+                if repo.starred_at is not None and repo.starred_at <= starred_after:
+                    del repos[index:]
+                    has_next_page = False
+                    break
+
+        return {
+            "repos": repos,
+            "total_count": data.get("totalCount"),
+            "has_next_page": has_next_page,
+            "end_cursor": page_info.get("endCursor"),
+        }
+
+    def _fetch_starred_page(
+        self,
+        cursor: Optional[str],
+        page_size: int = 100,
     ) -> Dict[str, Any]:
-        """Fetch a single GraphQL page of starred repositories."""
+        """Request one page and return its raw `starredRepositories` payload."""
         query = """
         query($cursor: String, $pageSize: Int!) {
           viewer {
-            starredRepositories(first: $pageSize, after: $cursor) {
+            starredRepositories(
+              first: $pageSize
+              after: $cursor
+              orderBy: {field: STARRED_AT, direction: DESC}
+            ) {
               totalCount
               edges {
                 starredAt
                 node {
-                  id
-                  nameWithOwner
-                  name
-                  owner { login }
-                  description
-                  stargazerCount
-                  forkCount
-                  watchers { totalCount }
-                  primaryLanguage { name }
-                  repositoryTopics(first: 10) {
-                    nodes { topic { name } }
-                  }
-                  isArchived
-                  isPrivate
-                  isFork
-                  createdAt
-                  updatedAt
-                  pushedAt
-                  url
-                  sshUrl
-                  homepageUrl
-                  defaultBranchRef { name }
-                  licenseInfo { name }
+""" + _REPO_NODE_FIELDS + """
                 }
               }
               pageInfo {
@@ -184,19 +498,10 @@ class GitHubAPIClient:
 
         result = self._execute_graphql_query(query, variables)
         data = self._extract_starred_repositories_payload(result)
-        edges = data.get("edges", [])
-
-        repos = [self._build_starred_repo_from_graphql_edge(edge) for edge in edges]
-        page_info = data.get("pageInfo", {})
 
         self.rate_limiter.track_request("bulk_graphql")
 
-        return {
-            "repos": repos,
-            "total_count": data.get("totalCount"),
-            "has_next_page": page_info.get("hasNextPage", False),
-            "end_cursor": page_info.get("endCursor"),
-        }
+        return data
 
     def _execute_graphql_query(self, query: str, variables: Dict[str, Any]) -> Any:
         """Execute a GitHub GraphQL query.
@@ -209,14 +514,29 @@ class GitHubAPIClient:
         if graphql_group is not None and hasattr(graphql_group, "query"):
             return graphql_group.query(query, variables=variables)
 
-        return self.graphql_api(
+        # Same pooled connection as the REST calls, rather than a new one
+        # per page through ghapi; pages run to 100KB+, so both directions
+        # go through fastjson instead of stdlib json.
+        response = self._http_client().post(
             "/graphql",
-            verb="POST",
-            data={"query": query, "variables": variables},
+            content=fastjson.dumps({"query": query, "variables": variables}),
+            headers={"Content-Type": "application/json"},
         )
+        return self._decode(self._check_response(response))
 
     def _extract_starred_repositories_payload(self, result: Any) -> Dict[str, Any]:
         """Normalize a GraphQL response to the `starredRepositories` payload."""
+        payload = self._graphql_data(result)
+        viewer = payload.get("viewer")
+        if viewer is None:
+            logger.warning("GitHub GraphQL response missing 'viewer'; treating as empty result")
+            return {}
+
+        return viewer.get("starredRepositories", {})
+
+    @staticmethod
+    def _graphql_data(result: Any) -> Dict[str, Any]:
+        """Return a GraphQL response's ``data``, raising on reported errors."""
         if not hasattr(result, "get"):
             raise GangerError("GitHub GraphQL response was not a JSON object")
 
@@ -233,61 +553,52 @@ class GitHubAPIClient:
                 raise RateLimitExceededError(error_messages)
             if any("bad credentials" in error.get("message", "").lower() for error in errors):
                 raise AuthenticationError("GitHub authentication failed")
+            if any(error.get("type") == "NOT_FOUND" for error in errors):
+                raise RepoNotFoundError(error_messages)
             raise GangerError(f"GitHub GraphQL error: {error_messages}")
 
-        payload = result.get("data", result)
-        viewer = payload.get("viewer")
-        if viewer is None:
-            logger.warning("GitHub GraphQL response missing 'viewer'; treating as empty result")
-            return {}
-
-        return viewer.get("starredRepositories", {})
+        return result.get("data", result)
 
     def _build_starred_repo_from_graphql_edge(self, edge: Dict[str, Any]) -> StarredRepo:
-        """Build a `StarredRepo` from a GraphQL edge."""
-        node = edge["node"]
-        topics = []
-        topic_nodes = node.get("repositoryTopics", {}).get("nodes", [])
-        for topic_node in topic_nodes:
-            topic_name = topic_node.get("topic", {}).get("name")
-            if topic_name:
-                topics.append(topic_name)
-
-        language = None
-        if node.get("primaryLanguage"):
-            language = node["primaryLanguage"]["name"]
+        """Build a `StarredRepo` from a GraphQL edge.
 
-        license_name = None
-        if node.get("licenseInfo"):
-            license_name = node["licenseInfo"]["name"]
+        Runs once per starred repo on every sync, so nested objects are read
+        with one lookup each and absent/null ones fall back to a shared
+        empty mapping instead of a fresh ``{}`` per access.
+        """
+        node = edge["node"]
+        get = node.get
+        parse = self._parse_datetime
 
-        default_branch = "main"
-        if node.get("defaultBranchRef"):
-            default_branch = node["defaultBranchRef"]["name"]
+        topics = [
+            name
+            for topic_node in (get("repositoryTopics") or _EMPTY).get("nodes") or ()
+            if (name := (topic_node.get("topic") or _EMPTY).get("name"))
+        ]
 
         return StarredRepo(
             id=node["id"],
             full_name=node["nameWithOwner"],
             name=node["name"],
             owner=node["owner"]["login"],
-            description=node.get("description") or "",
-            stars_count=node.get("stargazerCount", 0),
-            forks_count=node.get("forkCount", 0),
-            watchers_count=node.get("watchers", {}).get("totalCount", 0),
-            language=language,
+            description=get("description") or "",
+            stars_count=get("stargazerCount", 0),
+            forks_count=get("forkCount", 0),
+            watchers_count=(get("watchers") or _EMPTY).get("totalCount", 0),
+            language=(get("primaryLanguage") or _EMPTY).get("name"),
             topics=topics,
-            is_archived=node.get("isArchived", False),
-            is_private=node.get("isPrivate", False),
-            is_fork=node.get("isFork", False),
-            created_at=self._parse_datetime(node.get("createdAt")),
-            updated_at=self._parse_datetime(node.get("updatedAt")),
-            pushed_at=self._parse_datetime(node.get("pushedAt")),
-            starred_at=self._parse_datetime(edge.get("starredAt")),
-            url=node.get("url", ""),
-            clone_url=node.get("sshUrl", ""),
-            homepage=node.get("homepageUrl"),
-            default_branch=default_branch,
-            license=license_name,
+            is_archived=get("isArchived", False),
+            is_private=get("isPrivate", False),
+            is_fork=get("isFork", False),
+            created_at=parse(get("createdAt")),
+            updated_at=parse(get("updatedAt")),
+            pushed_at=parse(get("pushedAt")),
+            starred_at=parse(edge.get("starredAt")),
+            url=get("url", ""),
+            clone_url=get("sshUrl", ""),
+            homepage=get("homepageUrl"),
+            default_branch=(get("defaultBranchRef") or _EMPTY).get("name", "main"),
+            license=(get("licenseInfo") or _EMPTY).get("name"),
         )
 
     def get_repo(self, full_name: str) -> StarredRepo:
@@ -303,16 +614,28 @@ class GitHubAPIClient:
         Raises:
             RepoNotFoundError: If repository not found
         """
+        cached = self._repo_cache.get(full_name.lower())
+        if cached is not None:
+            return replace(cached)
+
         self.rate_limiter.wait_if_needed()
 
         try:
-            repo = self.rest_api.get_repo(full_name)
-            self.rate_limiter.track_request("get_repo")
-            return StarredRepo.from_github_response(repo)
-        except GithubException as e:
-            if e.status == 404:
-                raise RepoNotFoundError(f"Repository not found: {full_name}")
+            body, not_modified = self._get_conditional(
+                self._http_client(),
+                f"/repos/{full_name}",
+                not_found=f"Repository not found: {full_name}",
+            )
+        except httpx.HTTPError as e:
             raise GangerError(f"Error fetching repo: {e}")
+        if not not_modified:
+            self.rate_limiter.track_request("get_repo")
+        # The REST payload carries topics, so no second call is needed
+        starred_repo = StarredRepo.from_rest_json(body.payload)
+
+        # Callers get their own copy; UI state set on one mustn't leak.
+        self._repo_cache.set(full_name.lower(), starred_repo)
+        return replace(starred_repo)
 
     def star_repo(self, full_name: str) -> None:
         """
@@ -324,17 +647,7 @@ class GitHubAPIClient:
         Raises:
             RepoNotFoundError: If repository not found
         """
-        self.rate_limiter.wait_if_needed()
-
-        try:
-            repo = self.rest_api.get_repo(full_name)
-            user = self.rest_api.get_user()
-            user.add_to_starred(repo)
-            self.rate_limiter.track_request("star_repo")
-        except GithubException as e:
-            if e.status == 404:
-                raise RepoNotFoundError(f"Repository not found: {full_name}")
-            raise GangerError(f"Error starring repo: {e}")
+        self._set_starred(full_name, "PUT", "star_repo")
 
     def unstar_repo(self, full_name: str) -> None:
         """
@@ -346,17 +659,24 @@ class GitHubAPIClient:
         Raises:
             RepoNotFoundError: If repository not found
         """
+        self._set_starred(full_name, "DELETE", "unstar_repo")
+
+    def _set_starred(self, full_name: str, method: str, operation: str) -> None:
+        """PUT (star) or DELETE (unstar) ``/user/starred/{owner}/{repo}``."""
         self.rate_limiter.wait_if_needed()
 
         try:
-            repo = self.rest_api.get_repo(full_name)
-            user = self.rest_api.get_user()
-            user.remove_from_starred(repo)
-            self.rate_limiter.track_request("unstar_repo")
-        except GithubException as e:
-            if e.status == 404:
-                raise RepoNotFoundError(f"Repository not found: {full_name}")
-            raise GangerError(f"Error unstarring repo: {e}")
+            response = self._http_client().request(method, f"/user/starred/{full_name}")
+        except httpx.HTTPError as e:
+            raise GangerError(f"Error updating star: {e}")
+        if response.status_code == 404:
+            raise RepoNotFoundError(f"Repository not found: {full_name}")
+        self._check_response(response)
+        self._repo_cache.pop(full_name.lower())
+        # Its star count changed; don't keep the old body around to revalidate
+        repo_url = self._http_client().build_request("GET", f"/repos/{full_name}").url
+        self._etag_cache.pop(self._etag_key(repo_url))
+        self.rate_limiter.track_request(operation)
 
     def get_readme(self, full_name: str) -> Optional[RepoMetadata]:
         """
@@ -373,6 +693,97 @@ class GitHubAPIClient:
         """
         self.rate_limiter.wait_if_needed()
 
+        try:
+            metadata = self._get_readme_graphql(full_name)
+        except (AuthenticationError, RateLimitExceededError, RepoNotFoundError):
+            raise
+        except Exception as e:
+            logger.warning("GraphQL README query failed, falling back to REST API: %s", e)
+            return self._get_readme_rest(full_name)
+
+        self.rate_limiter.track_request("get_readme")
+        return metadata
+
+    def _get_readme_graphql(self, full_name: str) -> RepoMetadata:
+        """Fetch repo flags and README text in one GraphQL round-trip.
+
+        Blob text comes back already decoded, so there's no base64 step.
+        """
+        return self._metadata_from_graphql(self._query_repository(_README_QUERY, full_name))
+
+    def _query_repository(self, query: str, full_name: str) -> Dict[str, Any]:
+        """Run a ``repository(owner, name)`` query and return that object."""
+        owner, _, name = full_name.partition("/")
+        data = self._graphql_data(
+            self._execute_graphql_query(query, {"owner": owner, "name": name})
+        )
+        repo = data.get("repository")
+        if repo is None:
+            raise RepoNotFoundError(f"Repository not found: {full_name}")
+        return repo
+
+    @staticmethod
+    def _metadata_from_graphql(repo: Dict[str, Any]) -> RepoMetadata:
+        """Build RepoMetadata from a repository queried with the README fields."""
+        readme_content = None
+        readme_format = "markdown"
+        for i, (_, fmt) in enumerate(_README_PATHS):
+            blob = repo.get(f"readme{i}")
+            if blob and blob.get("text") is not None:
+                readme_content = blob["text"]
+                readme_format = fmt
+                break
+
+        return RepoMetadata(
+            repo_id=str(repo["databaseId"]),
+            readme_content=readme_content,
+            readme_format=readme_format,
+            has_issues=repo.get("hasIssuesEnabled", True),
+            # REST's open_issues_count includes open pull requests
+            open_issues_count=(repo.get("openIssues") or _EMPTY).get("totalCount", 0)
+            + (repo.get("openPullRequests") or _EMPTY).get("totalCount", 0),
+            has_wiki=repo.get("hasWikiEnabled", False),
+            has_projects=repo.get("hasProjectsEnabled", False),
+            # Not exposed over GraphQL
+            has_pages=False,
+            cached_at=datetime.now(),
+        )
+
+    def get_repo_with_readme(self, full_name: str) -> Tuple[StarredRepo, Optional[RepoMetadata]]:
+        """
+        Get a repository and its README/metadata in one GraphQL request.
+
+        Falls back to get_repo() and get_readme(), run concurrently, if the
+        query fails for a reason other than auth, rate limit or a missing repo.
+
+        Args:
+            full_name: Repository full name (e.g., "octocat/Hello-World")
+
+        Returns:
+            Tuple of (StarredRepo, RepoMetadata or None)
+
+        Raises:
+            RepoNotFoundError: If repository not found
+        """
+        self.rate_limiter.wait_if_needed()
+
+        try:
+            repo = self._query_repository(_REPO_DETAILS_QUERY, full_name)
+        except (AuthenticationError, RateLimitExceededError, RepoNotFoundError):
+            raise
+        except Exception as e:
+            logger.warning("GraphQL repo query failed, falling back to REST API: %s", e)
+            # The two calls are independent, so overlap them
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ganger-rest") as pool:
+                readme = pool.submit(self.get_readme, full_name)
+                return self.get_repo(full_name), readme.result()
+
+        self.rate_limiter.track_request("get_repo")
+        starred_repo = self._build_starred_repo_from_graphql_edge({"node": repo})
+        return starred_repo, self._metadata_from_graphql(repo)
+
+    def _get_readme_rest(self, full_name: str) -> Optional[RepoMetadata]:
+        """Fetch README and metadata with two REST calls (repo, then readme)."""
         try:
             repo = self.rest_api.get_repo(full_name)
 
@@ -430,23 +841,32 @@ class GitHubAPIClient:
         """
         self.rate_limiter.wait_if_needed()
 
-        try:
-            results = self.rest_api.search_repositories(query)
-            repos = []
-
-            for i, repo in enumerate(results):
-                if i >= max_results:
-                    break
-                starred_repo = StarredRepo.from_github_response(repo, include_topics=False)
-                repos.append(starred_repo)
-
+        # Raw search JSON already includes topics; PyGithub's objects would
+        # need a get_topics() call per result.
+        http = self._http_client()
+        per_page = min(max_results, self.REST_PAGE_SIZE)
+        repos: List[StarredRepo] = []
+        page = 1
+        while len(repos) < max_results:
+            try:
+                response = http.get(
+                    "/search/repositories",
+                    params={"q": query, "per_page": per_page, "page": page},
+                )
+            except httpx.HTTPError as e:
+                raise GangerError(f"Search error: {e}")
+            if response.status_code >= 400 and response.status_code not in (401, 403, 429):
+                raise GangerError(f"Search error: {response.status_code} {response.text}")
+            self._check_response(response)
             self.rate_limiter.track_request("search")
-            return repos
 
-        except GithubException as e:
-            if e.status == 403 and "rate limit" in str(e).lower():
-                raise RateLimitExceededError(str(e))
-            raise GangerError(f"Search error: {e}")
+            items = self._decode(response).get("items") or []
+            repos.extend(StarredRepo.from_rest_json(item) for item in items)
+            if len(items) < per_page:
+                break
+            page += 1
+
+        return repos[:max_results]
 
     def get_rate_limit_status(self) -> Dict[str, Any]:
         """
@@ -455,32 +875,48 @@ class GitHubAPIClient:
         Returns:
             Dictionary with rate limit information
         """
+        cached = self._rate_cache.get("core")
+        if cached is not None:
+            return dict(cached)
+
         try:
-            rate_limit = self.rest_api.get_rate_limit()
-            core = rate_limit.core
+            response = self._check_response(self._http_client().get("/rate_limit"))
+            core = self._decode(response)["resources"]["core"]
+            # Local time, like RateLimiter.update_from_headers
+            reset = datetime.fromtimestamp(core["reset"]) if core.get("reset") else None
 
             status = {
-                "limit": core.limit,
-                "remaining": core.remaining,
-                "reset": core.reset.isoformat() if core.reset else None,
-                "used": core.limit - core.remaining,
+                "limit": core["limit"],
+                "remaining": core["remaining"],
+                "reset": reset.isoformat() if reset else None,
+                "used": core["limit"] - core["remaining"],
             }
             self.rate_limiter.hourly_quota = status["limit"]
             self.rate_limiter.quota_used = status["used"]
-            self.rate_limiter.reset_time = core.reset
+            self.rate_limiter.reset_time = reset
             self.rate_limiter.last_check = datetime.now()
-            return status
+            self._rate_cache.set("core", status)
+            return dict(status)
         except Exception as e:
             return {"error": str(e)}
 
     @staticmethod
     def _parse_datetime(dt_str: Optional[str]) -> Optional[datetime]:
-        """Parse ISO datetime string to datetime object."""
+        """Parse ISO datetime string to datetime object.
+
+        GitHub always sends ``YYYY-MM-DDTHH:MM:SSZ``, which the C-level
+        ``fromisoformat`` handles once the ``Z`` is spelled as an offset
+        (3.10 rejects it); anything else falls back to dateutil.
+        """
         if not dt_str:
             return None
         try:
-            from dateutil import parser
-
-            return parser.parse(dt_str)
+            if dt_str.endswith("Z"):
+                return datetime.fromisoformat(dt_str[:-1] + "+00:00")
+            return datetime.fromisoformat(dt_str)
+        except ValueError:
+            pass
+        try:
+            return date_parser.parse(dt_str)
         except Exception:
             return None
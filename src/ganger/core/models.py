@@ -6,26 +6,73 @@ Adapted from yanger's data model pattern for GitHub stars management.
 Modified: 2025-11-07
 """
 
+from bisect import bisect_right
 from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import repeat
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from typing import Dict, FrozenSet, List, Optional, Any, Sequence, Set
 from dateutil import parser as date_parser
 
+from ganger.utils import fastjson
 
-class PrivacyStatus(Enum):
-    """Repository privacy status."""
+
+# starred_repos columns that are cache bookkeeping, not StarredRepo fields
+_CACHE_ONLY_COLUMNS = frozenset(("cached_at", "accessed_at"))
+_REPO_DATETIME_FIELDS = ("created_at", "updated_at", "pushed_at", "starred_at")
+_FOLDER_DATETIME_FIELDS = ("created_at", "updated_at")
+
+# format_updated buckets: ages below each bound (in days) use the matching
+# (days per unit, suffix); older than the last bound counts in years.
+_AGE_BOUNDS = (7, 30, 365)
+_AGE_UNITS = ((1, "d"), (7, "w"), (30, "mo"), (365, "y"))
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse a stored timestamp, fast-pathing the ISO format the cache writes.
+
+    Falls back to dateutil for anything ``fromisoformat`` rejects. A trailing
+    ``Z`` (GitHub's UTC suffix) is rewritten first, since Python 3.10's
+    ``fromisoformat`` doesn't accept it.
+    """
+    try:
+        if value.endswith("Z"):
+            return datetime.fromisoformat(value[:-1] + "+00:00")
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return date_parser.parse(value)
+
+
+@lru_cache(maxsize=4096)
+def _format_stars(count: int) -> str:
+    """Star count for display; memoized since many repos share a count."""
+    if count >= 1000:
+        return f"{count / 1000:.1f}k"
+    return str(count)
+
+
+def _parse_optional_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """``_parse_timestamp`` for API fields that may be null."""
+    return _parse_timestamp(value) if value else None
+
+
+class PrivacyStatus(str, Enum):
+    """Repository privacy status (members compare equal to their string values)."""
 
     PUBLIC = "public"
     PRIVATE = "private"
 
 
-@dataclass
+@dataclass(slots=True)
 class StarredRepo:
     """
     Represents a starred GitHub repository.
 
     Mirrors GitHub's repository data structure with additional UI state.
+    Slotted: the TUI holds one per star for the whole session, so the
+    per-instance ``__dict__`` is dropped. Not frozen, since ``user_tags``
+    is hydrated and the UI flags are toggled in place.
     """
 
     # Core GitHub data
@@ -74,6 +121,10 @@ class StarredRepo:
         """
         Create a StarredRepo from PyGithub's Repository object.
 
+        Each attribute goes through PyGithub's lazy-loading properties and
+        topics cost an extra request; prefer ``from_rest_json`` when the raw
+        REST payload is at hand.
+
         Args:
             repo: PyGithub Repository object
             starred_at: When the repo was starred (may not be in API response)
@@ -106,6 +157,51 @@ class StarredRepo:
             license=repo.license.name if repo.license else None,
         )
 
+    @classmethod
+    def from_rest_json(
+        cls, repo: Dict[str, Any], starred_at: Optional[str] = None
+    ) -> "StarredRepo":
+        """
+        Create a StarredRepo from a raw REST repository object.
+
+        Reads the decoded JSON directly. REST repository payloads (including
+        search results) already carry ``topics``, so no follow-up call is needed.
+
+        Args:
+            repo: Repository object as decoded from the REST API
+            starred_at: ``starred_at`` from the enclosing ``star+json`` item, if any
+
+        Returns:
+            StarredRepo instance
+        """
+        get = repo.get
+        license_info = get("license")
+
+        return cls(
+            id=str(repo["id"]),
+            full_name=repo["full_name"],
+            name=repo["name"],
+            owner=repo["owner"]["login"],
+            description=get("description") or "",
+            stars_count=get("stargazers_count") or 0,
+            forks_count=get("forks_count") or 0,
+            watchers_count=get("watchers_count") or 0,
+            language=get("language"),
+            topics=list(get("topics") or ()),
+            is_archived=get("archived", False),
+            is_private=get("private", False),
+            is_fork=get("fork", False),
+            created_at=_parse_optional_timestamp(get("created_at")),
+            updated_at=_parse_optional_timestamp(get("updated_at")),
+            pushed_at=_parse_optional_timestamp(get("pushed_at")),
+            starred_at=_parse_optional_timestamp(starred_at),
+            url=get("html_url", ""),
+            clone_url=get("clone_url", ""),
+            homepage=get("homepage"),
+            default_branch=get("default_branch") or "main",
+            license=license_info.get("name") if license_info else None,
+        )
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "StarredRepo":
         """Create a StarredRepo from a dictionary (e.g., from cache)."""
@@ -117,22 +213,20 @@ class StarredRepo:
         data.pop("accessed_at", None)
 
         # Parse datetime fields
-        for field in ["created_at", "updated_at", "pushed_at", "starred_at"]:
-            if field in data and data[field] and isinstance(data[field], str):
-                data[field] = date_parser.parse(data[field])
+        for name in _REPO_DATETIME_FIELDS:
+            value = data.get(name)
+            if value and isinstance(value, str):
+                data[name] = _parse_timestamp(value)
 
-        # Ensure topics is a list
+        # Cache rows (and exports written before to_dict emitted lists)
+        # still carry topics as a JSON string
         if "topics" in data and isinstance(data["topics"], str):
-            import json
-
-            data["topics"] = json.loads(data["topics"])
+            data["topics"] = fastjson.loads(data["topics"])
 
         # user_tags may arrive as a JSON string (export envelope) or be absent
         # (cache row — populated separately via the user_tags table).
         if "user_tags" in data and isinstance(data["user_tags"], str):
-            import json
-
-            data["user_tags"] = json.loads(data["user_tags"])
+            data["user_tags"] = fastjson.loads(data["user_tags"])
 
         # SQLite stores BOOLEAN as INTEGER; coerce so the dataclass field is
         # genuinely a bool.
@@ -141,10 +235,29 @@ class StarredRepo:
 
         return cls(**data)
 
+    @classmethod
+    def from_row(cls, row: Any) -> "StarredRepo":
+        """Create a StarredRepo from a ``starred_repos`` row (``sqlite3.Row``).
+
+        Equivalent to ``from_dict(dict(row))`` without the two intermediate
+        dicts, and ISO timestamps skip dateutil's general-purpose parser.
+        """
+        kwargs = {key: row[key] for key in row.keys() if key not in _CACHE_ONLY_COLUMNS}
+        for name in _REPO_DATETIME_FIELDS:
+            value = kwargs.get(name)
+            if value and isinstance(value, str):
+                kwargs[name] = _parse_timestamp(value)
+        if isinstance(kwargs.get("topics"), str):
+            kwargs["topics"] = fastjson.loads(kwargs["topics"])
+        if "is_stub" in kwargs:
+            kwargs["is_stub"] = bool(kwargs["is_stub"])
+        return cls(**kwargs)
+
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization (cache, MCP responses)."""
-        import json
+        """Convert to dictionary for serialization (cache, MCP responses).
 
+        ``topics`` stays a list; the cache JSON-encodes it when writing the row.
+        """
         data = {
             "id": self.id,
             "full_name": self.full_name,
@@ -155,7 +268,7 @@ class StarredRepo:
             "forks_count": self.forks_count,
             "watchers_count": self.watchers_count,
             "language": self.language,
-            "topics": json.dumps(self.topics),  # Serialize list as JSON
+            "topics": list(self.topics),
             "is_archived": self.is_archived,
             "is_private": self.is_private,
             "is_fork": self.is_fork,
@@ -172,38 +285,48 @@ class StarredRepo:
         }
         return data
 
+    def match_keys(self) -> Set[str]:
+        """Lowercased topics plus language: the values auto_tags match against."""
+        keys = {topic.lower() for topic in self.topics}
+        if self.language:
+            keys.add(self.language.lower())
+        return keys
+
     def format_stars(self) -> str:
         """Format star count for display (e.g., 1.2k, 45.3k)."""
-        count = self.stars_count
-        if count >= 1000:
-            return f"{count / 1000:.1f}k"
-        return str(count)
-
-    def format_updated(self) -> str:
-        """Format last updated time for display (e.g., 2d ago, 3w ago)."""
-        if not self.updated_at:
+        return _format_stars(self.stars_count)
+
+    def format_updated(self, now: Optional[datetime] = None) -> str:
+        """
+        Format last updated time for display (e.g., 2d ago, 3w ago).
+
+        Args:
+            now: Reference time. Pass one value when formatting many rows
+                so the clock is read once; defaults to the current time.
+        """
+        updated_at = self.updated_at
+        if not updated_at:
             return "unknown"
 
-        now = datetime.now(self.updated_at.tzinfo)
-        delta = now - self.updated_at
+        if now is None:
+            now = datetime.now(updated_at.tzinfo)
+        elif (now.tzinfo is None) != (updated_at.tzinfo is None):
+            # Naive timestamps are local time
+            now = (
+                now.astimezone().replace(tzinfo=None)
+                if updated_at.tzinfo is None
+                else now.astimezone(updated_at.tzinfo)
+            )
+        delta = now - updated_at
 
         if delta.days < 1:
             hours = delta.seconds // 3600
             return f"{hours}h ago" if hours > 0 else "just now"
-        elif delta.days < 7:
-            return f"{delta.days}d ago"
-        elif delta.days < 30:
-            weeks = delta.days // 7
-            return f"{weeks}w ago"
-        elif delta.days < 365:
-            months = delta.days // 30
-            return f"{months}mo ago"
-        else:
-            years = delta.days // 365
-            return f"{years}y ago"
-
-
-@dataclass
+        days_per_unit, suffix = _AGE_UNITS[bisect_right(_AGE_BOUNDS, delta.days)]
+        return f"{delta.days // days_per_unit}{suffix} ago"
+
+
+@dataclass(slots=True)
 class VirtualFolder:
     """
     Virtual folder for organizing starred repos using tag-based categorization.
@@ -230,23 +353,30 @@ class VirtualFolder:
     is_selected: bool = False
     is_focused: bool = False
 
+    # auto_tag_keys() memo, and the auto_tags it was computed from
+    _auto_tag_keys: FrozenSet[str] = field(
+        default=frozenset(), init=False, repr=False, compare=False
+    )
+    _auto_tag_source: List[str] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "VirtualFolder":
         """Create from dictionary (e.g., from cache)."""
-        import json
-
         repo_count = data.get("repo_count", 0)
         is_selected = data.get("is_selected", False)
         is_focused = data.get("is_focused", False)
 
-        # Parse auto_tags if it's a JSON string
+        # Cache rows carry auto_tags as a JSON string
         if "auto_tags" in data and isinstance(data["auto_tags"], str):
-            data["auto_tags"] = json.loads(data["auto_tags"])
+            data["auto_tags"] = fastjson.loads(data["auto_tags"])
 
         # Parse datetime fields
-        for field in ["created_at", "updated_at"]:
-            if field in data and data[field] and isinstance(data[field], str):
-                data[field] = date_parser.parse(data[field])
+        for name in _FOLDER_DATETIME_FIELDS:
+            value = data.get(name)
+            if value and isinstance(value, str):
+                data[name] = _parse_timestamp(value)
 
         # Remove computed fields
         data.pop("repo_count", None)
@@ -261,19 +391,24 @@ class VirtualFolder:
         )
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
-        import json
-
+        """Convert to dictionary for serialization (``auto_tags`` stays a list)."""
         return {
             "id": self.id,
             "name": self.name,
-            "auto_tags": json.dumps(self.auto_tags),
+            "auto_tags": list(self.auto_tags),
             "description": self.description,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "kind": self.kind,
         }
 
+    def auto_tag_keys(self) -> FrozenSet[str]:
+        """Lowercased auto_tags, recomputed only after auto_tags changes."""
+        if self._auto_tag_source != self.auto_tags:
+            self._auto_tag_keys = frozenset(tag.lower() for tag in self.auto_tags)
+            self._auto_tag_source = list(self.auto_tags)
+        return self._auto_tag_keys
+
     def matches_repo(self, repo: StarredRepo) -> bool:
         """
         Check if a repo matches this folder's auto-tags.
@@ -281,24 +416,11 @@ class VirtualFolder:
         Returns True if any of the repo's topics match any of the folder's auto_tags.
         Also checks language as a special case.
         """
-        if not self.auto_tags:
-            return False
-
-        # Check topics
-        repo_topics_lower = [topic.lower() for topic in repo.topics]
-        for tag in self.auto_tags:
-            tag_lower = tag.lower()
-            if tag_lower in repo_topics_lower:
-                return True
-
-            # Also check language
-            if repo.language and tag_lower == repo.language.lower():
-                return True
+        keys = self.auto_tag_keys()
+        return bool(keys) and not keys.isdisjoint(repo.match_keys())
 
-        return False
 
-
-@dataclass
+@dataclass(slots=True)
 class RepoMetadata:
     """
     Extended metadata for a repository (README, issues, etc.).
@@ -319,8 +441,9 @@ class RepoMetadata:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "RepoMetadata":
         """Create from dictionary (e.g., from cache)."""
-        if "cached_at" in data and data["cached_at"] and isinstance(data["cached_at"], str):
-            data["cached_at"] = date_parser.parse(data["cached_at"])
+        cached_at = data.get("cached_at")
+        if cached_at and isinstance(cached_at, str):
+            data["cached_at"] = _parse_timestamp(cached_at)
 
         return cls(**data)
 
@@ -339,7 +462,7 @@ class RepoMetadata:
         }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ClipboardItem:
     """Item in the clipboard (for copy/cut/paste operations)."""
 
@@ -348,7 +471,7 @@ class ClipboardItem:
     operation: str = "copy"  # "copy" or "cut"
 
 
-@dataclass
+@dataclass(slots=True)
 class Clipboard:
     """
     Manages copy/cut/paste operations for repos between folders.
@@ -357,6 +480,9 @@ class Clipboard:
     """
 
     items: List[ClipboardItem] = field(default_factory=list)
+    # Ids of the repos in items, for O(1) is_cut/is_copied; kept in step by
+    # copy/cut/clear (every item shares one operation).
+    _repo_ids: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
 
     def copy(self, repos: List[StarredRepo], source_folder_id: Optional[str] = None) -> None:
         """
@@ -366,10 +492,9 @@ class Clipboard:
             repos: List of repos to copy
             source_folder_id: Optional source folder ID
         """
-        self.items = [
-            ClipboardItem(repo=repo, source_folder_id=source_folder_id, operation="copy")
-            for repo in repos
-        ]
+        self.items.clear()
+        self.items.extend(map(ClipboardItem, repos, repeat(source_folder_id), repeat("copy")))
+        self._repo_ids = {item.repo.id for item in self.items}
 
     def cut(self, repos: List[StarredRepo], source_folder_id: str) -> None:
         """
@@ -379,23 +504,23 @@ class Clipboard:
             repos: List of repos to cut
             source_folder_id: Source folder ID (required for cut)
         """
-        self.items = [
-            ClipboardItem(repo=repo, source_folder_id=source_folder_id, operation="cut")
-            for repo in repos
-        ]
+        self.items.clear()
+        self.items.extend(map(ClipboardItem, repos, repeat(source_folder_id), repeat("cut")))
+        self._repo_ids = {item.repo.id for item in self.items}
 
-    def paste(self) -> List[ClipboardItem]:
+    def paste(self) -> Sequence[ClipboardItem]:
         """
         Get items for pasting.
 
         Returns:
-            List of clipboard items (does NOT clear clipboard)
+            Read-only snapshot of the clipboard items (does NOT clear clipboard)
         """
-        return self.items.copy()
+        return tuple(self.items)
 
     def clear(self) -> None:
         """Clear the clipboard."""
-        self.items = []
+        self.items.clear()
+        self._repo_ids.clear()
 
     def is_empty(self) -> bool:
         """Check if clipboard is empty."""
@@ -403,16 +528,22 @@ class Clipboard:
 
     def get_operation(self) -> Optional[str]:
         """Get the operation type ('copy' or 'cut'), or None if empty."""
-        if self.is_empty():
-            return None
-        return self.items[0].operation
+        return self.items[0].operation if self.items else None
 
     def count(self) -> int:
         """Get number of items in clipboard."""
         return len(self.items)
 
+    def is_cut(self, repo_id: str) -> bool:
+        """Check whether a repo is on the clipboard from a cut."""
+        return repo_id in self._repo_ids and self.get_operation() == "cut"
+
+    def is_copied(self, repo_id: str) -> bool:
+        """Check whether a repo is on the clipboard from a copy."""
+        return repo_id in self._repo_ids and self.get_operation() == "copy"
+
 
-@dataclass
+@dataclass(slots=True)
 class FolderRepoLink:
     """
     Represents the relationship between a folder and a repo.
@@ -431,8 +562,9 @@ class FolderRepoLink:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "FolderRepoLink":
         """Create from dictionary."""
-        if "added_at" in data and data["added_at"] and isinstance(data["added_at"], str):
-            data["added_at"] = date_parser.parse(data["added_at"])
+        added_at = data.get("added_at")
+        if added_at and isinstance(added_at, str):
+            data["added_at"] = _parse_timestamp(added_at)
 
         return cls(**data)
 
@@ -9,7 +9,7 @@ Modified: 2025-11-07
 import asyncio
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -18,8 +18,12 @@ from ganger.core.auth import GitHubAuth
 from ganger.core.github_client import GitHubAPIClient
 from ganger.core.cache import PersistentCache
 from ganger.core.folder_manager import FolderManager
+from ganger.core.models import StarredRepo
 from ganger.core.exceptions import GangerError, AuthenticationError
 from ganger.config.settings import Settings
+from ganger.utils.rate_limiter import AsyncTokenBucket
+from ganger.utils.ttl_cache import TTLCache
+from ganger.mcp.tools import register_tools
 
 
 class GangerMCPServer:
@@ -29,6 +33,19 @@ class GangerMCPServer:
     Provides tools for managing GitHub starred repositories via MCP.
     """
 
+    # Client-side pacing for GitHub calls made by tools, so an LLM looping
+    # over tools can't burn through GitHub's limits: core REST is
+    # 5,000/hour, search 30/minute (small burst, since the window is short).
+    CORE_RATE = 5000 / 3600
+    CORE_BURST = 100
+    SEARCH_RATE = 30 / 60
+    SEARCH_BURST = 5
+
+    # Folder/cache statistics are polled repeatedly during exploration;
+    # reuse them briefly. Tools that write drop them (invalidate_stats).
+    STATS_CACHE_TTL = 10
+    STATS_CACHE_SIZE = 128
+
     def __init__(
         self,
         auth: Optional[GitHubAuth] = None,
@@ -57,10 +74,16 @@ class GangerMCPServer:
 
         self.auth = auth
         self.github_client = GitHubAPIClient(auth)
+        self.core_bucket = AsyncTokenBucket(rate=self.CORE_RATE, capacity=self.CORE_BURST)
+        self.search_bucket = AsyncTokenBucket(rate=self.SEARCH_RATE, capacity=self.SEARCH_BURST)
 
         # Initialize cache and folder manager
         self.cache = PersistentCache(db_path=cache_path, ttl_seconds=cache_ttl)
         self.folder_manager: Optional[FolderManager] = None
+        # In-flight starred-repo fetches by max_count (see fetch_starred_repos)
+        self._starred_inflight: Dict[Optional[int], "asyncio.Future[List[StarredRepo]]"] = {}
+        self._stats_cache = TTLCache(maxsize=self.STATS_CACHE_SIZE, ttl=self.STATS_CACHE_TTL)
+        self._stats_generation = 0
 
         # MCP server
         self.server = Server("ganger")
@@ -70,21 +93,97 @@ class GangerMCPServer:
         await self.cache.initialize()
         self.folder_manager = FolderManager(self.cache)
 
-    def run(self):
-        """Run the MCP server."""
-        async def _run():
-            await self.initialize()
+    async def fetch_starred_repos(self, max_count: Optional[int] = None) -> List[StarredRepo]:
+        """
+        Fetch starred repos from GitHub, sharing one fetch among concurrent callers.
+
+        A complete listing (no max_count) also refreshes the cache. Callers
+        arriving while a fetch for the same max_count is running await that
+        fetch instead of starting another crawl.
+
+        Args:
+            max_count: Maximum number of repos to fetch (None = all)
+
+        Returns:
+            List of StarredRepo objects
+        """
+        inflight = self._starred_inflight.get(max_count)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch_starred_repos(max_count))
+            self._starred_inflight[max_count] = inflight
+            inflight.add_done_callback(lambda _: self._starred_inflight.pop(max_count, None))
+        # Shielded so one caller's cancellation doesn't cancel the others' fetch
+        return await asyncio.shield(inflight)
+
+    async def _fetch_starred_repos(self, max_count: Optional[int]) -> List[StarredRepo]:
+        await self.core_bucket.acquire()
+        # REST pages revalidate with ETags, so a long-lived server's re-fetch
+        # of unchanged stars is mostly free 304s. Run in a thread to avoid
+        # blocking the loop.
+        repos = await asyncio.to_thread(
+            self.github_client.get_starred_repos, max_count=max_count, use_graphql=False
+        )
+        if max_count is None:
+            # Truncated listings must not replace the full cached snapshot
+            await self.cache.set_starred_repos(repos)
+            self.invalidate_stats()
+        return repos
+
+    async def cached_stats(
+        self, key: Hashable, compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Return statistics for ``key``, computing them at most every STATS_CACHE_TTL seconds.
+
+        A result computed while a write invalidated the cache isn't stored,
+        since it may predate the write.
 
-            # Import and register tools
-            from ganger.mcp.tools import register_tools
-            register_tools(self.server, self)
+        Args:
+            key: Cache key identifying the statistic
+            compute: Coroutine function producing the statistics
 
+        Returns:
+            Statistics dictionary (shared; don't mutate)
+        """
+        cached = self._stats_cache.get(key)
+        if cached is not None:
+            return cached
+        generation = self._stats_generation
+        result = await compute()
+        if generation == self._stats_generation:
+            self._stats_cache.set(key, result)
+        return result
+
+    def invalidate_stats(self) -> None:
+        """Drop memoized statistics after a write."""
+        self._stats_generation += 1
+        self._stats_cache.clear()
+
+    async def close(self):
+        """Release the cache's database connection and GitHub HTTP pool."""
+        await self.cache.close()
+        self.github_client.close()
+
+    async def serve(self):
+        """
+        Initialize, register tools and serve MCP over stdio until the client exits.
+
+        Awaitable from a caller's own event loop; run() wraps it for the CLI.
+        """
+        await self.initialize()
+        register_tools(self.server, self)
+
+        try:
             async with stdio_server() as (read_stream, write_stream):
                 await self.server.run(
                     read_stream, write_stream, self.server.create_initialization_options()
                 )
+        finally:
+            await self.close()
 
-        asyncio.run(_run())
+    def run(self):
+        """Run the MCP server on a fresh event loop."""
+        asyncio.run(self.serve())
 
 
 def create_server(
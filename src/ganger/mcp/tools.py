@@ -7,11 +7,357 @@ Modified: 2025-11-07
 """
 
 import asyncio
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 
 from ganger.core.exceptions import GangerError
+from ganger.utils import fastjson
+
+
+# ==================== Tool Catalog ====================
+
+# Static, so built once at import and handed back by every tools/list request.
+_TOOLS_CATALOG: List[Tool] = [
+    Tool(
+        name="list_starred_repos",
+        description=(
+            "Get all starred repositories for the authenticated user. Returns a list of repos "
+            "with metadata. For large star lists, page with max_count and offset; next_offset "
+            "is set while more repos remain."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "use_cache": {
+                    "type": "boolean",
+                    "description": "Use cached data if available (default: true)",
+                    "default": True,
+                },
+                "max_count": {
+                    "type": "integer",
+                    "description": "Maximum number of repos to return (optional)",
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Number of repos to skip, for paging (default: 0)",
+                    "default": 0,
+                },
+            },
+        },
+    ),
+    Tool(
+        name="get_repo_details",
+        description="Get detailed information about a specific repository including README.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "full_name": {
+                    "type": "string",
+                    "description": "Repository full name (e.g., 'octocat/Hello-World')",
+                },
+            },
+            "required": ["full_name"],
+        },
+    ),
+    Tool(
+        name="star_repository",
+        description="Star a repository on GitHub.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "full_name": {
+                    "type": "string",
+                    "description": "Repository full name (e.g., 'octocat/Hello-World')",
+                },
+            },
+            "required": ["full_name"],
+        },
+    ),
+    Tool(
+        name="unstar_repository",
+        description="Unstar a repository on GitHub.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "full_name": {
+                    "type": "string",
+                    "description": "Repository full name (e.g., 'octocat/Hello-World')",
+                },
+            },
+            "required": ["full_name"],
+        },
+    ),
+    Tool(
+        name="search_repositories",
+        description="Search for repositories on GitHub (not limited to starred repos).",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query (e.g., 'language:python stars:>1000')",
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum number of results (default: 30)",
+                    "default": 30,
+                },
+            },
+            "required": ["query"],
+        },
+    ),
+    Tool(
+        name="search_starred_repos",
+        description="Full-text search your cached starred repos by name, description and topics.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Words to search for (each matched as a prefix)",
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum number of results (default: 30)",
+                    "default": 30,
+                },
+            },
+            "required": ["query"],
+        },
+    ),
+    # ==================== Folder Tools ====================
+    Tool(
+        name="list_folders",
+        description="Get all virtual folders for organizing starred repos.",
+        inputSchema={"type": "object", "properties": {}},
+    ),
+    Tool(
+        name="create_virtual_folder",
+        description="Create a new virtual folder with optional auto-tagging.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "Folder name",
+                },
+                "auto_tags": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Tags for auto-matching repos (e.g., ['python', 'ml'])",
+                },
+                "description": {
+                    "type": "string",
+                    "description": "Optional folder description",
+                },
+            },
+            "required": ["name"],
+        },
+    ),
+    Tool(
+        name="delete_virtual_folder",
+        description="Delete a virtual folder (repos are not deleted).",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "folder_id": {
+                    "type": "string",
+                    "description": "Folder ID to delete",
+                },
+            },
+            "required": ["folder_id"],
+        },
+    ),
+    Tool(
+        name="get_folder_repos",
+        description="Get all repositories in a virtual folder.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "folder_id": {
+                    "type": "string",
+                    "description": "Folder ID",
+                },
+            },
+            "required": ["folder_id"],
+        },
+    ),
+    # ==================== Repo-Folder Operations ====================
+    Tool(
+        name="add_repo_to_folder",
+        description="Add a repository to a virtual folder.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "repo_id": {
+                    "type": "string",
+                    "description": "Repository ID",
+                },
+                "folder_id": {
+                    "type": "string",
+                    "description": "Folder ID",
+                },
+            },
+            "required": ["repo_id", "folder_id"],
+        },
+    ),
+    Tool(
+        name="remove_repo_from_folder",
+        description="Remove a repository from a virtual folder.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "repo_id": {
+                    "type": "string",
+                    "description": "Repository ID",
+                },
+                "folder_id": {
+                    "type": "string",
+                    "description": "Folder ID",
+                },
+            },
+            "required": ["repo_id", "folder_id"],
+        },
+    ),
+    Tool(
+        name="move_repo_to_folder",
+        description="Move a repository from one folder to another.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "repo_id": {
+                    "type": "string",
+                    "description": "Repository ID",
+                },
+                "from_folder_id": {
+                    "type": "string",
+                    "description": "Source folder ID",
+                },
+                "to_folder_id": {
+                    "type": "string",
+                    "description": "Destination folder ID",
+                },
+            },
+            "required": ["repo_id", "from_folder_id", "to_folder_id"],
+        },
+    ),
+    # ==================== Auto-Categorization Tools ====================
+    Tool(
+        name="auto_categorize_all",
+        description="Auto-categorize all starred repos into folders based on tags and topics.",
+        inputSchema={"type": "object", "properties": {}},
+    ),
+    Tool(
+        name="suggest_folders_for_repo",
+        description="Suggest folders for a repository based on its topics and language.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "repo_id": {
+                    "type": "string",
+                    "description": "Repository ID",
+                },
+            },
+            "required": ["repo_id"],
+        },
+    ),
+    # ==================== Statistics Tools ====================
+    Tool(
+        name="get_folder_stats",
+        description=(
+            "Get statistics for a folder (repo count, stars, languages). "
+            "Omit folder_id to get every folder's statistics at once."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "folder_id": {
+                    "type": "string",
+                    "description": "Folder ID (omit for all folders)",
+                },
+            },
+        },
+    ),
+    Tool(
+        name="get_cache_stats",
+        description="Get cache statistics (repo count, folder count, cache age).",
+        inputSchema={"type": "object", "properties": {}},
+    ),
+]
+
+
+# JSON Schema type name -> accepted Python types. bool is an int subclass,
+# so integers are checked separately to keep True/False out.
+_JSON_TYPES: Dict[str, tuple] = {
+    "string": (str,),
+    "boolean": (bool,),
+    "array": (list, tuple),
+    "object": (dict,),
+}
+
+
+def _type_check(json_type: str) -> Callable[[Any], bool]:
+    """Return a predicate for one JSON Schema ``type``."""
+    if json_type == "integer":
+        return lambda value: isinstance(value, int) and not isinstance(value, bool)
+    types = _JSON_TYPES[json_type]
+    return lambda value: isinstance(value, types)
+
+
+def _compile_validator(schema: Dict[str, Any]) -> Callable[[dict], None]:
+    """
+    Compile a tool's ``inputSchema`` into an argument validator.
+
+    Covers the subset the catalog uses: ``required`` keys, per-property
+    ``type`` and array ``items`` types. All schema walking happens here, once;
+    the returned function only does dict lookups and isinstance checks.
+
+    Args:
+        schema: Tool inputSchema (object with properties)
+
+    Returns:
+        Function raising GangerError when arguments don't match
+    """
+    required = tuple(schema.get("required", ()))
+    checks = []
+    for prop, spec in schema.get("properties", {}).items():
+        if "type" not in spec:
+            continue
+        items_type = spec.get("items", {}).get("type")
+        checks.append((
+            prop,
+            spec["type"],
+            _type_check(spec["type"]),
+            _type_check(items_type) if items_type else None,
+        ))
+
+    def validate(arguments: dict) -> None:
+        for key in required:
+            if key not in arguments:
+                raise GangerError(f"Missing required argument: {key}")
+        for prop, json_type, check, item_check in checks:
+            value = arguments.get(prop)
+            if value is None:
+                continue
+            if not check(value):
+                raise GangerError(f"Argument {prop!r} must be of type {json_type}")
+            if item_check is not None and not all(map(item_check, value)):
+                raise GangerError(f"Argument {prop!r} has items of the wrong type")
+
+    return validate
+
+
+# Read the schema by its wire name; newer SDKs store it as input_schema.
+_VALIDATORS: Dict[str, Callable[[dict], None]] = {
+    tool.name: _compile_validator(tool.model_dump(by_alias=True)["inputSchema"])
+    for tool in _TOOLS_CATALOG
+}
+
+
+def _json_text(result: Dict[str, Any]) -> str:
+    """Serialize a tool result (or error dict) as the JSON text clients parse."""
+    return fastjson.dumps(result, default=str).decode()
 
 
 def register_tools(server: Server, ganger_server: Any) -> None:
@@ -23,248 +369,10 @@ def register_tools(server: Server, ganger_server: Any) -> None:
         ganger_server: GangerMCPServer instance with initialized components
     """
 
-    # ==================== Repository Tools ====================
-
     @server.list_tools()
     async def list_tools() -> list[Tool]:
         """List all available tools."""
-        return [
-            Tool(
-                name="list_starred_repos",
-                description="Get all starred repositories for the authenticated user. Returns a list of repos with metadata.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "use_cache": {
-                            "type": "boolean",
-                            "description": "Use cached data if available (default: true)",
-                            "default": True,
-                        },
-                        "max_count": {
-                            "type": "integer",
-                            "description": "Maximum number of repos to return (optional)",
-                        },
-                    },
-                },
-            ),
-            Tool(
-                name="get_repo_details",
-                description="Get detailed information about a specific repository including README.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "full_name": {
-                            "type": "string",
-                            "description": "Repository full name (e.g., 'octocat/Hello-World')",
-                        },
-                    },
-                    "required": ["full_name"],
-                },
-            ),
-            Tool(
-                name="star_repository",
-                description="Star a repository on GitHub.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "full_name": {
-                            "type": "string",
-                            "description": "Repository full name (e.g., 'octocat/Hello-World')",
-                        },
-                    },
-                    "required": ["full_name"],
-                },
-            ),
-            Tool(
-                name="unstar_repository",
-                description="Unstar a repository on GitHub.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "full_name": {
-                            "type": "string",
-                            "description": "Repository full name (e.g., 'octocat/Hello-World')",
-                        },
-                    },
-                    "required": ["full_name"],
-                },
-            ),
-            Tool(
-                name="search_repositories",
-                description="Search for repositories on GitHub (not limited to starred repos).",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "Search query (e.g., 'language:python stars:>1000')",
-                        },
-                        "max_results": {
-                            "type": "integer",
-                            "description": "Maximum number of results (default: 30)",
-                            "default": 30,
-                        },
-                    },
-                    "required": ["query"],
-                },
-            ),
-            # ==================== Folder Tools ====================
-            Tool(
-                name="list_folders",
-                description="Get all virtual folders for organizing starred repos.",
-                inputSchema={"type": "object", "properties": {}},
-            ),
-            Tool(
-                name="create_virtual_folder",
-                description="Create a new virtual folder with optional auto-tagging.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "name": {
-                            "type": "string",
-                            "description": "Folder name",
-                        },
-                        "auto_tags": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Tags for auto-matching repos (e.g., ['python', 'ml'])",
-                        },
-                        "description": {
-                            "type": "string",
-                            "description": "Optional folder description",
-                        },
-                    },
-                    "required": ["name"],
-                },
-            ),
-            Tool(
-                name="delete_virtual_folder",
-                description="Delete a virtual folder (repos are not deleted).",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "folder_id": {
-                            "type": "string",
-                            "description": "Folder ID to delete",
-                        },
-                    },
-                    "required": ["folder_id"],
-                },
-            ),
-            Tool(
-                name="get_folder_repos",
-                description="Get all repositories in a virtual folder.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "folder_id": {
-                            "type": "string",
-                            "description": "Folder ID",
-                        },
-                    },
-                    "required": ["folder_id"],
-                },
-            ),
-            # ==================== Repo-Folder Operations ====================
-            Tool(
-                name="add_repo_to_folder",
-                description="Add a repository to a virtual folder.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "repo_id": {
-                            "type": "string",
-                            "description": "Repository ID",
-                        },
-                        "folder_id": {
-                            "type": "string",
-                            "description": "Folder ID",
-                        },
-                    },
-                    "required": ["repo_id", "folder_id"],
-                },
-            ),
-            Tool(
-                name="remove_repo_from_folder",
-                description="Remove a repository from a virtual folder.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "repo_id": {
-                            "type": "string",
-                            "description": "Repository ID",
-                        },
-                        "folder_id": {
-                            "type": "string",
-                            "description": "Folder ID",
-                        },
-                    },
-                    "required": ["repo_id", "folder_id"],
-                },
-            ),
-            Tool(
-                name="move_repo_to_folder",
-                description="Move a repository from one folder to another.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "repo_id": {
-                            "type": "string",
-                            "description": "Repository ID",
-                        },
-                        "from_folder_id": {
-                            "type": "string",
-                            "description": "Source folder ID",
-                        },
-                        "to_folder_id": {
-                            "type": "string",
-                            "description": "Destination folder ID",
-                        },
-                    },
-                    "required": ["repo_id", "from_folder_id", "to_folder_id"],
-                },
-            ),
-            # ==================== Auto-Categorization Tools ====================
-            Tool(
-                name="auto_categorize_all",
-                description="Auto-categorize all starred repos into folders based on tags and topics.",
-                inputSchema={"type": "object", "properties": {}},
-            ),
-            Tool(
-                name="suggest_folders_for_repo",
-                description="Suggest folders for a repository based on its topics and language.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "repo_id": {
-                            "type": "string",
-                            "description": "Repository ID",
-                        },
-                    },
-                    "required": ["repo_id"],
-                },
-            ),
-            # ==================== Statistics Tools ====================
-            Tool(
-                name="get_folder_stats",
-                description="Get statistics for a folder (repo count, stars, languages).",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "folder_id": {
-                            "type": "string",
-                            "description": "Folder ID",
-                        },
-                    },
-                    "required": ["folder_id"],
-                },
-            ),
-            Tool(
-                name="get_cache_stats",
-                description="Get cache statistics (repo count, folder count, cache age).",
-                inputSchema={"type": "object", "properties": {}},
-            ),
-        ]
+        return _TOOLS_CATALOG
 
     # ==================== Tool Implementations ====================
 
@@ -273,11 +381,257 @@ def register_tools(server: Server, ganger_server: Any) -> None:
         """Handle tool calls."""
         try:
             result = await _handle_tool_call(name, arguments, ganger_server)
-            return [TextContent(type="text", text=str(result))]
         except GangerError as e:
-            return [TextContent(type="text", text=f"Error: {str(e)}")]
+            result = {"error": str(e)}
         except Exception as e:
-            return [TextContent(type="text", text=f"Unexpected error: {str(e)}")]
+            result = {"error": f"Unexpected error: {e}"}
+        return [TextContent(type="text", text=_json_text(result))]
+
+
+# ==================== Tool Handlers ====================
+#
+# One coroutine per tool, each taking (arguments, ganger_server). Dispatch
+# goes through the _HANDLERS table below.
+
+
+# Repository tools
+async def _list_starred_repos(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    use_cache = arguments.get("use_cache", True)
+    max_count = arguments.get("max_count")
+    offset = arguments.get("offset", 0)
+    if offset < 0:
+        raise GangerError("offset must be non-negative")
+    end = None if max_count is None else offset + max_count
+
+    all_repos = None
+    if use_cache:
+        # The listing never shows user tags, so skip hydrating them
+        all_repos = await ganger_server.cache.get_starred_repos(include_user_tags=False)
+    if all_repos is None:
+        # Cache miss or forced refresh; concurrent calls share one fetch.
+        # A fetch capped at `end` may have stopped short of more stars.
+        all_repos = await ganger_server.fetch_starred_repos(end)
+        more = end is not None and len(all_repos) == end
+    else:
+        more = end is not None and len(all_repos) > end
+    repos = all_repos[offset:end]
+
+    return {
+        "count": len(repos),
+        "offset": offset,
+        "next_offset": offset + len(repos) if more else None,
+        "repos": [
+            {
+                "id": r.id,
+                "full_name": r.full_name,
+                "description": r.description,
+                "stars": r.stars_count,
+                "language": r.language,
+                "topics": r.topics,
+                "url": r.url,
+            }
+            for r in repos
+        ],
+    }
+
+
+async def _get_repo_details(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    github = ganger_server.github_client
+    full_name = arguments["full_name"]
+    # Repo and README in one GraphQL request, run in the thread pool
+    await ganger_server.core_bucket.acquire()
+    repo, metadata = await asyncio.to_thread(github.get_repo_with_readme, full_name)
+
+    # Cache metadata
+    if metadata:
+        await ganger_server.cache.set_repo_metadata(metadata)
+
+    return {
+        "repo": repo.to_dict(),
+        "readme": metadata.readme_content if metadata else None,
+        "has_issues": metadata.has_issues if metadata else None,
+        "open_issues": metadata.open_issues_count if metadata else None,
+    }
+
+
+async def _star_repository(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    full_name = arguments["full_name"]
+    await ganger_server.core_bucket.acquire()
+    await asyncio.to_thread(ganger_server.github_client.star_repo, full_name)
+    return {"success": True, "message": f"Starred {full_name}"}
+
+
+async def _unstar_repository(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    full_name = arguments["full_name"]
+    await ganger_server.core_bucket.acquire()
+    await asyncio.to_thread(ganger_server.github_client.unstar_repo, full_name)
+    return {"success": True, "message": f"Unstarred {full_name}"}
+
+
+async def _search_repositories(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    query = arguments["query"]
+    max_results = arguments.get("max_results", 30)
+    # Run blocking search in thread pool
+    await ganger_server.search_bucket.acquire()
+    repos = await asyncio.to_thread(
+        ganger_server.github_client.search_repos, query, max_results
+    )
+
+    return {
+        "count": len(repos),
+        "repos": [{"full_name": r.full_name, "stars": r.stars_count} for r in repos],
+    }
+
+
+async def _search_starred_repos(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    query = arguments["query"]
+    max_results = arguments.get("max_results", 30)
+    repos = await ganger_server.cache.search_repos(query, limit=max_results)
+
+    return {
+        "count": len(repos),
+        "repos": [
+            {"id": r.id, "full_name": r.full_name, "description": r.description, "stars": r.stars_count}
+            for r in repos
+        ],
+    }
+
+
+# Folder tools
+async def _list_folders(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    folders = await ganger_server.folder_manager.get_all_folders()
+    return {
+        "count": len(folders),
+        "folders": [
+            {
+                "id": f.id,
+                "name": f.name,
+                "auto_tags": f.auto_tags,
+                "repo_count": f.repo_count,
+            }
+            for f in folders
+        ],
+    }
+
+
+async def _create_virtual_folder(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    name = arguments["name"]
+    auto_tags = arguments.get("auto_tags", [])
+    description = arguments.get("description", "")
+
+    folder = await ganger_server.folder_manager.create_folder(name, auto_tags, description)
+    return {
+        "success": True,
+        "folder": {"id": folder.id, "name": folder.name, "auto_tags": folder.auto_tags},
+    }
+
+
+async def _delete_virtual_folder(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    folder_id = arguments["folder_id"]
+    await ganger_server.folder_manager.delete_folder(folder_id)
+    return {"success": True, "message": f"Deleted folder {folder_id}"}
+
+
+async def _get_folder_repos(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    repos = await ganger_server.folder_manager.get_folder_repos(arguments["folder_id"])
+    return {
+        "count": len(repos),
+        "repos": [{"id": r.id, "full_name": r.full_name, "stars": r.stars_count} for r in repos],
+    }
+
+
+# Repo-folder operations
+async def _add_repo_to_folder(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    await ganger_server.folder_manager.add_repo_to_folder(
+        arguments["repo_id"], arguments["folder_id"]
+    )
+    return {"success": True, "message": "Repo added to folder"}
+
+
+async def _remove_repo_from_folder(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    await ganger_server.folder_manager.remove_repo_from_folder(
+        arguments["repo_id"], arguments["folder_id"]
+    )
+    return {"success": True, "message": "Repo removed from folder"}
+
+
+async def _move_repo_to_folder(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    await ganger_server.folder_manager.move_repo(
+        arguments["repo_id"], arguments["from_folder_id"], arguments["to_folder_id"]
+    )
+    return {"success": True, "message": "Repo moved"}
+
+
+# Auto-categorization
+async def _auto_categorize_all(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    stats = await ganger_server.folder_manager.auto_categorize_all()
+    return {"success": True, "stats": stats}
+
+
+async def _suggest_folders_for_repo(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    repo = await ganger_server.cache.get_repo(arguments["repo_id"])
+    if not repo:
+        return {"error": "Repo not found"}
+
+    suggestions = await ganger_server.folder_manager.suggest_folders_for_repo(repo)
+    return {
+        "count": len(suggestions),
+        "folders": [{"id": f.id, "name": f.name} for f in suggestions],
+    }
+
+
+# Statistics
+async def _get_folder_stats(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    folder_mgr = ganger_server.folder_manager
+    folder_id = arguments.get("folder_id")
+    if folder_id is None:
+        async def all_folders() -> Dict[str, Any]:
+            all_stats = await folder_mgr.get_all_folder_stats()
+            return {"folders": list(all_stats.values())}
+
+        return await ganger_server.cached_stats(("folders", None), all_folders)
+    return await ganger_server.cached_stats(
+        ("folders", folder_id), lambda: folder_mgr.get_folder_stats(folder_id)
+    )
+
+
+async def _get_cache_stats(arguments: dict, ganger_server: Any) -> Dict[str, Any]:
+    return await ganger_server.cached_stats(("cache",), ganger_server.cache.get_stats)
+
+
+_ToolHandler = Callable[[dict, Any], Awaitable[Dict[str, Any]]]
+
+_HANDLERS: Dict[str, _ToolHandler] = {
+    "list_starred_repos": _list_starred_repos,
+    "get_repo_details": _get_repo_details,
+    "star_repository": _star_repository,
+    "unstar_repository": _unstar_repository,
+    "search_repositories": _search_repositories,
+    "search_starred_repos": _search_starred_repos,
+    "list_folders": _list_folders,
+    "create_virtual_folder": _create_virtual_folder,
+    "delete_virtual_folder": _delete_virtual_folder,
+    "get_folder_repos": _get_folder_repos,
+    "add_repo_to_folder": _add_repo_to_folder,
+    "remove_repo_from_folder": _remove_repo_from_folder,
+    "move_repo_to_folder": _move_repo_to_folder,
+    "auto_categorize_all": _auto_categorize_all,
+    "suggest_folders_for_repo": _suggest_folders_for_repo,
+    "get_folder_stats": _get_folder_stats,
+    "get_cache_stats": _get_cache_stats,
+}
+
+# Tools that write to the cache; memoized statistics are dropped after each
+# (list_starred_repos does so itself, only when it refreshes the cache).
+_WRITE_TOOLS = frozenset({
+    "get_repo_details",
+    "create_virtual_folder",
+    "delete_virtual_folder",
+    "add_repo_to_folder",
+    "remove_repo_from_folder",
+    "move_repo_to_folder",
+    "auto_categorize_all",
+})
 
 
 async def _handle_tool_call(
@@ -293,175 +647,20 @@ async def _handle_tool_call(
 
     Returns:
         Tool result as dictionary
-    """
-    github = ganger_server.github_client
-    folder_mgr = ganger_server.folder_manager
-    cache = ganger_server.cache
-
-    # Repository tools
-    if name == "list_starred_repos":
-        use_cache = arguments.get("use_cache", True)
-        max_count = arguments.get("max_count")
-
-        if use_cache:
-            repos = await cache.get_starred_repos()
-            if repos is None:
-                # Cache miss, fetch from GitHub (run in thread to avoid blocking)
-                repos = await asyncio.to_thread(
-                    github.get_starred_repos, max_count=max_count
-                )
-                if max_count is None:
-                    await cache.set_starred_repos(repos)
-            elif max_count is not None:
-                repos = repos[:max_count]
-        else:
-            # Force refresh from GitHub (run in thread to avoid blocking)
-            repos = await asyncio.to_thread(
-                github.get_starred_repos, max_count=max_count
-            )
-            if max_count is None:
-                await cache.set_starred_repos(repos)
-
-        return {
-            "count": len(repos),
-            "repos": [
-                {
-                    "id": r.id,
-                    "full_name": r.full_name,
-                    "description": r.description,
-                    "stars": r.stars_count,
-                    "language": r.language,
-                    "topics": r.topics,
-                    "url": r.url,
-                }
-                for r in repos
-            ],
-        }
-
-    elif name == "get_repo_details":
-        full_name = arguments["full_name"]
-        # Run blocking API calls in thread pool
-        repo = await asyncio.to_thread(github.get_repo, full_name)
-        metadata = await asyncio.to_thread(github.get_readme, full_name)
-
-        # Cache metadata
-        if metadata:
-            await cache.set_repo_metadata(metadata)
-
-        return {
-            "repo": repo.to_dict(),
-            "readme": metadata.readme_content if metadata else None,
-            "has_issues": metadata.has_issues if metadata else None,
-            "open_issues": metadata.open_issues_count if metadata else None,
-        }
-
-    elif name == "star_repository":
-        full_name = arguments["full_name"]
-        await asyncio.to_thread(github.star_repo, full_name)
-        return {"success": True, "message": f"Starred {full_name}"}
-
-    elif name == "unstar_repository":
-        full_name = arguments["full_name"]
-        await asyncio.to_thread(github.unstar_repo, full_name)
-        return {"success": True, "message": f"Unstarred {full_name}"}
-
-    elif name == "search_repositories":
-        query = arguments["query"]
-        max_results = arguments.get("max_results", 30)
-        # Run blocking search in thread pool
-        repos = await asyncio.to_thread(github.search_repos, query, max_results)
-
-        return {
-            "count": len(repos),
-            "repos": [{"full_name": r.full_name, "stars": r.stars_count} for r in repos],
-        }
-
-    # Folder tools
-    elif name == "list_folders":
-        folders = await folder_mgr.get_all_folders()
-        return {
-            "count": len(folders),
-            "folders": [
-                {
-                    "id": f.id,
-                    "name": f.name,
-                    "auto_tags": f.auto_tags,
-                    "repo_count": f.repo_count,
-                }
-                for f in folders
-            ],
-        }
-
-    elif name == "create_virtual_folder":
-        name_arg = arguments["name"]
-        auto_tags = arguments.get("auto_tags", [])
-        description = arguments.get("description", "")
-
-        folder = await folder_mgr.create_folder(name_arg, auto_tags, description)
-        return {
-            "success": True,
-            "folder": {"id": folder.id, "name": folder.name, "auto_tags": folder.auto_tags},
-        }
-
-    elif name == "delete_virtual_folder":
-        folder_id = arguments["folder_id"]
-        await folder_mgr.delete_folder(folder_id)
-        return {"success": True, "message": f"Deleted folder {folder_id}"}
-
-    elif name == "get_folder_repos":
-        folder_id = arguments["folder_id"]
-        repos = await folder_mgr.get_folder_repos(folder_id)
-        return {
-            "count": len(repos),
-            "repos": [{"id": r.id, "full_name": r.full_name, "stars": r.stars_count} for r in repos],
-        }
-
-    # Repo-folder operations
-    elif name == "add_repo_to_folder":
-        repo_id = arguments["repo_id"]
-        folder_id = arguments["folder_id"]
-        await folder_mgr.add_repo_to_folder(repo_id, folder_id)
-        return {"success": True, "message": "Repo added to folder"}
-
-    elif name == "remove_repo_from_folder":
-        repo_id = arguments["repo_id"]
-        folder_id = arguments["folder_id"]
-        await folder_mgr.remove_repo_from_folder(repo_id, folder_id)
-        return {"success": True, "message": "Repo removed from folder"}
-
-    elif name == "move_repo_to_folder":
-        repo_id = arguments["repo_id"]
-        from_folder_id = arguments["from_folder_id"]
-        to_folder_id = arguments["to_folder_id"]
-        await folder_mgr.move_repo(repo_id, from_folder_id, to_folder_id)
-        return {"success": True, "message": "Repo moved"}
-
-    # Auto-categorization
-    elif name == "auto_categorize_all":
-        stats = await folder_mgr.auto_categorize_all()
-        return {"success": True, "stats": stats}
-
-    elif name == "suggest_folders_for_repo":
-        repo_id = arguments["repo_id"]
-        repo = await cache.get_repo(repo_id)
-        if not repo:
-            return {"error": "Repo not found"}
-
-        suggestions = await folder_mgr.suggest_folders_for_repo(repo)
-        return {
-            "count": len(suggestions),
-            "folders": [{"id": f.id, "name": f.name} for f in suggestions],
-        }
-
-    # Statistics
-    elif name == "get_folder_stats":
-        folder_id = arguments["folder_id"]
-        stats = await folder_mgr.get_folder_stats(folder_id)
-        return stats
-
-    elif name == "get_cache_stats":
-        stats = await cache.get_stats()
-        return stats
 
-    else:
+    Raises:
+        GangerError: If arguments don't match the tool's inputSchema
+    """
+    handler = _HANDLERS.get(name)
+    if handler is None:
         return {"error": f"Unknown tool: {name}"}
+    if arguments is None:
+        arguments = {}
+    _VALIDATORS[name](arguments)
+    if name not in _WRITE_TOOLS:
+        return await handler(arguments, ganger_server)
+    try:
+        return await handler(arguments, ganger_server)
+    finally:
+        # Even a failed write may have changed something
+        ganger_server.invalidate_stats()
@@ -286,6 +286,13 @@ class GangerApp(App):
             self.notify(f"Initialization error: {e}", severity="error")
             self.exit(1)
 
+    async def on_unmount(self) -> None:
+        """Close the cache's shared database connection and HTTP pool on exit."""
+        if self.cache is not None:
+            await self.cache.close()
+        if self.api_client is not None:
+            self.api_client.close()
+
     async def _cache_is_fresh(self) -> bool:
         """Return True if the starred-repo cache is within its TTL.
 
@@ -469,9 +476,7 @@ class GangerApp(App):
                 asyncio.create_task(self._deferred_sync(loader, repos))
             else:
                 # Run sync operations immediately
-                await loader.sync_all_stars_folder(repos)
-                if self.settings.behavior.auto_categorize:
-                    await loader.auto_categorize_all(repos)
+                await loader.sync_folders(repos)
                 # Refresh folders after sync
                 await self.load_folders(update_status=False)
                 if self.status_bar:
@@ -526,12 +531,8 @@ class GangerApp(App):
             # Small delay to let UI settle
             await asyncio.sleep(0.5)
 
-            # Sync "All Stars" folder in background (with progress)
-            await loader.sync_all_stars_folder(repos)
-
-            # Auto-categorize if enabled
-            if self.settings.behavior.auto_categorize:
-                await loader.auto_categorize_all(repos)
+            # Sync "All Stars" and auto-categorize (if enabled) in background
+            await loader.sync_folders(repos)
 
             # Refresh folders to show updated counts
             await self.load_folders(update_status=False)
@@ -652,7 +653,7 @@ class GangerApp(App):
                 return
 
             # Check if folder is empty
-            repos = await self.folder_manager.get_folder_repos(self.current_folder.id)
+            repos = await self.folder_manager.get_folder_repo_ids(self.current_folder.id)
             if repos:
                 self.notify(
                     f"Cannot delete '{self.current_folder.name}': folder contains {len(repos)} repo(s)",
@@ -839,15 +840,7 @@ class GangerApp(App):
             # Auto-categorize if tags provided. The folder_manager's
             # auto_categorize_repo will only act on rule/hybrid kinds.
             if folder.auto_tags and self.settings.behavior.auto_categorize:
-                all_repos = await self.cache.get_starred_repos()
-                if all_repos:
-                    for repo in all_repos:
-                        if folder.matches_repo(repo):
-                            await self.cache.add_repo_to_folder(
-                                repo_id=repo.id,
-                                folder_id=folder.id,
-                                is_manual=False,
-                            )
+                await self.cache.link_auto_tag_matches(folder.id, folder.auto_tags)
 
             # Refresh folders
             await self.load_folders()
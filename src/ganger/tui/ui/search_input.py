@@ -6,8 +6,10 @@ Modified: 2025-11-08
 Adapted from yanger/ui/search_input.py
 """
 
-from typing import Optional, Callable
 import logging
+import re
+from functools import lru_cache
+from typing import Optional, Callable
 from textual.app import ComposeResult
 from textual.containers import Container
 from textual.widgets import Input, Static
@@ -173,6 +175,12 @@ class SearchInput(Container):
         self.hide()
 
 
+@lru_cache(maxsize=32)
+def _query_pattern(query: str) -> "re.Pattern[str]":
+    """Case-insensitive literal pattern for ``query``, compiled once per query."""
+    return re.compile(re.escape(query), re.IGNORECASE)
+
+
 class SearchHighlighter:
     """Helper class to highlight search matches in text."""
 
@@ -192,8 +200,7 @@ class SearchHighlighter:
             return text
 
         # Case-insensitive search
-        import re
-        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        pattern = _query_pattern(query)
 
         # Find all matches
         matches = list(pattern.finditer(text))
@@ -4,4 +4,4 @@ Utility functions for Ganger.
 Modified: 2025-11-07
 """
 
-__all__ = ["rate_limiter"]
+__all__ = ["fastjson", "rate_limiter", "ttl_cache"]
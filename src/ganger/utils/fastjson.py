@@ -0,0 +1,57 @@
+"""
+JSON encode/decode helpers that use orjson when it is installed.
+
+orjson is an optional speedup (``pip install ganger[speed]``); without it
+these fall back to the stdlib ``json`` module with the same signatures.
+Both ``dumps`` variants return bytes so callers can write files or sockets
+directly.
+
+Modified: 2025-11-07
+"""
+
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+if orjson is not None:
+
+    def dumps(
+        obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None
+    ) -> bytes:
+        """Serialize ``obj`` to JSON bytes (two-space indent if requested).
+
+        ``default`` converts objects JSON can't represent, as in ``json.dumps``.
+        """
+        return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    def loads(data: Union[bytes, str]) -> Any:
+        """Deserialize JSON from bytes or str."""
+        return orjson.loads(data)
+
+    JSONDecodeError = orjson.JSONDecodeError
+
+else:
+    import json
+
+    def dumps(
+        obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None
+    ) -> bytes:
+        """Serialize ``obj`` to JSON bytes (two-space indent if requested).
+
+        ``default`` converts objects JSON can't represent, as in ``json.dumps``.
+        """
+        if indent:
+            return json.dumps(obj, indent=2, default=default).encode("utf-8")
+        return json.dumps(obj, separators=(",", ":"), default=default).encode("utf-8")
+
+    def loads(data: Union[bytes, str]) -> Any:
+        """Deserialize JSON from bytes or str."""
+        return json.loads(data)
+
+    JSONDecodeError = json.JSONDecodeError
+
+
+__all__ = ["dumps", "loads", "JSONDecodeError"]
@@ -8,7 +8,7 @@ import asyncio
 import logging
 import time
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -134,14 +134,17 @@ class RateLimiter:
         This will block until the rate limit resets.
         For async contexts, use wait_if_needed_async() instead.
         """
-        if self.should_wait():
-            wait_time = self.get_wait_time()
-            if wait_time > 0:
-                logger.warning(f"Rate limit exceeded. Waiting {wait_time}s until reset...")
-                time.sleep(wait_time)
-                # Reset counters after waiting
-                self.quota_used = 0
-                self.reset_time = None
+        # Runs before every API call: while quota remains this is a single
+        # attribute compare (same test as should_wait(), without the calls).
+        if self.quota_used < self.hourly_quota:
+            return
+        wait_time = self.get_wait_time()
+        if wait_time > 0:
+            logger.warning(f"Rate limit exceeded. Waiting {wait_time}s until reset...")
+            time.sleep(wait_time)
+            # Reset counters after waiting
+            self.quota_used = 0
+            self.reset_time = None
 
     async def wait_if_needed_async(self) -> None:
         """
@@ -150,14 +153,15 @@ class RateLimiter:
         This uses asyncio.sleep() instead of time.sleep() to avoid
         blocking the event loop. Use this in async contexts like TUI or MCP.
         """
-        if self.should_wait():
-            wait_time = self.get_wait_time()
-            if wait_time > 0:
-                logger.warning(f"Rate limit exceeded. Waiting {wait_time}s until reset...")
-                await asyncio.sleep(wait_time)
-                # Reset counters after waiting
-                self.quota_used = 0
-                self.reset_time = None
+        if self.quota_used < self.hourly_quota:
+            return
+        wait_time = self.get_wait_time()
+        if wait_time > 0:
+            logger.warning(f"Rate limit exceeded. Waiting {wait_time}s until reset...")
+            await asyncio.sleep(wait_time)
+            # Reset counters after waiting
+            self.quota_used = 0
+            self.reset_time = None
 
     def get_status(self) -> dict:
         """
@@ -175,3 +179,59 @@ class RateLimiter:
             "should_warn": self.should_warn(),
             "should_wait": self.should_wait(),
         }
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket that paces async callers to a sustained request rate.
+
+    Holds up to ``capacity`` tokens, refilled at ``rate`` tokens per second.
+    ``acquire`` takes tokens, sleeping until enough have accrued; waiters are
+    served in arrival order. Complements RateLimiter, which only stops once
+    GitHub's quota is already spent.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize token bucket (starts full).
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held (largest burst allowed)
+            timer: Clock returning seconds (injectable for tests)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._timer = timer
+        self._updated = timer()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._timer()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, cost: float = 1) -> None:
+        """
+        Take ``cost`` tokens, waiting for them to accrue if needed.
+
+        Args:
+            cost: Tokens to take (at most ``capacity``)
+
+        Raises:
+            ValueError: If cost exceeds the bucket's capacity
+        """
+        if cost > self.capacity:
+            raise ValueError(f"cost {cost} exceeds bucket capacity {self.capacity}")
+        async with self._lock:
+            self._refill()
+            while self._tokens < cost:
+                await asyncio.sleep((cost - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= cost
@@ -0,0 +1,103 @@
+"""
+Small thread-safe TTL cache for memoizing GitHub API responses.
+
+Entries expire ``ttl`` seconds after they are stored; when ``maxsize`` is
+reached the least recently used entry is evicted. An optional ``maxweight``
+additionally bounds the summed per-entry weights (e.g. body bytes) the same
+way. Safe to share between the worker threads that run blocking API calls.
+
+Modified: 2025-11-07
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Bounded mapping whose entries expire after a fixed time-to-live."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+        maxweight: Optional[int] = None,
+    ):
+        """
+        Initialize TTL cache.
+
+        Args:
+            maxsize: Maximum number of live entries
+            ttl: Seconds an entry stays valid after it is stored
+            timer: Clock returning seconds (injectable for tests)
+            maxweight: Maximum summed weight of entries (None = unbounded);
+                weights are given to set()
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxweight = maxweight
+        self._timer = timer
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the live value for ``key``, or ``default`` if absent/expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value, weight = entry
+            if expires_at <= self._timer():
+                del self._data[key]
+                self._weight -= weight
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, weight: int = 0) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds.
+
+        An entry heavier than ``maxweight`` on its own is not stored (and
+        replaces nothing).
+        """
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._weight -= old[2]
+            if self.maxweight is not None and weight > self.maxweight:
+                return
+            self._data[key] = (self._timer() + self.ttl, value, weight)
+            self._weight += weight
+            while len(self._data) > self.maxsize or (
+                self.maxweight is not None and self._weight > self.maxweight
+            ):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self._weight -= evicted
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Remove ``key`` and return its value (expired or not), else ``default``."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return default
+            self._weight -= entry[2]
+        return entry[1]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+
+    @property
+    def weight(self) -> int:
+        """Summed weight of the stored entries (expired ones included until dropped)."""
+        with self._lock:
+            return self._weight
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
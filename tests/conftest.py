@@ -78,7 +78,7 @@ async def temp_cache():
 
         yield cache
 
-        # Cleanup is automatic via context manager
+        await cache.close()
 
 
 @pytest.fixture
@@ -190,7 +190,7 @@ async def test_full_initialization_flow():
 
     folders = await loader.ensure_default_folders()
     # Should create "All Stars" folder
-    assert mock_cache.create_virtual_folder.called
+    assert mock_cache.create_virtual_folders.called
 
     print("✓ Full initialization flow completes successfully")
 
@@ -7,12 +7,20 @@ Modified: 2025-11-07
 import json
 import os
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock, PropertyMock
 import pytest
-from ganger.core.auth import GitHubAuth
+from ganger.core.auth import AuthMethod, GitHubAuth
 from ganger.core.exceptions import AuthenticationError
 
 
+@pytest.fixture(autouse=True)
+def clear_verified_tokens():
+    """Keep the process-wide verification memo from leaking between tests."""
+    GitHubAuth._verified_tokens.clear()
+    yield
+    GitHubAuth._verified_tokens.clear()
+
+
 class TestGitHubAuth:
     """Test GitHubAuth class."""
 
@@ -23,6 +31,17 @@ class TestGitHubAuth:
 
         assert auth.token_file == token_file
         assert auth.auth_method == "pat"
+        assert auth._auth_method is AuthMethod.PAT
+
+    def test_auth_method_parsing(self, tmp_path):
+        """Config strings map to AuthMethod members; unknown names to None."""
+        assert AuthMethod.parse("OAuth") is AuthMethod.OAUTH
+        assert AuthMethod.parse("auto") is AuthMethod.AUTO
+        assert AuthMethod.parse("token") is None
+
+        auth = GitHubAuth(token_file=tmp_path / "token.json", auth_method="auto")
+        auth.auth_method = "oauth"
+        assert auth._auth_method is AuthMethod.OAUTH
 
     def test_save_and_load_token(self, tmp_path):
         """Test saving and loading tokens."""
@@ -45,10 +64,10 @@ class TestGitHubAuth:
             data = json.load(f)
             assert data["access_token"] == test_token
             assert data["test"] == "metadata"
-            assert "created_at" in data
+            assert isinstance(data["created_at"], int)
 
     @patch.dict(os.environ, {"GITHUB_TOKEN": "ghp_env_token"})
-    @patch("ganger.core.auth.Github")
+    @patch("github.Github")
     def test_authenticate_from_env(self, mock_github, tmp_path):
         """Test authentication from environment variable."""
         # Mock successful verification
@@ -62,7 +81,7 @@ class TestGitHubAuth:
         assert auth._token == "ghp_env_token"
         assert mock_github.called
 
-    @patch("ganger.core.auth.Github")
+    @patch("github.Github")
     def test_verify_token_success(self, mock_github, tmp_path):
         """Test successful token verification."""
         mock_user = Mock()
@@ -75,7 +94,7 @@ class TestGitHubAuth:
         assert auth._verify_token()
         assert auth._github_client is not None
 
-    @patch("ganger.core.auth.Github")
+    @patch("github.Github")
     def test_verify_token_failure(self, mock_github, tmp_path):
         """Test failed token verification."""
         from github import GithubException
@@ -90,7 +109,25 @@ class TestGitHubAuth:
 
         assert not auth._verify_token()
 
-    @patch("ganger.core.auth.Github")
+    @patch("github.Github")
+    def test_verify_token_is_memoized(self, mock_github, tmp_path):
+        """A token verified once is not re-checked against the API."""
+        mock_user = Mock()
+        mock_user.login = "testuser"
+        mock_github.return_value.get_user.return_value = mock_user
+
+        first = GitHubAuth(token_file=tmp_path / "token.json", token="ghp_memo")
+        assert first._verify_token()
+        second = GitHubAuth(token_file=tmp_path / "token.json", token="ghp_memo")
+        assert second._verify_token()
+
+        assert mock_github.return_value.get_user.call_count == 1
+        assert second._github_client is not None
+
+        second.revoke_credentials()
+        assert "ghp_memo" not in GitHubAuth._verified_tokens
+
+    @patch("github.Github")
     def test_get_github_client(self, mock_github, tmp_path):
         """Test getting GitHub client."""
         mock_user = Mock()
@@ -111,26 +148,28 @@ class TestGitHubAuth:
         with pytest.raises(AuthenticationError, match="Not authenticated"):
             auth.get_github_client()
 
-    @patch("ganger.core.auth.Github")
-    def test_get_user_info(self, mock_github, tmp_path):
+    @patch("httpx.get")
+    def test_get_user_info(self, mock_get, tmp_path):
         """Test getting user info."""
-        mock_user = Mock()
-        mock_user.login = "testuser"
-        mock_user.name = "Test User"
-        mock_user.email = "test@example.com"
-        mock_user.bio = "Test bio"
-        mock_user.public_repos = 10
-        mock_user.followers = 5
-        mock_user.following = 3
-        mock_user.created_at = None
-
-        mock_client = Mock()
-        mock_client.get_user.return_value = mock_user
-        mock_github.return_value = mock_client
+        mock_get.return_value = Mock(
+            status_code=200,
+            json=Mock(
+                return_value={
+                    "login": "testuser",
+                    "name": "Test User",
+                    "email": "test@example.com",
+                    "bio": "Test bio",
+                    "public_repos": 10,
+                    "followers": 5,
+                    "following": 3,
+                    "created_at": "2020-01-01T00:00:00Z",
+                    "plan": {"name": "free"},
+                }
+            ),
+        )
 
         auth = GitHubAuth(token_file=tmp_path / "token.json")
         auth._token = "ghp_test_token"
-        auth._github_client = mock_client
 
         info = auth.get_user_info()
 
@@ -138,6 +177,27 @@ class TestGitHubAuth:
         assert info["name"] == "Test User"
         assert info["email"] == "test@example.com"
         assert info["public_repos"] == 10
+        assert info["created_at"] == "2020-01-01T00:00:00Z"
+        assert "plan" not in info
+        mock_get.assert_called_once()
+        assert mock_get.call_args.kwargs["headers"]["Authorization"] == "token ghp_test_token"
+
+    @patch("httpx.get")
+    def test_get_user_info_rejected_token(self, mock_get, tmp_path):
+        """A 401 from /user surfaces as AuthenticationError."""
+        mock_get.return_value = Mock(status_code=401)
+
+        auth = GitHubAuth(token_file=tmp_path / "token.json", token="ghp_revoked")
+
+        with pytest.raises(AuthenticationError):
+            auth.get_user_info()
+
+    def test_get_user_info_not_authenticated(self, tmp_path):
+        """get_user_info requires a token."""
+        auth = GitHubAuth(token_file=tmp_path / "token.json")
+
+        with pytest.raises(AuthenticationError, match="Not authenticated"):
+            auth.get_user_info()
 
     def test_revoke_credentials(self, tmp_path):
         """Test revoking credentials."""
@@ -155,7 +215,7 @@ class TestGitHubAuth:
         assert auth._github_client is None
 
     @patch.dict(os.environ, {"GITHUB_TOKEN": "ghp_invalid"})
-    @patch("ganger.core.auth.Github")
+    @patch("github.Github")
     def test_authenticate_invalid_env_token(self, mock_github, tmp_path):
         """Test authentication with invalid environment token."""
         # Mock Github to raise exception on invalid token
@@ -168,7 +228,7 @@ class TestGitHubAuth:
         with pytest.raises(AuthenticationError, match="GITHUB_TOKEN.*invalid"):
             auth.authenticate()
 
-    @patch("ganger.core.auth.Github")
+    @patch("github.Github")
     def test_authenticate_invalid_token_file(self, mock_github, tmp_path):
         """Test authentication with invalid token in file."""
         token_file = tmp_path / "token.json"
@@ -287,14 +347,27 @@ class TestGitHubAuth:
         expected_path = Path.home() / ".config" / "ganger" / "token.json"
         assert auth.token_file == expected_path
 
+    def test_init_does_not_touch_filesystem(self, tmp_path, monkeypatch):
+        """Constructing GitHubAuth neither resolves nor creates the config dir."""
+        monkeypatch.setattr(Path, "home", lambda: tmp_path)
+
+        auth = GitHubAuth()
+
+        assert not (tmp_path / ".config").exists()
+        assert auth.token_file == tmp_path / ".config" / "ganger" / "token.json"
+        assert not (tmp_path / ".config").exists()
+
+        auth._save_token("ghp_lazy")
+        assert auth.token_file.exists()
+
 
 class TestOAuthDeviceFlow:
     """Test OAuth device flow authentication."""
 
-    @patch("httpx.post")
+    @patch("httpx.AsyncClient.post", new_callable=AsyncMock)
     @patch("webbrowser.open")
-    @patch("time.sleep")
-    @patch("ganger.core.auth.Github")
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    @patch("github.Github")
     def test_oauth_device_flow_success(self, mock_github_class, mock_sleep, mock_browser, mock_post, tmp_path):
         """Test successful OAuth device flow (lines 184-267)."""
         token_file = tmp_path / "token.json"
@@ -335,10 +408,17 @@ class TestOAuthDeviceFlow:
         assert auth._token is not None
         assert auth.get_token() == "gho_test_token_123"
         mock_browser.assert_called_once()
-
-    @patch("httpx.post")
+        mock_github_instance.get_user.assert_called_once()
+        # Device-code request and both polls go through the one shared client
+        assert [c.args[0] for c in mock_post.call_args_list] == [
+            "/login/device/code",
+            "/login/oauth/access_token",
+            "/login/oauth/access_token",
+        ]
+
+    @patch("httpx.AsyncClient.post", new_callable=AsyncMock)
     @patch("webbrowser.open")
-    @patch("time.sleep")
+    @patch("asyncio.sleep", new_callable=AsyncMock)
     def test_oauth_device_flow_expired(self, mock_sleep, mock_browser, mock_post, tmp_path):
         """Test OAuth flow with expired token (lines 251-252)."""
         token_file = tmp_path / "token.json"
@@ -364,9 +444,9 @@ class TestOAuthDeviceFlow:
         with pytest.raises(AuthenticationError, match="expired"):
             auth._oauth_device_flow()
 
-    @patch("httpx.post")
+    @patch("httpx.AsyncClient.post", new_callable=AsyncMock)
     @patch("webbrowser.open")
-    @patch("time.sleep")
+    @patch("asyncio.sleep", new_callable=AsyncMock)
     def test_oauth_device_flow_denied(self, mock_sleep, mock_browser, mock_post, tmp_path):
         """Test OAuth flow with user denial (lines 253-254)."""
         token_file = tmp_path / "token.json"
@@ -392,9 +472,9 @@ class TestOAuthDeviceFlow:
         with pytest.raises(AuthenticationError, match="denied"):
             auth._oauth_device_flow()
 
-    @patch("httpx.post")
+    @patch("httpx.AsyncClient.post", new_callable=AsyncMock)
     @patch("webbrowser.open")
-    @patch("time.sleep")
+    @patch("asyncio.sleep", new_callable=AsyncMock)
     def test_oauth_device_flow_slow_down(self, mock_sleep, mock_browser, mock_post, tmp_path):
         """Test OAuth flow with slow_down response (lines 247-250)."""
         token_file = tmp_path / "token.json"
@@ -422,7 +502,7 @@ class TestOAuthDeviceFlow:
         mock_post.side_effect = [device_response, token_slow_down, token_success]
 
         # Mock GitHub client
-        with patch("ganger.core.auth.Github") as mock_github_class:
+        with patch("github.Github") as mock_github_class:
             mock_user = Mock()
             mock_user.login = "testuser"
             mock_github_instance = Mock()
@@ -434,8 +514,121 @@ class TestOAuthDeviceFlow:
 
             # Verify slow_down was handled (interval increased)
             assert auth._token is not None
+            assert [c.args[0] for c in mock_sleep.await_args_list] == [5, 10]
+
+    @patch("httpx.AsyncClient.post", new_callable=AsyncMock)
+    @patch("webbrowser.open")
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    @patch("github.Github")
+    def test_oauth_device_flow_exchanged_token_rejected(
+        self, mock_github_class, mock_sleep, mock_browser, mock_post, tmp_path
+    ):
+        """A token GitHub rejects right after exchange fails the flow."""
+        from github import GithubException
+
+        device_response = Mock()
+        device_response.json.return_value = {
+            "device_code": "ABC123",
+            "user_code": "WXYZ-1234",
+            "verification_uri": "https://github.com/login/device",
+            "expires_in": 900,
+            "interval": 5
+        }
+        token_success = Mock()
+        token_success.json.return_value = {"access_token": "gho_bad"}
+        mock_post.side_effect = [device_response, token_success]
+
+        type(mock_github_class.return_value.get_user.return_value).login = PropertyMock(
+            side_effect=GithubException(401, {"message": "Bad credentials"})
+        )
+
+        auth = GitHubAuth(token_file=tmp_path / "token.json", auth_method="oauth")
+
+        with pytest.raises(AuthenticationError, match="verification failed"):
+            auth._oauth_device_flow()
+        # Exactly one user lookup: no separate verify round-trip
+        assert mock_github_class.return_value.get_user.call_count == 1
+
+    @patch("httpx.AsyncClient.post", new_callable=AsyncMock)
+    @patch("webbrowser.open")
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    @patch("github.Github")
+    def test_oauth_device_flow_verification_network_error(
+        self, mock_github_class, mock_sleep, mock_browser, mock_post, tmp_path
+    ):
+        """Non-GitHub errors during verification still raise AuthenticationError."""
+        device_response = Mock()
+        device_response.json.return_value = {
+            "device_code": "ABC123",
+            "user_code": "WXYZ-1234",
+            "verification_uri": "https://github.com/login/device",
+            "expires_in": 900,
+            "interval": 5
+        }
+        token_success = Mock()
+        token_success.json.return_value = {"access_token": "gho_test"}
+        mock_post.side_effect = [device_response, token_success]
+
+        mock_github_class.return_value.get_user.side_effect = ConnectionError("reset")
+
+        auth = GitHubAuth(token_file=tmp_path / "token.json", auth_method="oauth")
+
+        with pytest.raises(AuthenticationError, match="Token verification failed"):
+            auth._oauth_device_flow()
+        assert "gho_test" not in GitHubAuth._verified_tokens
+
+    @staticmethod
+    def _pending_then_success(mock_post):
+        device_response = Mock()
+        device_response.json.return_value = {
+            "device_code": "ABC123",
+            "user_code": "WXYZ-1234",
+            "verification_uri": "https://github.com/login/device",
+            "expires_in": 900,
+            "interval": 5
+        }
+        token_pending = Mock()
+        token_pending.json.return_value = {"error": "authorization_pending"}
+        token_success = Mock()
+        token_success.json.return_value = {"access_token": "gho_test"}
+        mock_post.side_effect = [device_response, token_pending, token_success]
+
+    @pytest.mark.asyncio
+    @patch("httpx.AsyncClient.post", new_callable=AsyncMock)
+    @patch("webbrowser.open")
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    @patch("github.Github")
+    async def test_oauth_device_flow_inside_running_loop(
+        self, mock_github_class, mock_sleep, mock_browser, mock_post, tmp_path
+    ):
+        """The sync wrapper works when called from a thread with a running loop."""
+        self._pending_then_success(mock_post)
+        mock_github_class.return_value.get_user.return_value.login = "testuser"
+
+        auth = GitHubAuth(token_file=tmp_path / "token.json", auth_method="oauth")
+        auth._oauth_device_flow()
+
+        assert auth.get_token() == "gho_test"
+
+    @patch("httpx.AsyncClient.post", new_callable=AsyncMock)
+    @patch("webbrowser.open")
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    @patch("github.Github")
+    def test_oauth_device_flow_flushes_first_pending_dot(
+        self, mock_github_class, mock_sleep, mock_browser, mock_post, tmp_path
+    ):
+        """The first progress dot is flushed instead of sitting in the buffer."""
+        self._pending_then_success(mock_post)
+        mock_github_class.return_value.get_user.return_value.login = "testuser"
+
+        auth = GitHubAuth(token_file=tmp_path / "token.json", auth_method="oauth")
+        with patch("sys.stdout") as mock_stdout:
+            auth._oauth_device_flow()
+
+        # One flush for the banner, one for the first dot
+        assert mock_stdout.flush.call_count == 2
 
-    @patch("httpx.post")
+    @patch("httpx.AsyncClient.post", new_callable=AsyncMock)
     def test_oauth_device_flow_request_error(self, mock_post, tmp_path):
         """Test OAuth flow with device code request error (lines 196-197)."""
         token_file = tmp_path / "token.json"
@@ -448,9 +641,9 @@ class TestOAuthDeviceFlow:
         with pytest.raises(AuthenticationError, match="Failed to request device code"):
             auth._oauth_device_flow()
 
-    @patch("httpx.post")
+    @patch("httpx.AsyncClient.post", new_callable=AsyncMock)
     @patch("webbrowser.open")
-    @patch("time.sleep")
+    @patch("asyncio.sleep", new_callable=AsyncMock)
     @patch("time.time")
     def test_oauth_device_flow_timeout(self, mock_time, mock_sleep, mock_browser, mock_post, tmp_path):
         """Test OAuth flow timeout (line 274)."""
@@ -485,8 +678,8 @@ class TestPATPrompt:
     """Test Personal Access Token prompt authentication."""
 
     @patch("getpass.getpass")
-    @patch("ganger.core.auth.Github")
-    def test_prompt_for_pat_success(self, mock_github_class, mock_getpass, tmp_path):
+    @patch("github.Github")
+    def test_prompt_for_pat_success(self, mock_github_class, mock_getpass, tmp_path, capsys):
         """Test PAT prompt with valid token (lines 283-302)."""
         token_file = tmp_path / "token.json"
         mock_getpass.return_value = "ghp_valid_token_123"
@@ -503,6 +696,9 @@ class TestPATPrompt:
 
         assert auth._token is not None
         assert auth.get_token() == "ghp_valid_token_123"
+        out = capsys.readouterr().out
+        assert out.startswith("\n" + "=" * 60 + "\nGitHub Personal Access Token Required\n")
+        assert "3. Enter the token below\n\n" in out
 
     @patch("getpass.getpass")
     def test_prompt_for_pat_empty(self, mock_getpass, tmp_path):
@@ -516,7 +712,7 @@ class TestPATPrompt:
             auth._prompt_for_pat()
 
     @patch("getpass.getpass")
-    @patch("ganger.core.auth.Github")
+    @patch("github.Github")
     def test_prompt_for_pat_invalid(self, mock_github_class, mock_getpass, tmp_path):
         """Test PAT prompt with invalid token (lines 303-304)."""
         token_file = tmp_path / "token.json"
@@ -8,6 +8,7 @@ import pytest
 import pytest_asyncio
 import aiosqlite
 from pathlib import Path
+from dataclasses import replace
 from datetime import datetime, timezone
 from ganger.core.cache import PersistentCache
 from ganger.core.models import StarredRepo, VirtualFolder, RepoMetadata
@@ -20,7 +21,8 @@ async def cache(tmp_path):
     db_path = tmp_path / "test.db"
     cache = PersistentCache(db_path=db_path, ttl_seconds=3600)
     await cache.initialize()
-    return cache
+    yield cache
+    await cache.close()
 
 
 @pytest.fixture
@@ -71,6 +73,7 @@ class TestCacheInitialization:
         db_path = tmp_path / "test.db"
         cache = PersistentCache(db_path=db_path)
         await cache.initialize()
+        await cache.close()
 
         assert db_path.exists()
 
@@ -90,6 +93,100 @@ class TestCacheInitialization:
             assert "metadata" in tables
 
 
+    @pytest.mark.asyncio
+    async def test_folder_links_indexed_by_repo(self, tmp_path):
+        """Deleting a repo's folder links uses an index, not a table scan."""
+        async with PersistentCache(db_path=tmp_path / "test.db") as cache:
+            await cache.initialize()
+            async with cache._connect() as db:
+                cursor = await db.execute(
+                    "EXPLAIN QUERY PLAN DELETE FROM folder_repos WHERE repo_id = ?", ("x",)
+                )
+                plan = " ".join(row[3] for row in await cursor.fetchall())
+        assert "idx_folder_repos_repo" in plan
+
+class TestSharedConnection:
+    """Test the long-lived connection behind _connect()."""
+
+    @pytest.mark.asyncio
+    async def test_connection_is_reused(self, cache, sample_repos):
+        """Successive operations share one connection with FKs and Row rows."""
+        async with cache._connect() as db:
+            first = db
+        await cache.set_starred_repos(sample_repos)
+        await cache.get_starred_repos()
+        async with cache._connect() as db:
+            assert db is first
+            assert db.row_factory is aiosqlite.Row
+            cursor = await db.execute("PRAGMA foreign_keys")
+            assert (await cursor.fetchone())[0] == 1
+
+    @pytest.mark.asyncio
+    async def test_close_and_reopen(self, cache, sample_repos):
+        """close() drops the connection; the next call opens a fresh one."""
+        await cache.set_starred_repos(sample_repos)
+        async with cache._connect() as db:
+            first = db
+
+        await cache.close()
+        assert cache._connection is None
+        await cache.close()  # idempotent
+
+        repos = await cache.get_starred_repos()
+        assert len(repos) == len(sample_repos)
+        async with cache._connect() as db:
+            assert db is not first
+
+    @pytest.mark.asyncio
+    async def test_async_context_manager_closes(self, tmp_path):
+        """Using the cache as an async context manager closes it on exit."""
+        async with PersistentCache(db_path=tmp_path / "ctx.db") as cache:
+            await cache.initialize()
+            assert cache._connection is not None
+        assert cache._connection is None
+
+    @pytest.mark.asyncio
+    async def test_uncommitted_work_rolled_back_on_exit(self, cache, sample_repos):
+        """A failing operation can't leave a transaction open on the shared connection."""
+        with pytest.raises(RuntimeError):
+            async with cache._connect() as db:
+                await db.execute(
+                    "INSERT INTO metadata (key, value) VALUES ('scratch', '1')"
+                )
+                raise RuntimeError("boom")
+
+        async with cache._connect() as db:
+            assert not db.in_transaction
+            cursor = await db.execute("SELECT 1 FROM metadata WHERE key = 'scratch'")
+            assert await cursor.fetchone() is None
+
+        # Later writes still commit normally
+        await cache.set_starred_repos(sample_repos)
+        assert len(await cache.get_starred_repos()) == len(sample_repos)
+
+
+    @pytest.mark.asyncio
+    async def test_connection_pragmas(self, cache):
+        """File-backed caches open in WAL mode with relaxed sync."""
+        async with cache._connect() as db:
+            cursor = await db.execute("PRAGMA journal_mode")
+            assert (await cursor.fetchone())[0] == "wal"
+            cursor = await db.execute("PRAGMA synchronous")
+            assert (await cursor.fetchone())[0] == 1  # NORMAL
+            cursor = await db.execute("PRAGMA busy_timeout")
+            assert (await cursor.fetchone())[0] == 5000
+
+    @pytest.mark.asyncio
+    async def test_in_memory_cache_skips_wal(self):
+        """An in-memory database initializes without the file-only pragmas."""
+        async with PersistentCache(db_path=":memory:") as cache:
+            await cache.initialize()
+            async with cache._connect() as db:
+                cursor = await db.execute("PRAGMA journal_mode")
+                assert (await cursor.fetchone())[0] == "memory"
+                cursor = await db.execute("PRAGMA foreign_keys")
+                assert (await cursor.fetchone())[0] == 1
+
 class TestStarredReposOperations:
     """Test starred repos operations."""
 
@@ -122,6 +219,32 @@ class TestStarredReposOperations:
         assert repo.full_name == "octocat/Hello-World"
         assert repo.language == "Python"
 
+    @pytest.mark.asyncio
+    async def test_get_repo_batches_accessed_at(self, cache, sample_repos, monkeypatch):
+        """Reads buffer accessed_at; the batch is written at the threshold and on close."""
+        await cache.set_starred_repos(sample_repos)
+
+        async def accessed_at(repo_id):
+            async with aiosqlite.connect(cache.db_path) as db:
+                cursor = await db.execute(
+                    "SELECT accessed_at FROM starred_repos WHERE id = ?", (repo_id,)
+                )
+                return (await cursor.fetchone())[0]
+
+        before = await accessed_at("1")
+        await cache.get_repo("1")
+        assert await accessed_at("1") == before
+        assert "1" in cache._pending_access
+
+        monkeypatch.setattr(PersistentCache, "ACCESS_FLUSH_THRESHOLD", 2)
+        await cache.get_repo("2")
+        assert not cache._pending_access
+        assert await accessed_at("1") != before
+
+        await cache.get_repo("1")
+        await cache.close()
+        assert not cache._pending_access
+
     @pytest.mark.asyncio
     async def test_get_repo_not_found(self, cache):
         """Test getting a non-existent repo."""
@@ -165,6 +288,88 @@ class TestStarredReposOperations:
         assert repos is not None
         assert len(repos) == len(sample_repos)
 
+    @pytest.mark.asyncio
+    async def test_fresh_sync_skips_metadata_read(self, cache, sample_repos, monkeypatch):
+        """Within the TTL, the freshness check doesn't touch the metadata table."""
+        await cache.set_starred_repos(sample_repos)
+
+        async def fail(*args, **kwargs):
+            raise AssertionError("metadata should not be read")
+
+        monkeypatch.setattr(PersistentCache, "_get_metadata_value", fail)
+        assert len(await cache.get_starred_repos()) == len(sample_repos)
+
+    @pytest.mark.asyncio
+    async def test_stale_memo_rechecks_metadata(self, cache, sample_repos):
+        """An expired memo defers to the DB, where another process may have synced."""
+        await cache.set_starred_repos(sample_repos)
+        cache._sync_updated_at = datetime(2000, 1, 1)
+
+        assert len(await cache.get_starred_repos()) == len(sample_repos)
+        assert cache._sync_is_fresh()
+
+    @pytest.mark.asyncio
+    async def test_expired_sync_timestamp_expires_cache(self, cache, sample_repos):
+        """An old sync-completion timestamp in metadata expires the cache."""
+        await cache.set_starred_repos(sample_repos)
+        async with cache._connect() as db:
+            await db.execute(
+                "UPDATE metadata SET value = ? WHERE key = ?",
+                ("2000-01-01T00:00:00", PersistentCache.STARRED_SYNC_UPDATED_AT_KEY),
+            )
+            await db.commit()
+        cache._sync_updated_at = None
+
+        assert await cache.get_starred_repos() is None
+        assert await cache.get_starred_repos(force_refresh=True) is not None
+
+    @pytest.mark.asyncio
+    async def test_complete_sync_records_starred_at_watermark(self, cache, sample_repos):
+        """Only a complete sync advances the newest-star watermark."""
+        newest = replace(sample_repos[0], starred_at=datetime(2025, 6, 1, tzinfo=timezone.utc))
+        await cache.upsert_starred_repos([newest])
+        await cache.set_starred_sync_state(
+            cached_count=1, total_count=2, cursor="cursor-2", complete=False
+        )
+        assert (await cache.get_starred_sync_state())["last_starred_at"] is None
+
+        await cache.set_starred_repos([newest] + sample_repos[1:])
+
+        state = await cache.get_starred_sync_state()
+        assert state["last_starred_at"] == datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+        await cache.invalidate_repos()
+        assert (await cache.get_starred_sync_state())["last_starred_at"] is None
+
+    @pytest.mark.asyncio
+    async def test_sync_state_records_page_order(self, cache):
+        """Saved sync state carries the page order its cursor belongs to."""
+        assert (await cache.get_starred_sync_state())["order"] is None
+
+        await cache.set_starred_sync_state(
+            cached_count=1, total_count=2, cursor="cursor-2", complete=False
+        )
+        assert (await cache.get_starred_sync_state())["order"] == cache.STARRED_SYNC_ORDER
+
+        await cache.invalidate_repos()
+        assert (await cache.get_starred_sync_state())["order"] is None
+
+    @pytest.mark.asyncio
+    async def test_set_starred_repos_is_atomic(self, cache, sample_repos, monkeypatch):
+        """A failure after the upsert leaves the previous snapshot untouched."""
+        await cache.set_starred_repos(sample_repos[:1])
+
+        async def fail(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(PersistentCache, "_write_starred_sync_state", fail)
+        with pytest.raises(RuntimeError):
+            await cache.set_starred_repos(sample_repos[1:])
+        monkeypatch.undo()
+
+        repos = await cache.get_starred_repos(force_refresh=True)
+        assert [r.id for r in repos] == [sample_repos[0].id]
+
     @pytest.mark.asyncio
     async def test_set_starred_repos_preserves_existing_folder_links(
         self, cache, sample_repos, sample_folder
@@ -190,6 +395,20 @@ class TestStarredReposOperations:
         assert [repo.id for repo in folder_repos] == [sample_repos[0].id]
         assert folder_repos[0].stars_count == sample_repos[0].stars_count + 100
 
+    @pytest.mark.asyncio
+    async def test_prune_large_snapshot(self, cache):
+        """A large snapshot prunes exactly the repos missing from it."""
+        repos = [
+            StarredRepo(id=str(i), full_name=f"o/r{i}", name=f"r{i}", owner="o")
+            for i in range(1200)
+        ]
+        await cache.set_starred_repos(repos)
+        await cache.set_starred_repos(repos[200:])
+
+        cached = await cache.get_starred_repos(force_refresh=True)
+        assert len(cached) == 1000
+        assert "0" not in {r.id for r in cached}
+
     @pytest.mark.asyncio
     async def test_set_starred_repos_prunes_stale_folder_links(
         self, cache, sample_repos, sample_folder
@@ -205,6 +424,59 @@ class TestStarredReposOperations:
         assert folder_repos == []
 
 
+class TestRepoSearch:
+    """Test full-text search over cached repos."""
+
+    @pytest.mark.asyncio
+    async def test_search_matches_name_description_and_topics(self, cache, sample_repos):
+        """Search hits every indexed column and matches word prefixes."""
+        await cache.set_starred_repos(sample_repos)
+
+        assert [r.id for r in await cache.search_repos("hello")] == ["1"]
+        assert [r.id for r in await cache.search_repos("repo 2")] == ["2"]
+        assert [r.id for r in await cache.search_repos("javascr")] == ["2"]
+        assert {r.id for r in await cache.search_repos("test")} == {"1", "2"}
+        assert await cache.search_repos("   ") == []
+
+    @pytest.mark.asyncio
+    async def test_search_treats_syntax_as_text(self, cache, sample_repos):
+        """FTS operators and quotes in user input don't raise."""
+        await cache.set_starred_repos(sample_repos)
+
+        assert [r.id for r in await cache.search_repos('Hello-World "')] == ["1"]
+        assert await cache.search_repos("NOT AND (*") == []
+
+    @pytest.mark.asyncio
+    async def test_search_follows_updates_and_deletes(self, cache, sample_repos):
+        """The index tracks upserts and prunes."""
+        await cache.set_starred_repos(sample_repos)
+
+        renamed = replace(sample_repos[0], description="Quantum toolkit")
+        await cache.set_starred_repos([renamed])
+
+        assert [r.id for r in await cache.search_repos("quantum")] == ["1"]
+        assert await cache.search_repos("javascript") == []
+        assert await cache.search_repos("Test repo 1") == []
+
+    @pytest.mark.asyncio
+    async def test_search_index_built_for_existing_db(self, tmp_path, sample_repos):
+        """Opening a DB without the index backfills it from existing rows."""
+        db_path = tmp_path / "legacy.db"
+        async with PersistentCache(db_path=db_path) as cache:
+            await cache.initialize()
+            await cache.set_starred_repos(sample_repos)
+
+        async with aiosqlite.connect(db_path) as db:
+            for trigger in ("starred_repos_fts_ai", "starred_repos_fts_ad", "starred_repos_fts_au"):
+                await db.execute(f"DROP TRIGGER {trigger}")
+            await db.execute("DROP TABLE starred_repos_fts")
+            await db.commit()
+
+        async with PersistentCache(db_path=db_path) as cache:
+            await cache.initialize()
+            assert [r.id for r in await cache.search_repos("hello")] == ["1"]
+
+
 class TestVirtualFoldersOperations:
     """Test virtual folders operations."""
 
@@ -236,6 +508,34 @@ class TestVirtualFoldersOperations:
         with pytest.raises(CacheError, match="already exists"):
             await cache.create_virtual_folder(duplicate)
 
+    @pytest.mark.asyncio
+    async def test_create_virtual_folders_skips_existing(self, cache, sample_folder):
+        """Bulk creation writes only folders whose id and name are both free."""
+        await cache.create_virtual_folder(sample_folder)
+
+        created = await cache.create_virtual_folders([
+            VirtualFolder(id="all-stars", name="All Stars"),
+            VirtualFolder(id="other-id", name=sample_folder.name),
+            VirtualFolder(id=sample_folder.id, name="Other Name"),
+            VirtualFolder(id="rust", name="Rust", auto_tags=["rust"], kind="rule"),
+            VirtualFolder(id="rust-2", name="Rust"),
+        ])
+
+        assert [f.id for f in created] == ["all-stars", "rust"]
+        folders = {f.id: f for f in await cache.get_virtual_folders()}
+        assert set(folders) == {sample_folder.id, "all-stars", "rust"}
+        assert folders["all-stars"].kind == "system"
+
+    @pytest.mark.asyncio
+    async def test_create_virtual_folders_rejects_bad_kind(self, cache):
+        """An invalid kind anywhere in the batch writes nothing."""
+        with pytest.raises(CacheError):
+            await cache.create_virtual_folders([
+                VirtualFolder(id="ok", name="OK"),
+                VirtualFolder(id="bad", name="Bad", kind="system"),
+            ])
+        assert await cache.get_virtual_folders() == []
+
     @pytest.mark.asyncio
     async def test_delete_virtual_folder(self, cache, sample_folder):
         """Test deleting a virtual folder."""
@@ -261,6 +561,68 @@ class TestVirtualFoldersOperations:
         assert len(folder_repos) == 1
         assert folder_repos[0].full_name == "octocat/Hello-World"
 
+    @pytest.mark.asyncio
+    async def test_add_repos_to_folder_batch(self, cache, sample_repos, sample_folder):
+        """Bulk linking writes each repo once and reports how many were linked."""
+        await cache.set_starred_repos(sample_repos)
+        await cache.create_virtual_folder(sample_folder)
+
+        ids = [r.id for r in sample_repos]
+        assert await cache.add_repos_to_folder(sample_folder.id, ids + ids[:1]) == 2
+        assert await cache.add_repos_to_folder(sample_folder.id, []) == 0
+
+        folder_repos = await cache.get_folder_repos(sample_folder.id)
+        assert sorted(r.id for r in folder_repos) == sorted(ids)
+
+    @pytest.mark.asyncio
+    async def test_add_repos_to_folders_bulk(self, cache, sample_repos, sample_folder):
+        """Bulk auto-linking across folders counts only new links, per folder."""
+        await cache.set_starred_repos(sample_repos)
+        await cache.create_virtual_folder(sample_folder)
+        other = VirtualFolder(id="folder2", name="Other", auto_tags=["web"])
+        await cache.create_virtual_folder(other)
+        await cache.add_repo_to_folder("1", sample_folder.id, is_manual=True)
+
+        stats = await cache.add_repos_to_folders_bulk([
+            (sample_folder.id, "1"),
+            (sample_folder.id, "2"),
+            (sample_folder.id, "2"),
+            (other.id, "2"),
+        ])
+
+        assert stats == {sample_folder.id: 1, other.id: 1}
+        assert await cache.get_folder_repo_ids(sample_folder.id) == {"1", "2"}
+        assert await cache.get_folder_repo_ids(other.id) == {"2"}
+        assert await cache.add_repos_to_folders_bulk([]) == {}
+
+        async with cache._connect() as db:
+            cursor = await db.execute(
+                "SELECT is_manual FROM folder_repos WHERE folder_id = ? AND repo_id = '1'",
+                (sample_folder.id,),
+            )
+            assert (await cursor.fetchone())[0] == 1
+
+    @pytest.mark.asyncio
+    async def test_readding_link_keeps_manual_state(self, cache, sample_repos, sample_folder):
+        """An auto re-add never demotes a manual link; a manual add promotes an auto one."""
+        await cache.set_starred_repos(sample_repos)
+        await cache.create_virtual_folder(sample_folder)
+        await cache.add_repo_to_folder("1", sample_folder.id, is_manual=True)
+        await cache.set_folder_repo_position(sample_folder.id, "1", 7)
+        await cache.add_repo_to_folder("2", sample_folder.id, is_manual=False)
+
+        await cache.add_repos_to_folder(sample_folder.id, ["1", "2"], is_manual=False)
+        await cache.add_repo_to_folder("2", sample_folder.id, is_manual=True)
+
+        async with cache._connect() as db:
+            cursor = await db.execute(
+                "SELECT repo_id, is_manual, position FROM folder_repos "
+                "WHERE folder_id = ? ORDER BY repo_id",
+                (sample_folder.id,),
+            )
+            rows = [tuple(row) for row in await cursor.fetchall()]
+        assert rows == [("1", 1, 7), ("2", 1, None)]
+
     @pytest.mark.asyncio
     async def test_get_virtual_folders_reports_repo_count(self, cache, sample_repos, sample_folder):
         """Folder summaries should include the current repo count."""
@@ -273,6 +635,20 @@ class TestVirtualFoldersOperations:
         assert len(folders) == 1
         assert folders[0].repo_count == 1
 
+    @pytest.mark.asyncio
+    async def test_get_virtual_folders_counts_each_folder(self, cache, sample_repos, sample_folder):
+        """Counts are per folder, and folders without links report zero."""
+        await cache.set_starred_repos(sample_repos)
+        await cache.create_virtual_folder(sample_folder)
+        empty = VirtualFolder(id="folder2", name="Empty", created_at=datetime.now(timezone.utc))
+        await cache.create_virtual_folder(empty)
+        for repo in sample_repos:
+            await cache.add_repo_to_folder(repo.id, sample_folder.id)
+
+        counts = {f.id: f.repo_count for f in await cache.get_virtual_folders()}
+
+        assert counts == {sample_folder.id: 2, empty.id: 0}
+
     @pytest.mark.asyncio
     async def test_all_stars_repo_count_comes_from_starred_repo_cache(self, cache, sample_repos):
         """The special All Stars folder should reflect cached repos immediately."""
@@ -312,6 +688,36 @@ class TestVirtualFoldersOperations:
         folder_repos = await cache.get_folder_repos(sample_folder.id)
         assert len(folder_repos) == 0
 
+    @pytest.mark.asyncio
+    async def test_add_repo_to_folder_reports_new_links(self, cache, sample_repos, sample_folder):
+        """The return value says whether anything was written, without raising."""
+        await cache.set_starred_repos(sample_repos)
+        await cache.create_virtual_folder(sample_folder)
+        repo_id = sample_repos[0].id
+
+        assert await cache.add_repo_to_folder(repo_id, sample_folder.id, is_manual=False)
+        assert not await cache.add_repo_to_folder(repo_id, sample_folder.id, is_manual=False)
+        assert await cache.add_repo_to_folder(repo_id, sample_folder.id, is_manual=True)
+        assert not await cache.add_repo_to_folder(repo_id, sample_folder.id, is_manual=True)
+
+    @pytest.mark.asyncio
+    async def test_move_repos_to_folder(self, cache, sample_repos):
+        """Moves unlink each repo from its own source and link it to the target."""
+        await cache.set_starred_repos(sample_repos)
+        for folder_id in ("a", "b", "t"):
+            await cache.create_virtual_folder(
+                VirtualFolder(id=folder_id, name=folder_id, kind="curated")
+            )
+        await cache.add_repos_to_folder("a", ["1", "2"], is_manual=True)
+        await cache.add_repos_to_folder("b", ["2"], is_manual=True)
+
+        moved = await cache.move_repos_to_folder("t", [("1", "a"), ("2", "b"), ("1", "a")])
+
+        assert moved == 2
+        assert await cache.get_folder_repo_ids("a") == {"2"}
+        assert await cache.get_folder_repo_ids("b") == set()
+        assert await cache.get_folder_repo_ids("t") == {"1", "2"}
+
     @pytest.mark.asyncio
     async def test_get_empty_folder_repos(self, cache, sample_folder):
         """Test getting repos from empty folder."""
@@ -345,6 +751,11 @@ class TestRepoMetadataOperations:
         assert retrieved.readme_content == "# Hello World"
         assert retrieved.open_issues_count == 5
 
+        counters_only = await cache.get_repo_metadata("1", include_readme=False)
+        assert counters_only.readme_content is None
+        assert counters_only.open_issues_count == 5
+        assert counters_only.cached_at == retrieved.cached_at
+
     @pytest.mark.asyncio
     async def test_get_metadata_not_found(self, cache):
         """Test getting metadata for non-existent repo."""
@@ -375,6 +786,16 @@ class TestCacheUtilities:
         assert stats["metadata_count"] == 1
         assert stats["ttl_seconds"] == 3600
 
+    @pytest.mark.asyncio
+    async def test_get_stats_empty(self, cache):
+        """An empty cache reports zero counts and no oldest entry."""
+        stats = await cache.get_stats()
+
+        assert stats["repos_count"] == 0
+        assert stats["folders_count"] == 0
+        assert stats["metadata_count"] == 0
+        assert stats["oldest_cache"] is None
+
 
 class TestCacheCleanup:
     """Test cache cleanup operations."""
@@ -401,6 +822,25 @@ class TestCacheCleanup:
 
         # Should have cleaned up the repos
         assert count == 2
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_cleanup_expired_counts_and_keeps_fresh(self, cache, sample_repos):
+        """Only stale repos and their metadata go; the count matches."""
+        await cache.set_starred_repos(sample_repos)
+        await cache.set_repo_metadata(RepoMetadata(repo_id="1", cached_at=datetime.now()))
+        await cache.set_repo_metadata(RepoMetadata(repo_id="2", cached_at=datetime.now()))
+        async with cache._connect() as db:
+            await db.execute(
+                "UPDATE starred_repos SET cached_at = '2000-01-01T00:00:00' WHERE id = '1'"
+            )
+            await db.commit()
+
+        assert await cache.cleanup_expired() == 1
+        assert await cache.get_repo("1") is None
+        assert await cache.get_repo_metadata("1") is None
+        assert await cache.get_repo_metadata("2") is not None
+        assert await cache.cleanup_expired() == 0
 
     @pytest.mark.asyncio
     async def test_delete_nonexistent_folder(self, cache):
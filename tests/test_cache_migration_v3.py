@@ -49,6 +49,7 @@ async def test_fresh_db_lands_at_v3(tmp_path: Path) -> None:
     db_path = tmp_path / "fresh.db"
     cache = PersistentCache(db_path=db_path)
     await cache.initialize()
+    await cache.close()
 
     assert await _schema_version(db_path) == 3
     async with aiosqlite.connect(db_path) as db:
@@ -199,6 +200,7 @@ async def test_v2_to_v3_kind_backfill(tmp_path: Path) -> None:
 
     cache = PersistentCache(db_path=db_path)
     await cache.initialize()
+    await cache.close()
 
     assert await _schema_version(db_path) == 3
     async with aiosqlite.connect(db_path) as db:
@@ -218,6 +220,7 @@ async def test_v2_to_v3_adds_columns_and_user_tags(tmp_path: Path) -> None:
     await _build_v2_db(db_path)
     cache = PersistentCache(db_path=db_path)
     await cache.initialize()
+    await cache.close()
 
     async with aiosqlite.connect(db_path) as db:
         assert "kind" in await _columns(db, "virtual_folders")
@@ -235,6 +238,7 @@ async def test_initialize_is_idempotent(tmp_path: Path) -> None:
     cache = PersistentCache(db_path=db_path)
     await cache.initialize()
     await cache.initialize()  # second run must be a no-op
+    await cache.close()
 
     assert await _schema_version(db_path) == 3
     async with aiosqlite.connect(db_path) as db:
@@ -276,6 +280,7 @@ async def test_v1_db_walks_through_both_migrations(tmp_path: Path) -> None:
 
     cache = PersistentCache(db_path=db_path)
     await cache.initialize()
+    await cache.close()
 
     assert await _schema_version(db_path) == 3
     async with aiosqlite.connect(db_path) as db:
@@ -0,0 +1,90 @@
+"""
+Tests for the CLI entry point.
+
+Modified: 2025-11-07
+"""
+
+import pytest
+from click.testing import CliRunner
+
+from ganger import __version__
+from ganger.cli import _COMMAND_FACTORIES, _build_cli, _sniff_subcommand, cli
+
+ALL_COMMANDS = {"auth", "logout", "mcp", "tui", "status"}
+
+
+class TestSniffSubcommand:
+    """Test picking the subcommand out of argv."""
+
+    def test_no_arguments(self):
+        assert _sniff_subcommand(["ganger"]) is None
+
+    def test_only_options(self):
+        assert _sniff_subcommand(["ganger", "--help"]) is None
+        assert _sniff_subcommand(["ganger", "--version"]) is None
+
+    def test_first_positional_wins(self):
+        assert _sniff_subcommand(["ganger", "status"]) == "status"
+        assert _sniff_subcommand(["ganger", "auth", "--method", "pat"]) == "auth"
+
+    def test_options_before_subcommand_are_skipped(self):
+        assert _sniff_subcommand(["ganger", "-v", "tui"]) == "tui"
+
+
+class TestBuildCli:
+    """Test that only the requested command is constructed."""
+
+    def test_factories_cover_all_commands(self):
+        assert set(_COMMAND_FACTORIES) == ALL_COMMANDS
+
+    def test_status_registers_only_status(self):
+        assert set(_build_cli("status").commands) == {"status"}
+
+    def test_tui_registers_only_tui(self):
+        assert set(_build_cli("tui").commands) == {"tui"}
+
+    @pytest.mark.parametrize("subcommand", [None, "bogus"])
+    def test_unknown_or_missing_registers_all(self, subcommand):
+        assert set(_build_cli(subcommand).commands) == ALL_COMMANDS
+
+    def test_help_lists_all_commands(self):
+        result = CliRunner().invoke(_build_cli(None), ["--help"])
+
+        assert result.exit_code == 0
+        for name in ALL_COMMANDS:
+            assert name in result.output
+
+    def test_unknown_command_lists_all_commands(self):
+        group = _build_cli("bogus")
+        result = CliRunner().invoke(group, ["bogus"])
+        assert result.exit_code != 0
+        assert "No such command" in result.output
+
+        help_result = CliRunner().invoke(group, ["--help"])
+        for name in ALL_COMMANDS:
+            assert name in help_result.output
+
+    def test_group_version_option(self):
+        result = CliRunner().invoke(_build_cli(None), ["--version"])
+
+        assert result.exit_code == 0
+        assert __version__ in result.output
+
+
+class TestEntryPoint:
+    """Test the console entry point."""
+
+    def test_version_shortcut(self, monkeypatch, capsys):
+        monkeypatch.setattr("sys.argv", ["ganger", "--version"])
+
+        cli()
+
+        assert capsys.readouterr().out == f"ganger, version {__version__}\n"
+
+    def test_dispatches_to_subcommand(self, monkeypatch):
+        monkeypatch.setattr("sys.argv", ["ganger", "status", "--help"])
+
+        with pytest.raises(SystemExit) as exc_info:
+            cli()
+
+        assert exc_info.value.code == 0
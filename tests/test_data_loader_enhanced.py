@@ -5,6 +5,7 @@ Tests error handling, cache fallback, and concurrent operations.
 Created: 2025-11-08
 """
 
+import asyncio
 import pytest
 import pytest_asyncio
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
@@ -177,6 +178,39 @@ class TestLoadStarredRepos:
         assert repo_sync_callback.await_args_list[0].args == (2, len(sample_repos))
         assert repo_sync_callback.await_args_list[1].args == (len(sample_repos), len(sample_repos))
 
+    @pytest.mark.asyncio
+    async def test_incremental_sync_prefetches_next_page(
+        self, temp_cache, mock_settings, sample_repos
+    ):
+        """The next page is requested while the current one is being cached."""
+        events = []
+
+        class PipelinedAPI:
+            def get_starred_repos_page(self, cursor=None):
+                events.append(f"fetch {cursor}")
+                has_next = cursor is None
+                return {
+                    "repos": sample_repos[:2] if has_next else sample_repos[2:],
+                    "total_count": len(sample_repos),
+                    "has_next_page": has_next,
+                    "end_cursor": "page-2" if has_next else None,
+                }
+
+        upsert = temp_cache.upsert_starred_repos
+
+        async def slow_upsert(repos):
+            await asyncio.sleep(0.05)
+            await upsert(repos)
+            events.append(f"stored {len(repos)}")
+
+        temp_cache.upsert_starred_repos = slow_upsert
+        loader = DataLoader(PipelinedAPI(), temp_cache, AsyncMock(), mock_settings)
+
+        repos = await loader.load_starred_repos(force_refresh=True)
+
+        assert len(repos) == len(sample_repos)
+        assert events.index("fetch page-2") < events.index("stored 2")
+
     @pytest.mark.asyncio
     async def test_incremental_graphql_sync_resumes_from_cached_cursor(
         self, temp_cache, mock_settings, sample_repos
@@ -223,6 +257,116 @@ class TestLoadStarredRepos:
         assert len(repos) == len(sample_repos)
         assert repo_sync_callback.await_args_list[0].args == (2, len(sample_repos))
 
+    @pytest.mark.asyncio
+    async def test_cursor_saved_under_another_order_runs_full_sync(
+        self, temp_cache, mock_settings, sample_repos
+    ):
+        """A cursor without the current order marker is dropped, not resumed."""
+        await temp_cache.upsert_starred_repos(sample_repos)
+        await temp_cache.set_starred_sync_state(
+            cached_count=len(sample_repos),
+            total_count=len(sample_repos),
+            cursor="asc-page-2",
+            complete=False,
+        )
+        async with temp_cache._connect() as db:
+            await db.execute(
+                "DELETE FROM metadata WHERE key = ?",
+                (temp_cache.STARRED_SYNC_ORDER_KEY,),
+            )
+            await db.commit()
+        remaining = sample_repos[1:]
+        calls = []
+
+        class OrderedAPI:
+            def get_starred_repos_page(self, cursor=None):
+                calls.append(cursor)
+                return {
+                    "repos": remaining,
+                    "total_count": len(remaining),
+                    "has_next_page": False,
+                    "end_cursor": None,
+                }
+
+        loader = DataLoader(OrderedAPI(), temp_cache, AsyncMock(), mock_settings)
+
+        repos = await loader.load_starred_repos(force_refresh=False)
+
+        assert calls == [None]
+        assert {repo.id for repo in repos} == {repo.id for repo in remaining}
+        state = await temp_cache.get_starred_sync_state()
+        assert state["complete"] is True
+        assert state["order"] == temp_cache.STARRED_SYNC_ORDER
+
+
+    @staticmethod
+    async def _expire_complete_sync(cache, repos):
+        """Cache a complete snapshot whose TTL has run out."""
+        await cache.set_starred_repos(repos)
+        async with cache._connect() as db:
+            await db.execute(
+                "UPDATE metadata SET value = ? WHERE key = ?",
+                ("2000-01-01T00:00:00", cache.STARRED_SYNC_UPDATED_AT_KEY),
+            )
+            await db.commit()
+        cache._sync_updated_at = None
+
+    @pytest.mark.asyncio
+    async def test_expired_complete_sync_fetches_only_new_stars(
+        self, temp_cache, mock_settings, sample_repos
+    ):
+        """An expired cache pages back only to the last sync's newest star."""
+        await self._expire_complete_sync(temp_cache, sample_repos)
+        watermark = max(repo.starred_at for repo in sample_repos)
+        new_starred_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        new_repo = create_test_repo("new", "user/new", starred_at=new_starred_at)
+        calls = []
+
+        class HeadAPI:
+            def get_starred_repos_page(self, cursor=None, starred_after=None):
+                calls.append((cursor, starred_after))
+                return {
+                    "repos": [new_repo],
+                    "total_count": len(sample_repos) + 1,
+                    "has_next_page": False,
+                    "end_cursor": "c1",
+                }
+
+        loader = DataLoader(HeadAPI(), temp_cache, AsyncMock(), mock_settings)
+
+        repos = await loader.load_starred_repos(force_refresh=False)
+
+        assert calls == [(None, watermark)]
+        assert len(repos) == len(sample_repos) + 1
+        state = await temp_cache.get_starred_sync_state()
+        assert state["complete"] is True
+        assert state["last_starred_at"] == new_starred_at
+
+    @pytest.mark.asyncio
+    async def test_incremental_sync_count_mismatch_runs_full_sync(
+        self, temp_cache, mock_settings, sample_repos
+    ):
+        """A star removed elsewhere is caught by the total and pruned by a full pass."""
+        await self._expire_complete_sync(temp_cache, sample_repos)
+        remaining = sample_repos[1:]
+        calls = []
+
+        class UnstarredAPI:
+            def get_starred_repos_page(self, cursor=None, starred_after=None):
+                calls.append(starred_after)
+                return {
+                    "repos": [] if starred_after else remaining,
+                    "total_count": len(remaining),
+                    "has_next_page": False,
+                    "end_cursor": None,
+                }
+
+        loader = DataLoader(UnstarredAPI(), temp_cache, AsyncMock(), mock_settings)
+
+        repos = await loader.load_starred_repos(force_refresh=False)
+
+        assert calls[1] is None
+        assert {repo.id for repo in repos} == {repo.id for repo in remaining}
 
 @pytest.mark.integration
 class TestDefaultFolders:
@@ -294,6 +438,22 @@ class TestDefaultFolders:
         assert "Python Projects" in folder_names
         assert "AI/ML" in folder_names
 
+    @pytest.mark.asyncio
+    async def test_returns_folders_without_rereading(self, temp_cache, mock_settings):
+        """The returned list is the existing folders plus the ones just created."""
+        mock_api = Mock()
+        folder_manager = AsyncMock()
+        loader = DataLoader(mock_api, temp_cache, folder_manager, mock_settings)
+
+        with patch.object(
+            temp_cache, "get_virtual_folders", wraps=temp_cache.get_virtual_folders
+        ) as get_folders:
+            folders = await loader.ensure_default_folders()
+
+        get_folders.assert_awaited_once()
+        stored = await temp_cache.get_virtual_folders()
+        assert [f.id for f in folders] == [f.id for f in stored]
+
 
 @pytest.mark.integration
 class TestSyncAllStarsFolder:
@@ -385,10 +545,7 @@ class TestAutoCategorization:
         mock_api = Mock()
         folder_manager = AsyncMock()
         # Return a proper dict to avoid AsyncMock warning
-        folder_manager.auto_categorize_all.return_value = {
-            "Python": [sample_repos[0], sample_repos[1]],
-            "AI/ML": [sample_repos[2], sample_repos[3]]
-        }
+        folder_manager.auto_categorize_all.return_value = {"python": 2, "ai-ml": 2}
         loader = DataLoader(mock_api, temp_cache, folder_manager, mock_settings)
 
         # Execute
@@ -397,6 +554,18 @@ class TestAutoCategorization:
         # Verify: Folder manager was called
         folder_manager.auto_categorize_all.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_sync_folders_runs_both_passes(self, temp_cache, mock_settings, sample_repos):
+        """sync_folders runs the All Stars refresh and categorization together."""
+        loader = DataLoader(Mock(), temp_cache, AsyncMock(), mock_settings)
+        loader.sync_all_stars_folder = AsyncMock()
+        loader.auto_categorize_all = AsyncMock()
+
+        await loader.sync_folders(sample_repos)
+
+        loader.sync_all_stars_folder.assert_awaited_once_with(sample_repos)
+        loader.auto_categorize_all.assert_awaited_once_with(sample_repos)
+
 
 @pytest.mark.integration
 @pytest.mark.slow
@@ -457,7 +626,7 @@ class TestDataLoaderErrorPaths:
 
         # Simulate database error when creating folder
         from ganger.core.exceptions import CacheError
-        mock_cache.create_virtual_folder.side_effect = CacheError("Database locked")
+        mock_cache.create_virtual_folders.side_effect = CacheError("Database locked")
 
         mock_api = Mock()
         folder_manager = AsyncMock()
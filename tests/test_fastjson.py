@@ -0,0 +1,48 @@
+"""
+Tests for the optional-orjson JSON helpers.
+
+Modified: 2025-11-07
+"""
+
+import json
+
+import pytest
+
+from ganger.utils import fastjson
+
+
+def test_round_trip():
+    """dumps/loads round-trip plain JSON data."""
+    data = {"access_token": "ghp_x", "scopes": ["repo", "user"], "n": 3}
+
+    encoded = fastjson.dumps(data)
+
+    assert isinstance(encoded, bytes)
+    assert fastjson.loads(encoded) == data
+    assert fastjson.loads(encoded.decode()) == data
+
+
+def test_indent_output_is_stdlib_compatible():
+    """Indented output is readable by the stdlib json module."""
+    encoded = fastjson.dumps({"a": 1, "b": [1, 2]}, indent=True)
+
+    assert b"\n  " in encoded
+    assert json.loads(encoded) == {"a": 1, "b": [1, 2]}
+
+
+def test_decode_error_is_json_decode_error():
+    """Malformed input raises a json.JSONDecodeError subclass."""
+    with pytest.raises(json.JSONDecodeError):
+        fastjson.loads(b"{not json")
+
+
+def test_default_converts_unsupported_objects():
+    """``default`` is applied to values JSON can't encode natively."""
+
+    class Token:
+        def __str__(self):
+            return "tok"
+
+    assert fastjson.loads(fastjson.dumps({"t": Token()}, default=str)) == {"t": "tok"}
+    with pytest.raises(TypeError):
+        fastjson.dumps({"t": Token()})
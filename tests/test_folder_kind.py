@@ -25,7 +25,8 @@ from ganger.core.models import VirtualFolder
 async def cache(tmp_path: Path) -> PersistentCache:
     db = PersistentCache(db_path=tmp_path / "kind.db")
     await db.initialize()
-    return db
+    yield db
+    await db.close()
 
 
 @pytest_asyncio.fixture
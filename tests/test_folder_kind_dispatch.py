@@ -14,6 +14,7 @@ All branches must hydrate user_tags as List[str].
 
 from __future__ import annotations
 
+from collections import Counter
 from pathlib import Path
 
 import pytest
@@ -28,7 +29,8 @@ from ganger.core.models import StarredRepo, VirtualFolder
 async def cache(tmp_path: Path) -> PersistentCache:
     db = PersistentCache(db_path=tmp_path / "dispatch.db")
     await db.initialize()
-    return db
+    yield db
+    await db.close()
 
 
 @pytest_asyncio.fixture
@@ -275,3 +277,110 @@ async def test_unknown_folder_returns_empty_unless_all_stars(
     return [] silently — same as the pre-v3 behavior."""
     assert await cache.get_folder_repos("all-stars") == []
     assert await cache.get_folder_repos("nope") == []
+
+
+# ---------- id-only membership ----------
+
+
+@pytest.mark.asyncio
+async def test_folder_repo_ids_match_folder_repos_for_every_kind(
+    populated: PersistentCache,
+) -> None:
+    """get_folder_repo_ids has the same membership as get_folder_repos."""
+    await populated.create_virtual_folder(
+        VirtualFolder(id="all-stars", name="All Stars", kind="system"), _internal=True
+    )
+    await populated.create_virtual_folder(
+        VirtualFolder(id="r", name="R", auto_tags=["python"], kind="rule")
+    )
+    await populated.create_virtual_folder(VirtualFolder(id="c", name="C", kind="curated"))
+    await populated.create_virtual_folder(
+        VirtualFolder(id="h", name="H", auto_tags=["rust"], kind="hybrid")
+    )
+    await populated.add_repo_to_folder("js-high", "c", is_manual=True)
+    await populated.add_repo_to_folder("py-low", "h", is_manual=True)
+
+    for folder_id in ("all-stars", "r", "c", "h", "nope"):
+        repos = await populated.get_folder_repos(folder_id)
+        assert await populated.get_folder_repo_ids(folder_id) == {r.id for r in repos}
+
+        stats = await populated.get_folder_stats(folder_id)
+        assert stats["repo_count"] == len(repos)
+        assert stats["total_stars"] == sum(r.stars_count for r in repos)
+        assert stats["languages"] == dict(Counter(r.language for r in repos if r.language))
+    assert await populated.get_folder_repo_ids("h") == {"py-low", "rust-high"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("union_terms", [400, 3, 2])
+async def test_all_folder_stats_match_per_folder_stats(
+    populated: PersistentCache, monkeypatch: pytest.MonkeyPatch, union_terms: int
+) -> None:
+    """The batched aggregate equals get_folder_stats for every folder."""
+    # A small batch size forces several queries and a split hybrid folder
+    monkeypatch.setattr(PersistentCache, "_STATS_UNION_TERMS", union_terms)
+    await populated.create_virtual_folder(
+        VirtualFolder(id="all-stars", name="All Stars", kind="system"), _internal=True
+    )
+    await populated.create_virtual_folder(
+        VirtualFolder(id="r", name="R", auto_tags=["python"], kind="rule")
+    )
+    await populated.create_virtual_folder(VirtualFolder(id="c", name="C", kind="curated"))
+    await populated.create_virtual_folder(
+        VirtualFolder(id="h", name="H", auto_tags=["rust"], kind="hybrid")
+    )
+    await populated.create_virtual_folder(VirtualFolder(id="empty", name="E", kind="curated"))
+    await populated.add_repo_to_folder("js-high", "c", is_manual=True)
+    await populated.add_repo_to_folder("py-low", "h", is_manual=True)
+    await populated.add_repo_to_folder("rust-high", "h", is_manual=True)
+
+    all_stats = await populated.get_all_folder_stats()
+
+    assert set(all_stats) == {"all-stars", "r", "c", "h", "empty"}
+    for folder_id, stats in all_stats.items():
+        assert stats == await populated.get_folder_stats(folder_id)
+    assert all_stats["h"]["repo_count"] == 2
+    assert list(all_stats["all-stars"]["languages"]) == ["Python", "JavaScript", "Rust"]
+
+
+@pytest.mark.asyncio
+async def test_sql_tag_matching_agrees_with_matches_repo(
+    populated: PersistentCache,
+) -> None:
+    """Rule membership in SQL equals VirtualFolder.matches_repo in Python."""
+    all_repos = await populated.get_starred_repos(force_refresh=True)
+    for tags in (["python"], ["PYTHON"], ["ml"], ["rust", "javascript"], ["pyth"], []):
+        folder = VirtualFolder(id="t", name="T", auto_tags=tags)
+        expected = {r.id for r in all_repos if folder.matches_repo(r)}
+
+        await populated.create_virtual_folder(
+            VirtualFolder(id="t", name="T", auto_tags=tags, kind="rule")
+        )
+        assert await populated.get_folder_repo_ids("t") == expected
+
+        await populated.create_virtual_folder(VirtualFolder(id="c", name="C"))
+        assert await populated.link_auto_tag_matches("c", tags) == len(expected)
+        assert await populated.link_auto_tag_matches("c", tags) == 0
+        assert await populated.get_folder_repo_ids("c") == expected
+
+        await populated.delete_virtual_folder("t")
+        await populated.delete_virtual_folder("c")
+
+
+@pytest.mark.asyncio
+async def test_bulk_tag_linking_matches_per_folder_linking(
+    populated: PersistentCache,
+) -> None:
+    """One transaction over several folders links what per-folder calls would."""
+    all_repos = await populated.get_starred_repos(force_refresh=True)
+    tag_sets = {"b1": ["python"], "b2": ["rust", "javascript"], "b3": []}
+    for folder_id in tag_sets:
+        await populated.create_virtual_folder(VirtualFolder(id=folder_id, name=folder_id))
+
+    stats = await populated.link_auto_tag_matches_bulk(tag_sets.items())
+
+    for folder_id, tags in tag_sets.items():
+        folder = VirtualFolder(id=folder_id, name=folder_id, auto_tags=tags)
+        expected = {r.id for r in all_repos if folder.matches_repo(r)}
+        assert await populated.get_folder_repo_ids(folder_id) == expected
+        assert stats[folder_id] == len(expected)
@@ -19,7 +19,8 @@ async def cache(tmp_path):
     db_path = tmp_path / "test.db"
     cache = PersistentCache(db_path=db_path, ttl_seconds=3600)
     await cache.initialize()
-    return cache
+    yield cache
+    await cache.close()
 
 
 @pytest_asyncio.fixture
@@ -212,6 +213,19 @@ class TestAutoCategorization:
 
         assert len(python_repos) == 2
 
+    @pytest.mark.asyncio
+    async def test_auto_categorize_all_from_cache(self, folder_manager, cache, sample_repos):
+        """Without an explicit list, every cached repo is categorized in SQL."""
+        await cache.set_starred_repos(sample_repos)
+        python_folder = await folder_manager.create_folder(
+            name="Python Projects", auto_tags=["python"]
+        )
+
+        stats = await folder_manager.auto_categorize_all()
+
+        assert stats == {python_folder.id: 2}
+        assert await folder_manager.auto_categorize_all() == {python_folder.id: 0}
+
     @pytest.mark.asyncio
     async def test_auto_categorize_repo(self, folder_manager, cache, sample_repos):
         """Test auto-categorizing a single repo."""
@@ -243,6 +257,58 @@ class TestAutoCategorization:
         assert "Python" in folder_names
         assert "ML" in folder_names
 
+    @pytest.mark.asyncio
+    async def test_suggest_folders_reuses_index_until_folders_change(
+        self, folder_manager, cache, sample_repos, monkeypatch
+    ):
+        """The match index is rebuilt only after a folder is created or deleted."""
+        python = await folder_manager.create_folder(name="Python", auto_tags=["python"])
+        calls = []
+        get_virtual_folders = cache.get_virtual_folders
+
+        async def counting_get_virtual_folders():
+            calls.append(1)
+            return await get_virtual_folders()
+
+        monkeypatch.setattr(cache, "get_virtual_folders", counting_get_virtual_folders)
+
+        await folder_manager.suggest_folders_for_repo(sample_repos[0])
+        await folder_manager.suggest_folders_for_repo(sample_repos[1])
+        assert len(calls) == 1
+
+        ml = await folder_manager.create_folder(name="ML", auto_tags=["machine-learning"])
+        suggestions = await folder_manager.suggest_folders_for_repo(sample_repos[0])
+        assert [f.id for f in suggestions] == [python.id, ml.id]
+
+        # Deleting through the cache directly also invalidates the index
+        await cache.delete_virtual_folder(python.id)
+        suggestions = await folder_manager.suggest_folders_for_repo(sample_repos[0])
+        assert [f.id for f in suggestions] == [ml.id]
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_auto_categorize_repo_shares_the_cached_index(
+        self, folder_manager, cache, sample_repos, monkeypatch
+    ):
+        """Per-repo and batch categorization reuse the cached tag index."""
+        await cache.set_starred_repos(sample_repos)
+        rule = await folder_manager.create_folder(
+            name="Python", auto_tags=["python"], kind="rule"
+        )
+        calls = []
+        get_virtual_folders = cache.get_virtual_folders
+
+        async def counting_get_virtual_folders():
+            calls.append(1)
+            return await get_virtual_folders()
+
+        monkeypatch.setattr(cache, "get_virtual_folders", counting_get_virtual_folders)
+
+        assert await folder_manager.auto_categorize_repo(sample_repos[0]) == [rule.id]
+        await folder_manager.auto_categorize_repo(sample_repos[2])
+        await folder_manager.auto_categorize_all(repos=sample_repos[:1])
+        assert len(calls) == 1
+
     @pytest.mark.asyncio
     async def test_create_default_folders(self, folder_manager):
         """Test creating default folders from config."""
@@ -314,6 +380,35 @@ class TestClipboardOperations:
         assert len(repos1) == 0
         assert len(repos2) == 1
 
+    @pytest.mark.asyncio
+    async def test_clipboard_cut_paste_is_one_cache_call(
+        self, folder_manager, cache, sample_repos, monkeypatch
+    ):
+        """Pasting many cut repos moves them all in a single bulk write."""
+        await cache.set_starred_repos(sample_repos)
+        folder1 = await folder_manager.create_folder(name="Folder 1")
+        folder2 = await folder_manager.create_folder(name="Folder 2")
+        await cache.add_repos_to_folder(folder1.id, [r.id for r in sample_repos], is_manual=True)
+
+        folder_manager.clipboard_cut(sample_repos, folder1.id)
+        calls = []
+        move_repos_to_folder = cache.move_repos_to_folder
+
+        async def counting_move(folder_id, moves):
+            calls.append(folder_id)
+            return await move_repos_to_folder(folder_id, moves)
+
+        monkeypatch.setattr(cache, "move_repos_to_folder", counting_move)
+
+        pasted = await folder_manager.clipboard_paste(folder2.id)
+
+        assert pasted == len(sample_repos)
+        assert calls == [folder2.id]
+        assert await folder_manager.get_folder_repo_ids(folder1.id) == set()
+        assert await folder_manager.get_folder_repo_ids(folder2.id) == {
+            r.id for r in sample_repos
+        }
+
     @pytest.mark.asyncio
     async def test_clipboard_clear(self, folder_manager, sample_repos):
         """Test clearing clipboard."""
@@ -349,6 +444,32 @@ class TestStatistics:
         assert stats["total_stars"] == 95000  # 50000 + 45000
         assert stats["top_language"] == "Python"
 
+    @pytest.mark.asyncio
+    async def test_get_folder_stats_empty_folder(self, folder_manager):
+        """An empty folder reports zeros rather than dividing by zero."""
+        folder = await folder_manager.create_folder(name="Empty", kind="curated")
+
+        stats = await folder_manager.get_folder_stats(folder.id)
+
+        assert stats["repo_count"] == 0
+        assert stats["avg_stars"] == 0
+        assert stats["languages"] == {}
+        assert stats["top_language"] is None
+
+    @pytest.mark.asyncio
+    async def test_get_all_folder_stats(self, folder_manager, cache, sample_repos):
+        """Batch stats cover every folder with the same fields as get_folder_stats."""
+        await cache.set_starred_repos(sample_repos)
+        folder = await folder_manager.create_folder(name="Picks", kind="curated")
+        await folder_manager.add_repo_to_folder(sample_repos[0].id, folder.id)
+        empty = await folder_manager.create_folder(name="Empty", kind="curated")
+
+        all_stats = await folder_manager.get_all_folder_stats()
+
+        assert all_stats[folder.id] == await folder_manager.get_folder_stats(folder.id)
+        assert all_stats[folder.id]["repo_count"] == 1
+        assert all_stats[empty.id]["top_language"] is None
+
 
 class TestFolderManagerErrorHandling:
     """Test error handling in folder manager."""
@@ -378,6 +499,22 @@ class TestFolderManagerErrorHandling:
         # Should succeed without raising exception
         assert "Python" in [f.name for f in await folder_manager.get_all_folders()]
 
+    @pytest.mark.asyncio
+    async def test_auto_categorize_all_repos_matches_each_folder(
+        self, folder_manager, cache, sample_repos
+    ):
+        """Passing repos links exactly what matches_repo accepts, per folder."""
+        await cache.set_starred_repos(sample_repos)
+        python = await folder_manager.create_folder(name="Py", auto_tags=["PYTHON"])
+        other = await folder_manager.create_folder(name="Other", auto_tags=["rust", "AI"])
+
+        stats = await folder_manager.auto_categorize_all(sample_repos)
+
+        for folder in (python, other):
+            expected = {r.id for r in sample_repos if folder.matches_repo(r)}
+            assert await cache.get_folder_repo_ids(folder.id) == expected
+            assert stats[folder.id] == len(expected)
+
     @pytest.mark.asyncio
     async def test_auto_categorize_repo_duplicate(self, folder_manager, cache, sample_repos):
         """Test auto_categorize_repo handles repo already in folder (lines 218-220)."""
@@ -412,3 +549,25 @@ class TestFolderManagerErrorHandling:
         # Should only create the AI/ML folder (Python Projects already exists)
         assert len(created) == 1
         assert created[0].name == "AI/ML"
+
+    @pytest.mark.asyncio
+    async def test_create_default_folders_skips_existing_without_insert(
+        self, folder_manager, monkeypatch
+    ):
+        """Existing folders are filtered by name before any create is attempted."""
+        await folder_manager.create_folder(name="Python Projects", auto_tags=["python"])
+        attempted = []
+        create_folder = folder_manager.create_folder
+
+        async def tracking_create_folder(name, **kwargs):
+            attempted.append(name)
+            return await create_folder(name, **kwargs)
+
+        monkeypatch.setattr(folder_manager, "create_folder", tracking_create_folder)
+
+        await folder_manager.create_default_folders([
+            {"name": "Python Projects", "auto_tags": ["python"]},
+            {"name": "AI/ML", "auto_tags": ["machine-learning"]},
+        ])
+
+        assert attempted == ["AI/ML"]
@@ -24,7 +24,8 @@ from ganger.core.models import StarredRepo, VirtualFolder
 async def cache(tmp_path: Path) -> PersistentCache:
     db = PersistentCache(db_path=tmp_path / "pos.db")
     await db.initialize()
-    return db
+    yield db
+    await db.close()
 
 
 @pytest_asyncio.fixture
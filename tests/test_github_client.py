@@ -4,14 +4,48 @@ Tests for GitHub API client.
 Modified: 2025-11-07
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch, MagicMock
+import httpx
 import pytest
 
 from ganger.core.github_client import GitHubAPIClient
 from ganger.core.auth import GitHubAuth
 from ganger.core.models import StarredRepo, RepoMetadata
-from ganger.core.exceptions import RepoNotFoundError, AuthenticationError, RateLimitExceededError
+from ganger.core.exceptions import (
+    AuthenticationError,
+    GangerError,
+    RateLimitExceededError,
+    RepoNotFoundError,
+)
+from tests.utils import MockStarredREST
+
+
+def _install_github(client, status=None):
+    """Serve repo, star and rate-limit endpoints for ``octocat/Hello-World``.
+
+    Returns the list of ``(method, path)`` requests made. ``status`` forces
+    every response to that error status.
+    """
+    requests = []
+    known = "octocat/Hello-World"
+
+    def handler(request):
+        path = request.url.path
+        requests.append((request.method, path))
+        if status is not None:
+            return httpx.Response(status, json={"message": "error"})
+        if path == "/rate_limit":
+            core = {"limit": 5000, "remaining": 4500, "reset": 1672574400, "used": 500}
+            return httpx.Response(200, json={"resources": {"core": core}})
+        if path.lower() == f"/repos/{known}".lower():
+            return httpx.Response(200, json=MockStarredREST.create_item(known, id=12345)["repo"])
+        if path.lower() == f"/user/starred/{known}".lower():
+            return httpx.Response(204)
+        return httpx.Response(404, json={"message": "Not Found"})
+
+    MockStarredREST.install(client, httpx.MockTransport(handler))
+    return requests
 
 
 @pytest.fixture
@@ -72,80 +106,327 @@ class TestGitHubAPIClient:
         assert client.rate_limiter is not None
 
     @patch("ganger.core.github_client.GhApi")
-    def test_get_starred_repos_rest(self, mock_ghapi, mock_auth, mock_repo):
+    def test_get_starred_repos_rest(self, mock_ghapi, mock_auth):
         """Test getting starred repos via REST API."""
-        # Setup mock
-        mock_user = Mock()
-        mock_user.get_starred.return_value = [mock_repo]
-        mock_auth.get_github_client.return_value.get_user.return_value = mock_user
-
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(
+            client,
+            MockStarredREST.transport(
+                [MockStarredREST.create_item("octocat/Hello-World", id=12345)]
+            ),
+        )
+
         repos = client._get_starred_rest(max_count=10)
 
         assert len(repos) == 1
+        assert repos[0].id == "12345"
         assert repos[0].full_name == "octocat/Hello-World"
         assert repos[0].language == "Python"
         assert repos[0].stars_count == 1000
+        assert repos[0].topics == ["python", "test"]
+        assert repos[0].starred_at == datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
 
     @patch("ganger.core.github_client.GhApi")
-    def test_get_repo(self, mock_ghapi, mock_auth, mock_repo):
-        """Test getting a specific repository."""
-        mock_auth.get_github_client.return_value.get_repo.return_value = mock_repo
+    def test_get_starred_rest_fetches_all_pages_in_order(self, mock_ghapi, mock_auth):
+        """Pages after the first are discovered from the Link header and kept in order."""
+        items = [MockStarredREST.create_item(f"user/repo{i}", id=i) for i in range(250)]
+        transport = MockStarredREST.transport(items)
+        client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(client, transport)
 
+        repos = client._get_starred_rest()
+
+        assert [r.id for r in repos] == [str(i) for i in range(250)]
+        assert sorted(transport.requested_pages) == [1, 2, 3]
+        assert client.rate_limiter.quota_used == 3
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_get_starred_rest_max_count_limits_pages(self, mock_ghapi, mock_auth):
+        """max_count stops paging once enough repos are covered."""
+        items = [MockStarredREST.create_item(f"user/repo{i}", id=i) for i in range(250)]
+        transport = MockStarredREST.transport(items)
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(client, transport)
+
+        repos = client._get_starred_rest(max_count=150)
+
+        assert len(repos) == 150
+        assert sorted(transport.requested_pages) == [1, 2]
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_get_repo(self, mock_ghapi, mock_auth):
+        """Test getting a specific repository."""
+        client = GitHubAPIClient(mock_auth)
+        requests = _install_github(client)
+
         repo = client.get_repo("octocat/Hello-World")
 
         assert repo.full_name == "octocat/Hello-World"
         assert repo.name == "Hello-World"
         assert repo.owner == "octocat"
+        assert repo.topics == ["python", "test"]
+        assert requests == [("GET", "/repos/octocat/Hello-World")]
 
     @patch("ganger.core.github_client.GhApi")
     def test_get_repo_not_found(self, mock_ghapi, mock_auth):
         """Test getting a non-existent repository."""
-        from github import GithubException
-
-        mock_auth.get_github_client.return_value.get_repo.side_effect = GithubException(
-            404, {"message": "Not Found"}
-        )
-
         client = GitHubAPIClient(mock_auth)
+        _install_github(client)
 
         with pytest.raises(RepoNotFoundError):
             client.get_repo("nonexistent/repo")
 
     @patch("ganger.core.github_client.GhApi")
-    def test_star_repo(self, mock_ghapi, mock_auth, mock_repo):
+    def test_star_repo(self, mock_ghapi, mock_auth):
         """Test starring a repository."""
-        mock_github = mock_auth.get_github_client.return_value
-        mock_github.get_repo.return_value = mock_repo
-
-        mock_user = Mock()
-        mock_github.get_user.return_value = mock_user
-
         client = GitHubAPIClient(mock_auth)
+        requests = _install_github(client)
+
         client.star_repo("octocat/Hello-World")
 
-        mock_user.add_to_starred.assert_called_once_with(mock_repo)
+        assert requests == [("PUT", "/user/starred/octocat/Hello-World")]
 
     @patch("ganger.core.github_client.GhApi")
-    def test_unstar_repo(self, mock_ghapi, mock_auth, mock_repo):
+    def test_unstar_repo(self, mock_ghapi, mock_auth):
         """Test unstarring a repository."""
-        mock_github = mock_auth.get_github_client.return_value
-        mock_github.get_repo.return_value = mock_repo
+        client = GitHubAPIClient(mock_auth)
+        requests = _install_github(client)
 
-        mock_user = Mock()
-        mock_github.get_user.return_value = mock_user
+        client.unstar_repo("octocat/Hello-World")
+
+        assert requests == [("DELETE", "/user/starred/octocat/Hello-World")]
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_unchanged_resources_revalidate_with_etag(self, mock_ghapi, mock_auth):
+        """A repeat fetch sends If-None-Match and a 304 reuses the stored body."""
+        body = MockStarredREST.create_item("octocat/Hello-World", id=12345)["repo"]
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=body, headers={"ETag": '"v1"'})
 
         client = GitHubAPIClient(mock_auth)
-        client.unstar_repo("octocat/Hello-World")
+        MockStarredREST.install(client, httpx.MockTransport(handler))
+
+        first = client.get_repo("octocat/Hello-World")
+        client._repo_cache.clear()
+        second = client.get_repo("octocat/Hello-World")
+
+        assert seen == [None, '"v1"']
+        assert second == first
+        # The 304 didn't count against the quota
+        assert client.rate_limiter.quota_used == 1
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_starring_drops_repo_etag_entry(self, mock_ghapi, mock_auth):
+        """Star/unstar forgets the repo's stored body, so the next fetch is a full 200."""
+        body = MockStarredREST.create_item("octocat/Hello-World", id=12345)["repo"]
+        seen = []
+
+        def handler(request):
+            if request.method == "GET":
+                seen.append(request.headers.get("If-None-Match"))
+                return httpx.Response(200, json=body, headers={"ETag": '"v1"'})
+            return httpx.Response(204)
+
+        client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(client, httpx.MockTransport(handler))
+
+        client.get_repo("octocat/Hello-World")
+        client.star_repo("Octocat/Hello-World")
+        client.get_repo("octocat/Hello-World")
+
+        assert seen == [None, None]
+        assert len(client._etag_cache) == 1
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_etag_cache_is_bounded_by_body_bytes(self, mock_ghapi, mock_auth):
+        """Stored bodies count their raw size against ETAG_CACHE_MAX_BYTES."""
+        client = GitHubAPIClient(mock_auth)
+        body = MockStarredREST.create_item("octocat/Hello-World", id=1)["repo"]
+        size = len(httpx.Response(200, json=body).content)
+        client._etag_cache.maxweight = size  # room for one body
+        MockStarredREST.install(
+            client,
+            httpx.MockTransport(
+                lambda request: httpx.Response(200, json=body, headers={"ETag": '"v"'})
+            ),
+        )
+
+        client.get_repo("octocat/one")
+        client.get_repo("octocat/two")
+
+        assert len(client._etag_cache) == 1
+        assert client._etag_cache.weight == size
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_starred_pages_revalidate_with_etag(self, mock_ghapi, mock_auth):
+        """Unchanged /user/starred pages come back as 304s on the next listing."""
+        items = [MockStarredREST.create_item(f"user/repo{i}", id=i) for i in range(3)]
+        statuses = []
+
+        def handler(request):
+            if request.headers.get("If-None-Match") == '"page"':
+                statuses.append(304)
+                return httpx.Response(304)
+            statuses.append(200)
+            return httpx.Response(200, json=items, headers={"ETag": '"page"'})
+
+        client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(client, httpx.MockTransport(handler))
+
+        first = client._get_starred_rest()
+        second = client._get_starred_rest()
 
-        mock_user.remove_from_starred.assert_called_once_with(mock_repo)
+        assert statuses == [200, 304]
+        assert [r.id for r in second] == [r.id for r in first] == ["0", "1", "2"]
+        assert client.rate_limiter.quota_used == 1
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_not_modified_starred_pages_skip_decoding(self, mock_ghapi, mock_auth):
+        """A 304 page reuses the items parsed from its original 200."""
+        items = [MockStarredREST.create_item(f"user/repo{i}", id=i) for i in range(2)]
+
+        def handler(request):
+            if request.headers.get("If-None-Match") == '"page"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=items, headers={"ETag": '"page"'})
+
+        client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(client, httpx.MockTransport(handler))
+
+        client._get_starred_rest()
+        with patch.object(client, "_decode", side_effect=AssertionError("re-decoded")):
+            second = client._get_starred_rest()
+
+        assert [r.id for r in second] == ["0", "1"]
+        # One entry per page, holding the decoded items rather than the response
+        (entry,) = [value for _, value, _ in client._etag_cache._data.values()]
+        assert not isinstance(entry, httpx.Response)
+        assert entry.etag == '"page"'
+        assert entry.payload == items
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_invalid_json_body_raises_ganger_error(self, mock_ghapi, mock_auth):
+        """Undecodable bodies surface as GangerError, not a raw decode error."""
+        client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(
+            client, httpx.MockTransport(lambda request: httpx.Response(200, content=b"{not json"))
+        )
+
+        with pytest.raises(GangerError, match="Invalid JSON"):
+            client.get_repo("octocat/Hello-World")
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_calls_share_one_connection_pool(self, mock_ghapi, mock_auth):
+        """Every REST call reuses the same long-lived client until close()."""
+        client = GitHubAPIClient(mock_auth)
+        http = client._http_client()
+
+        assert client._http_client() is http
+        assert http.headers["Authorization"] == "token ghp_test_token"
+
+        client.close()
+        assert http.is_closed
+        assert client._http is None
+        client.close()  # idempotent
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_get_readme_graphql(self, mock_ghapi, mock_auth):
+        """README text and repo flags come from one GraphQL query."""
+        mock_ghapi.return_value.graphql.query.return_value = {
+            "data": {
+                "repository": {
+                    "databaseId": 12345,
+                    "hasIssuesEnabled": True,
+                    "hasWikiEnabled": True,
+                    "hasProjectsEnabled": False,
+                    "openIssues": {"totalCount": 3},
+                    "openPullRequests": {"totalCount": 2},
+                    "readme0": None,
+                    "readme3": {"text": "Hello\n====="},
+                }
+            }
+        }
+
+        client = GitHubAPIClient(mock_auth)
+        metadata = client.get_readme("octocat/Hello-World")
+
+        mock_ghapi.return_value.graphql.query.assert_called_once()
+        mock_auth.get_github_client.return_value.get_repo.assert_not_called()
+        assert metadata.repo_id == "12345"
+        assert metadata.readme_content == "Hello\n====="
+        assert metadata.readme_format == "rst"
+        assert metadata.open_issues_count == 5
+        assert metadata.has_wiki is True
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_get_repo_with_readme_single_query(self, mock_ghapi, mock_auth):
+        """Repo fields and README come back from one GraphQL request."""
+        mock_ghapi.return_value.graphql.query.return_value = {
+            "data": {
+                "repository": {
+                    "id": "R_1",
+                    "nameWithOwner": "octocat/Hello-World",
+                    "name": "Hello-World",
+                    "owner": {"login": "octocat"},
+                    "stargazerCount": 42,
+                    "repositoryTopics": {"nodes": [{"topic": {"name": "demo"}}]},
+                    "databaseId": 12345,
+                    "openIssues": {"totalCount": 1},
+                    "readme0": {"text": "# Hello"},
+                }
+            }
+        }
+
+        client = GitHubAPIClient(mock_auth)
+        repo, metadata = client.get_repo_with_readme("octocat/Hello-World")
+
+        mock_ghapi.return_value.graphql.query.assert_called_once()
+        assert repo.full_name == "octocat/Hello-World"
+        assert repo.stars_count == 42
+        assert repo.topics == ["demo"]
+        assert metadata.repo_id == "12345"
+        assert metadata.readme_content == "# Hello"
+        assert client.rate_limiter.quota_used == 1
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_get_repo_with_readme_falls_back_to_rest_pair(self, mock_ghapi, mock_auth):
+        """A failed GraphQL query falls back to get_repo and get_readme."""
+        mock_ghapi.return_value.graphql.query.side_effect = ValueError("schema drift")
+        client = GitHubAPIClient(mock_auth)
+        repo = StarredRepo(id="1", full_name="octocat/Hello-World", name="Hello-World", owner="octocat")
+        metadata = RepoMetadata(repo_id="1")
+
+        with patch.object(client, "get_repo", return_value=repo), patch.object(
+            client, "get_readme", return_value=metadata
+        ):
+            assert client.get_repo_with_readme("octocat/Hello-World") == (repo, metadata)
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_get_readme_graphql_not_found(self, mock_ghapi, mock_auth):
+        """A NOT_FOUND GraphQL error is a missing repo, not a REST fallback."""
+        mock_ghapi.return_value.graphql.query.return_value = {
+            "data": {"repository": None},
+            "errors": [{"type": "NOT_FOUND", "message": "Could not resolve"}],
+        }
+
+        client = GitHubAPIClient(mock_auth)
+
+        with pytest.raises(RepoNotFoundError):
+            client.get_readme("invalid/repo")
+        mock_auth.get_github_client.return_value.get_repo.assert_not_called()
 
     @patch("ganger.core.github_client.GhApi")
     def test_get_readme(self, mock_ghapi, mock_auth, mock_repo):
-        """Test getting repository README."""
+        """Test getting repository README over REST when GraphQL fails."""
         import base64
 
+        mock_ghapi.return_value.graphql.query.side_effect = Exception("GraphQL down")
+
         # Mock README
         readme_content = "# Hello World\nTest README"
         encoded_content = base64.b64encode(readme_content.encode()).decode()
@@ -172,6 +453,8 @@ class TestGitHubAPIClient:
         """Test getting README when none exists."""
         from github import GithubException
 
+        mock_ghapi.return_value.graphql.query.side_effect = Exception("GraphQL down")
+
         mock_repo.get_readme.side_effect = GithubException(404, {"message": "Not Found"})
 
         mock_auth.get_github_client.return_value.get_repo.return_value = mock_repo
@@ -183,56 +466,128 @@ class TestGitHubAPIClient:
         assert metadata.readme_content is None
 
     @patch("ganger.core.github_client.GhApi")
-    def test_search_repos(self, mock_ghapi, mock_auth, mock_repo):
-        """Test searching repositories."""
-        mock_results = [mock_repo]
-        mock_auth.get_github_client.return_value.search_repositories.return_value = (
-            mock_results
-        )
+    def test_search_repos(self, mock_ghapi, mock_auth):
+        """Search results are read from the raw JSON, topics included."""
+        params = []
+
+        def handler(request):
+            params.append(dict(request.url.params))
+            item = MockStarredREST.create_item("octocat/Hello-World", id=12345)["repo"]
+            return httpx.Response(200, json={"total_count": 1, "items": [item]})
 
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(client, httpx.MockTransport(handler))
         repos = client.search_repos("python")
 
         assert len(repos) == 1
         assert repos[0].full_name == "octocat/Hello-World"
+        assert repos[0].topics == ["python", "test"]
+        assert params == [{"q": "python", "per_page": "100", "page": "1"}]
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_search_repos_pages_until_max_results(self, mock_ghapi, mock_auth):
+        """Further pages are fetched only until max_results is covered."""
+        pages = []
+
+        def handler(request):
+            page = int(request.url.params["page"])
+            per_page = int(request.url.params["per_page"])
+            pages.append(page)
+            items = [
+                MockStarredREST.create_item(f"user/repo{page}-{i}", id=page * 100 + i)["repo"]
+                for i in range(per_page)
+            ]
+            return httpx.Response(200, json={"total_count": 1000, "items": items})
+
+        client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(client, httpx.MockTransport(handler))
+        repos = client.search_repos("python", max_results=150)
+
+        assert len(repos) == 150
+        assert pages == [1, 2]
 
     @patch("ganger.core.github_client.GhApi")
     def test_get_rate_limit_status(self, mock_ghapi, mock_auth):
         """Test getting rate limit status."""
-        mock_rate_limit = Mock()
-        mock_core = Mock()
-        mock_core.limit = 5000
-        mock_core.remaining = 4500
-        mock_core.reset = datetime(2023, 1, 1, 12, 0, 0)
-        mock_rate_limit.core = mock_core
-
-        mock_auth.get_github_client.return_value.get_rate_limit.return_value = (
-            mock_rate_limit
-        )
-
         client = GitHubAPIClient(mock_auth)
+        _install_github(client)
+
         status = client.get_rate_limit_status()
 
         assert status["limit"] == 5000
         assert status["remaining"] == 4500
         assert status["used"] == 500
+        assert status["reset"] == datetime.fromtimestamp(1672574400).isoformat()
+        assert client.rate_limiter.quota_used == 500
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_rate_limit_status_is_memoized(self, mock_ghapi, mock_auth):
+        """Polling within the TTL reuses the last status."""
+        client = GitHubAPIClient(mock_auth)
+        requests = _install_github(client)
+
+        first = client.get_rate_limit_status()
+        first["remaining"] = 0
+        second = client.get_rate_limit_status()
+
+        assert requests == [("GET", "/rate_limit")]
+        assert second["remaining"] == 4500
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_get_repo_memoized_until_star_change(self, mock_ghapi, mock_auth):
+        """get_repo reuses its result until the repo is starred or unstarred."""
+        client = GitHubAPIClient(mock_auth)
+        requests = _install_github(client)
+
+        first = client.get_repo("octocat/Hello-World")
+        first.is_selected = True
+        second = client.get_repo("Octocat/hello-world")
+
+        assert len(requests) == 1
+        assert second.is_selected is False
+
+        client.unstar_repo("octocat/Hello-World")
+        client.get_repo("octocat/Hello-World")
+
+        assert [method for method, _ in requests] == ["GET", "DELETE", "GET"]
 
 
 class TestRateLimiting:
     """Test rate limiting functionality."""
 
     @patch("ganger.core.github_client.GhApi")
-    def test_rate_limiter_tracks_requests(self, mock_ghapi, mock_auth, mock_repo):
+    def test_rate_limiter_tracks_requests(self, mock_ghapi, mock_auth):
         """Test that rate limiter tracks requests."""
-        mock_user = Mock()
-        mock_user.get_starred.return_value = [mock_repo] * 10
-        mock_auth.get_github_client.return_value.get_user.return_value = mock_user
-
         client = GitHubAPIClient(mock_auth, rate_limit_buffer=100)
+        MockStarredREST.install(
+            client,
+            MockStarredREST.transport(
+                [MockStarredREST.create_item(f"user/repo{i}", id=i) for i in range(10)]
+            ),
+        )
         repos = client._get_starred_rest(max_count=10)
 
         assert client.rate_limiter.quota_used == 1
 
+    @patch("ganger.core.github_client.GhApi")
+    def test_rate_limiter_follows_core_quota_headers(self, mock_ghapi, mock_auth):
+        """Core quota headers update the limiter; search-quota headers don't."""
+        client = GitHubAPIClient(mock_auth)
+        assert client._observe_rate_limit in client._http_client().event_hooks["response"]
+        client.close()
+
+        def response(resource, remaining):
+            return httpx.Response(200, headers={
+                "X-RateLimit-Resource": resource,
+                "X-RateLimit-Limit": "5000",
+                "X-RateLimit-Remaining": str(remaining),
+            })
+
+        client._observe_rate_limit(response("core", 4000))
+        client._observe_rate_limit(response("search", 3))
+
+        assert client.rate_limiter.get_remaining() == 4000
+
     @patch("ganger.core.github_client.GhApi")
     def test_rate_limiter_warns_on_low_quota(self, mock_ghapi, mock_auth):
         """Test that rate limiter warns when quota is low."""
@@ -242,18 +597,37 @@ class TestRateLimiting:
         assert client.rate_limiter.should_warn()
 
 
+class TestParseDatetime:
+    """Test GitHub timestamp parsing."""
+
+    def test_github_utc_format(self):
+        parsed = GitHubAPIClient._parse_datetime("2025-01-02T03:04:05Z")
+
+        assert parsed == datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    def test_offset_and_fallback_formats(self):
+        assert GitHubAPIClient._parse_datetime("2025-01-02T03:04:05+02:00").utcoffset() == timedelta(hours=2)
+        assert GitHubAPIClient._parse_datetime("Jan 2 2025") == datetime(2025, 1, 2)
+
+    @pytest.mark.parametrize("value", [None, "", "not a date"])
+    def test_empty_or_invalid(self, value):
+        assert GitHubAPIClient._parse_datetime(value) is None
+
+
 class TestErrorHandling:
     """Test error handling in GitHub API client."""
 
     @patch("ganger.core.github_client.GhApi")
-    def test_list_starred_with_max_count(self, mock_ghapi, mock_auth, mock_repo):
+    def test_list_starred_with_max_count(self, mock_ghapi, mock_auth):
         """Test listing starred repos with max_count limit (line 87)."""
         # Create 5 repos but limit to 2
-        mock_user = Mock()
-        mock_user.get_starred.return_value = [mock_repo for _ in range(5)]
-        mock_auth.get_github_client.return_value.get_user.return_value = mock_user
-
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(
+            client,
+            MockStarredREST.transport(
+                [MockStarredREST.create_item(f"user/repo{i}", id=i) for i in range(5)]
+            ),
+        )
         repos = client._get_starred_rest(max_count=2)
 
         assert len(repos) == 2
@@ -261,13 +635,10 @@ class TestErrorHandling:
     @patch("ganger.core.github_client.GhApi")
     def test_list_starred_auth_error(self, mock_ghapi, mock_auth):
         """Test 401 auth error raises AuthenticationError (lines 104-110)."""
-        from github import GithubException
-
-        mock_auth.get_github_client.return_value.get_user.side_effect = GithubException(
-            401, {"message": "Bad credentials"}
-        )
-
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(
+            client, MockStarredREST.transport([], 401, '{"message": "Bad credentials"}')
+        )
 
         with pytest.raises(AuthenticationError, match="authentication failed"):
             client._get_starred_rest()
@@ -275,14 +646,11 @@ class TestErrorHandling:
     @patch("ganger.core.github_client.GhApi")
     def test_list_starred_rate_limit_error(self, mock_ghapi, mock_auth):
         """Test 403 rate limit error raises RateLimitExceededError (lines 104-110)."""
-        from github import GithubException
-
-        error_data = {"message": "API rate limit exceeded"}
-        mock_auth.get_github_client.return_value.get_user.side_effect = GithubException(
-            403, error_data
-        )
-
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(
+            client,
+            MockStarredREST.transport([], 403, '{"message": "API rate limit exceeded"}'),
+        )
 
         with pytest.raises(RateLimitExceededError, match="API rate limit exceeded"):
             client._get_starred_rest()
@@ -290,51 +658,51 @@ class TestErrorHandling:
     @patch("ganger.core.github_client.GhApi")
     def test_list_starred_generic_error(self, mock_ghapi, mock_auth):
         """Test generic GitHub error raises GangerError (line 110)."""
-        from github import GithubException
         from ganger.core.exceptions import GangerError
 
-        mock_auth.get_github_client.return_value.get_user.side_effect = GithubException(
-            500, {"message": "Internal Server Error"}
-        )
-
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(
+            client,
+            MockStarredREST.transport([], 500, '{"message": "Internal Server Error"}'),
+        )
 
         with pytest.raises(GangerError, match="GitHub API error"):
             client._get_starred_rest()
 
     @patch("ganger.core.github_client.GhApi")
     def test_star_repo_not_found(self, mock_ghapi, mock_auth):
-        """Test starring nonexistent repo raises RepoNotFoundError (lines 281-284)."""
-        from github import GithubException
-
-        mock_auth.get_github_client.return_value.get_repo.side_effect = GithubException(
-            404, {"message": "Not Found"}
-        )
-
+        """Test starring nonexistent repo raises RepoNotFoundError."""
         client = GitHubAPIClient(mock_auth)
+        _install_github(client)
 
         with pytest.raises(RepoNotFoundError, match="Repository.*not found"):
             client.star_repo("invalid/repo")
 
     @patch("ganger.core.github_client.GhApi")
     def test_unstar_repo_not_found(self, mock_ghapi, mock_auth):
-        """Test unstarring nonexistent repo raises RepoNotFoundError (lines 303-306)."""
-        from github import GithubException
-
-        mock_auth.get_github_client.return_value.get_repo.side_effect = GithubException(
-            404, {"message": "Not Found"}
-        )
-
+        """Test unstarring nonexistent repo raises RepoNotFoundError."""
         client = GitHubAPIClient(mock_auth)
+        _install_github(client)
 
         with pytest.raises(RepoNotFoundError, match="Repository.*not found"):
             client.unstar_repo("invalid/repo")
 
+    @patch("ganger.core.github_client.GhApi")
+    def test_star_repo_auth_error(self, mock_ghapi, mock_auth):
+        """A 401 from the shared client maps to AuthenticationError."""
+        client = GitHubAPIClient(mock_auth)
+        _install_github(client, status=401)
+
+        with pytest.raises(AuthenticationError):
+            client.star_repo("octocat/Hello-World")
+
     @patch("ganger.core.github_client.GhApi")
     def test_get_readme_repo_not_found(self, mock_ghapi, mock_auth):
         """Test getting README for nonexistent repo (lines 359-362)."""
         from github import GithubException
 
+        mock_ghapi.return_value.graphql.query.side_effect = Exception("GraphQL down")
+
         mock_auth.get_github_client.return_value.get_repo.side_effect = GithubException(
             404, {"message": "Not Found"}
         )
@@ -346,30 +714,30 @@ class TestErrorHandling:
 
     @patch("ganger.core.github_client.GhApi")
     def test_search_repos_rate_limit(self, mock_ghapi, mock_auth):
-        """Test search with rate limit error (lines 393-396)."""
-        from github import GithubException
-
-        error_data = {"message": "API rate limit exceeded for search"}
-        mock_auth.get_github_client.return_value.search_repositories.side_effect = GithubException(
-            403, error_data
-        )
-
+        """Test search with rate limit error."""
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(
+            client,
+            httpx.MockTransport(
+                lambda request: httpx.Response(
+                    403, json={"message": "API rate limit exceeded for search"}
+                )
+            ),
+        )
 
         with pytest.raises(RateLimitExceededError, match="rate limit"):
             client.search_repos("python")
 
     @patch("ganger.core.github_client.GhApi")
     def test_search_repos_generic_error(self, mock_ghapi, mock_auth):
-        """Test search with generic error (line 396)."""
-        from github import GithubException
-        from ganger.core.exceptions import GangerError
-
-        mock_auth.get_github_client.return_value.search_repositories.side_effect = GithubException(
-            401, {"message": "Unauthorized"}
-        )
-
+        """An invalid query surfaces as a search error."""
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(
+            client,
+            httpx.MockTransport(
+                lambda request: httpx.Response(422, json={"message": "Validation Failed"})
+            ),
+        )
 
         with pytest.raises(GangerError, match="Search error"):
             client.search_repos("python")
@@ -7,15 +7,17 @@ for GraphQL operations which are critical for TUI performance.
 Created: 2025-11-08
 """
 
-from datetime import datetime, timezone
+import json
+from datetime import datetime
 from unittest.mock import Mock, patch, MagicMock
+import httpx
 import pytest
 
 from ganger.core.github_client import GitHubAPIClient
 from ganger.core.auth import GitHubAuth
 from ganger.core.models import StarredRepo
 from ganger.core.exceptions import GangerError, RateLimitExceededError
-from tests.utils import MockGraphQLResponse
+from tests.utils import MockGraphQLResponse, MockStarredREST
 
 
 @pytest.fixture
@@ -66,7 +68,7 @@ class TestGraphQLBulkFetch:
 
     @patch("ganger.core.github_client.GhApi")
     def test_graphql_supports_direct_endpoint_shape(self, mock_ghapi, mock_auth):
-        """Production ghapi returns a top-level `data` payload from `/graphql`."""
+        """The `/graphql` endpoint is POSTed over the shared HTTP client."""
         response = {
             "data": MockGraphQLResponse.create_starred_response([
                 {
@@ -76,21 +78,22 @@ class TestGraphQLBulkFetch:
                 }
             ], has_next_page=False)
         }
+        posted = []
 
-        class DirectGraphQLClient:
-            def __call__(self, path, verb=None, data=None):
-                assert path == "/graphql"
-                assert verb == "POST"
-                assert "query" in data
-                return response
+        def handler(request):
+            posted.append((request.method, request.url.path, json.loads(request.content)))
+            return httpx.Response(200, json=response)
 
-        mock_ghapi.return_value = DirectGraphQLClient()
+        mock_ghapi.return_value = Mock(spec=[])  # no ghapi `graphql.query` group
 
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(client, httpx.MockTransport(handler))
         repos = client._get_starred_graphql()
 
         assert len(repos) == 1
         assert repos[0].full_name == "python/cpython"
+        assert posted[0][:2] == ("POST", "/graphql")
+        assert "query" in posted[0][2]
 
     @patch("ganger.core.github_client.GhApi")
     def test_graphql_page_fetch_reports_total_count(self, mock_ghapi, mock_auth):
@@ -115,6 +118,27 @@ class TestGraphQLBulkFetch:
         assert page["has_next_page"] is False
         assert len(page["repos"]) == 1
 
+    @patch("ganger.core.github_client.GhApi")
+    def test_graphql_page_stops_at_starred_after(self, mock_ghapi, mock_auth):
+        """Pages are newest first and end at the first already-synced star."""
+        response = MockGraphQLResponse.create_starred_response([
+            {"id": "R_3", "nameWithOwner": "user/new", "starredAt": "2025-03-01T00:00:00Z"},
+            {"id": "R_2", "nameWithOwner": "user/seen", "starredAt": "2025-02-01T00:00:00Z"},
+            {"id": "R_1", "nameWithOwner": "user/old", "starredAt": "2025-01-01T00:00:00Z"},
+        ], has_next_page=True, end_cursor="cursor_page2")
+
+        mock_ghapi_instance = Mock()
+        mock_ghapi_instance.graphql.query.return_value = response
+        mock_ghapi.return_value = mock_ghapi_instance
+
+        client = GitHubAPIClient(mock_auth)
+        page = client.get_starred_repos_page(starred_after=datetime(2025, 2, 1))
+
+        query = mock_ghapi_instance.graphql.query.call_args.args[0]
+        assert "orderBy: {field: STARRED_AT, direction: DESC}" in query
+        assert [repo.full_name for repo in page["repos"]] == ["user/new"]
+        assert page["has_next_page"] is False
+
     @patch("ganger.core.github_client.GhApi")
     def test_graphql_pagination_multiple_pages(self, mock_ghapi, mock_auth):
         """Test GraphQL pagination across multiple pages."""
@@ -147,6 +171,101 @@ class TestGraphQLBulkFetch:
         second_call_vars = mock_ghapi_instance.graphql.query.call_args_list[1][1]["variables"]
         assert second_call_vars == {"pageSize": 100, "cursor": "cursor_page2"}
 
+    @patch("ganger.core.github_client.GhApi")
+    def test_iter_starred_pages_yields_each_page(self, mock_ghapi, mock_auth):
+        """Pages are yielded as parsed lists instead of one accumulated list."""
+        page1_response = MockGraphQLResponse.create_starred_response([
+            {"id": f"R_{i}", "nameWithOwner": f"user/repo{i}"} for i in range(100)
+        ], has_next_page=True, end_cursor="cursor_page2")
+        page2_response = MockGraphQLResponse.create_starred_response([
+            {"id": f"R_{i}", "nameWithOwner": f"user/repo{i}"} for i in range(100, 150)
+        ], has_next_page=False)
+
+        mock_ghapi_instance = Mock()
+        mock_ghapi_instance.graphql.query.side_effect = [page1_response, page2_response]
+        mock_ghapi.return_value = mock_ghapi_instance
+
+        client = GitHubAPIClient(mock_auth)
+        pages = client.iter_starred_pages()
+
+        first = next(pages)
+        assert len(first) == 100
+        assert [len(page) for page in pages] == [50]
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_graphql_requests_next_page_before_parsing(self, mock_ghapi, mock_auth):
+        """The next page is requested while the current one is still being parsed."""
+        import threading
+
+        page1 = MockGraphQLResponse.create_starred_response(
+            [{"id": "R_1", "nameWithOwner": "user/repo1"}],
+            has_next_page=True, end_cursor="cursor_page2",
+        )
+        page2 = MockGraphQLResponse.create_starred_response(
+            [{"id": "R_2", "nameWithOwner": "user/repo2"}], has_next_page=False
+        )
+        second_request = threading.Event()
+
+        def query(_query, variables):
+            if variables.get("cursor"):
+                second_request.set()
+                return page2
+            return page1
+
+        mock_ghapi_instance = Mock()
+        mock_ghapi_instance.graphql.query.side_effect = query
+        mock_ghapi.return_value = mock_ghapi_instance
+
+        client = GitHubAPIClient(mock_auth)
+        build = client._build_starred_repo_from_graphql_edge
+        overlapped = []
+
+        def parse(edge):
+            if edge["node"]["id"] == "R_1":
+                overlapped.append(second_request.wait(timeout=5))
+            return build(edge)
+
+        client._build_starred_repo_from_graphql_edge = parse
+        repos = client._get_starred_graphql()
+
+        assert [r.id for r in repos] == ["R_1", "R_2"]
+        assert overlapped == [True]
+
+    @patch("ganger.core.github_client.GhApi")
+    def test_closing_iterator_early_does_not_wait_for_prefetch(self, mock_ghapi, mock_auth):
+        """Abandoning the pages doesn't block on the request already in flight."""
+        import threading
+        import time
+
+        page1 = MockGraphQLResponse.create_starred_response(
+            [{"id": "R_1", "nameWithOwner": "user/repo1"}],
+            has_next_page=True, end_cursor="cursor_page2",
+        )
+        page2 = MockGraphQLResponse.create_starred_response([], has_next_page=False)
+        in_flight = threading.Event()
+        release = threading.Event()
+
+        def query(_query, variables):
+            if variables.get("cursor"):
+                in_flight.set()
+                release.wait(timeout=5)
+                return page2
+            return page1
+
+        mock_ghapi.return_value.graphql.query.side_effect = query
+
+        client = GitHubAPIClient(mock_auth)
+        pages = client.iter_starred_pages()
+        next(pages)
+        assert in_flight.wait(timeout=5)
+
+        started = time.monotonic()
+        pages.close()
+        elapsed = time.monotonic() - started
+        release.set()
+
+        assert elapsed < 1
+
     @patch("ganger.core.github_client.GhApi")
     def test_graphql_empty_response(self, mock_ghapi, mock_auth):
         """Test GraphQL query with no starred repos."""
@@ -211,6 +330,28 @@ class TestGraphQLBulkFetch:
         # Verify
         assert repos[0].language is None
 
+    def test_graphql_edge_with_null_nested_objects(self, mock_auth):
+        """Null nested objects fall back to defaults instead of raising."""
+        with patch("ganger.core.github_client.GhApi"):
+            client = GitHubAPIClient(mock_auth)
+        edge = MockGraphQLResponse.create_starred_response([
+            {
+                "id": "R_1",
+                "nameWithOwner": "user/bare",
+                "defaultBranchRef": None,
+                "licenseInfo": {"name": "MIT License"},
+            }
+        ])["viewer"]["starredRepositories"]["edges"][0]
+        edge["node"]["watchers"] = None
+        edge["node"]["repositoryTopics"] = None
+
+        repo = client._build_starred_repo_from_graphql_edge(edge)
+
+        assert repo.watchers_count == 0
+        assert repo.topics == []
+        assert repo.default_branch == "main"
+        assert repo.license == "MIT License"
+
     @patch("ganger.core.github_client.GhApi")
     def test_graphql_handles_archived_repos(self, mock_ghapi, mock_auth):
         """Test that archived status is correctly parsed."""
@@ -245,36 +386,11 @@ class TestGraphQLErrorHandling:
         mock_ghapi_instance.graphql.query.side_effect = Exception("GraphQL rate limited")
         mock_ghapi.return_value = mock_ghapi_instance
 
-        # Mock REST API
-        mock_repo = Mock()
-        mock_repo.id = 1
-        mock_repo.full_name = "user/repo"
-        mock_repo.name = "repo"
-        mock_repo.owner.login = "user"
-        mock_repo.description = "Test"
-        mock_repo.stargazers_count = 100
-        mock_repo.forks_count = 10
-        mock_repo.watchers_count = 50
-        mock_repo.language = "Python"
-        mock_repo.get_topics.return_value = ["test"]
-        mock_repo.archived = False
-        mock_repo.private = False
-        mock_repo.fork = False
-        mock_repo.created_at = datetime(2020, 1, 1, tzinfo=timezone.utc)
-        mock_repo.updated_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
-        mock_repo.pushed_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
-        mock_repo.html_url = "https://github.com/user/repo"
-        mock_repo.clone_url = "https://github.com/user/repo.git"
-        mock_repo.homepage = None
-        mock_repo.default_branch = "main"
-        mock_repo.license = None
-
-        mock_user = Mock()
-        mock_user.get_starred.return_value = [mock_repo]
-        mock_auth.get_github_client.return_value.get_user.return_value = mock_user
-
         # Execute
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(
+            client, MockStarredREST.transport([MockStarredREST.create_item("user/repo")])
+        )
         repos = client._get_starred_graphql()
 
         # Verify: Fell back to REST
@@ -323,33 +439,10 @@ class TestGraphQLErrorHandling:
         mock_ghapi_instance.graphql.query.side_effect = Exception("socket error")
         mock_ghapi.return_value = mock_ghapi_instance
 
-        mock_repo = Mock()
-        mock_repo.id = 1
-        mock_repo.full_name = "user/repo"
-        mock_repo.name = "repo"
-        mock_repo.owner.login = "user"
-        mock_repo.description = "Test"
-        mock_repo.stargazers_count = 100
-        mock_repo.forks_count = 10
-        mock_repo.watchers_count = 50
-        mock_repo.language = "Python"
-        mock_repo.archived = False
-        mock_repo.private = False
-        mock_repo.fork = False
-        mock_repo.created_at = datetime(2020, 1, 1, tzinfo=timezone.utc)
-        mock_repo.updated_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
-        mock_repo.pushed_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
-        mock_repo.html_url = "https://github.com/user/repo"
-        mock_repo.clone_url = "https://github.com/user/repo.git"
-        mock_repo.homepage = None
-        mock_repo.default_branch = "main"
-        mock_repo.license = None
-
-        mock_user = Mock()
-        mock_user.get_starred.return_value = [mock_repo]
-        mock_auth.get_github_client.return_value.get_user.return_value = mock_user
-
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(
+            client, MockStarredREST.transport([MockStarredREST.create_item("user/repo")])
+        )
         repos = client._get_starred_graphql()
 
         captured = capsys.readouterr()
@@ -508,38 +601,15 @@ class TestGraphQLIntegration:
     def test_get_starred_repos_can_use_rest_explicitly(self, mock_ghapi, mock_auth):
         """Test that get_starred_repos can use REST API when specified."""
         # Setup REST mock
-        mock_repo = Mock()
-        mock_repo.id = 1
-        mock_repo.full_name = "user/repo"
-        mock_repo.name = "repo"
-        mock_repo.owner.login = "user"
-        mock_repo.description = "Test"
-        mock_repo.stargazers_count = 100
-        mock_repo.forks_count = 10
-        mock_repo.watchers_count = 50
-        mock_repo.language = "Python"
-        mock_repo.get_topics.return_value = []
-        mock_repo.archived = False
-        mock_repo.private = False
-        mock_repo.fork = False
-        mock_repo.created_at = datetime(2020, 1, 1, tzinfo=timezone.utc)
-        mock_repo.updated_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
-        mock_repo.pushed_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
-        mock_repo.html_url = "https://github.com/user/repo"
-        mock_repo.clone_url = "https://github.com/user/repo.git"
-        mock_repo.homepage = None
-        mock_repo.default_branch = "main"
-        mock_repo.license = None
-
-        mock_user = Mock()
-        mock_user.get_starred.return_value = [mock_repo]
-        mock_auth.get_github_client.return_value.get_user.return_value = mock_user
 
         mock_ghapi_instance = Mock()
         mock_ghapi.return_value = mock_ghapi_instance
 
         # Execute
         client = GitHubAPIClient(mock_auth)
+        MockStarredREST.install(
+            client, MockStarredREST.transport([MockStarredREST.create_item("user/repo")])
+        )
         repos = client.get_starred_repos(use_graphql=False)
 
         # Verify: REST was used, GraphQL was not
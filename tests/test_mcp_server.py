@@ -4,7 +4,9 @@ Tests for MCP server.
 Modified: 2025-11-09
 """
 
+import asyncio
 import os
+import threading
 import pytest
 import pytest_asyncio
 from pathlib import Path
@@ -13,10 +15,20 @@ from unittest.mock import Mock, patch, AsyncMock
 from ganger.mcp.server import create_server, GangerMCPServer, main
 from ganger.core.auth import GitHubAuth
 from ganger.core.exceptions import GangerError, AuthenticationError
-from ganger.mcp.tools import _handle_tool_call
+from ganger.mcp.tools import _HANDLERS, _TOOLS_CATALOG, _handle_tool_call, _json_text
 from ganger.config.settings import Settings
 
 
+@pytest.fixture
+def mcp_server(tmp_path):
+    """GangerMCPServer with a mocked GitHub client and mockable components."""
+    with patch("ganger.mcp.server.GitHubAPIClient"):
+        server = GangerMCPServer(auth=Mock(spec=GitHubAuth), cache_path=tmp_path / "test.db")
+    server.cache = AsyncMock()
+    server.folder_manager = AsyncMock()
+    return server
+
+
 @patch("ganger.mcp.server.GitHubAuth")
 @patch("ganger.mcp.server.GitHubAPIClient")
 def test_create_server(mock_api_client, mock_auth, tmp_path):
@@ -75,6 +87,9 @@ async def test_server_async_initialization(mock_api_client, mock_auth, tmp_path)
 
     assert server.folder_manager is not None
 
+    await server.close()
+    assert server.cache._connection is None
+
 
 class TestAuthenticationError:
     """Test authentication error handling."""
@@ -193,21 +208,45 @@ class TestRunFlow:
         # Verify server.run was called with streams
         server.server.run.assert_called_once_with(mock_read_stream, mock_write_stream, {})
 
+        await server.close()
+
+
+class TestServe:
+    """Test serving from a caller-owned event loop."""
+
+    @pytest.mark.asyncio
+    @patch("ganger.mcp.server.register_tools")
+    @patch("ganger.mcp.server.stdio_server")
+    @patch("ganger.mcp.server.GitHubAPIClient")
+    async def test_serve_runs_on_running_loop(self, mock_api_client, mock_stdio_server, mock_register_tools, tmp_path):
+        """serve() can be awaited directly and closes the cache afterwards."""
+        mock_stdio_server.return_value.__aenter__ = AsyncMock(return_value=("r", "w"))
+        mock_stdio_server.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        server = GangerMCPServer(auth=Mock(spec=GitHubAuth), cache_path=tmp_path / "test.db")
+        server.server.run = AsyncMock()
+        server.server.create_initialization_options = Mock(return_value={})
+
+        await server.serve()
+
+        mock_register_tools.assert_called_once_with(server.server, server)
+        server.server.run.assert_awaited_once_with("r", "w", {})
+        assert server.cache._connection is None
+        mock_api_client.return_value.close.assert_called_once()
+
 
 class TestToolCaching:
     """Test MCP tool behavior around cache usage."""
 
     @pytest.mark.asyncio
-    async def test_list_starred_repos_does_not_cache_truncated_results(self):
+    @patch("ganger.mcp.server.GitHubAPIClient")
+    async def test_list_starred_repos_does_not_cache_truncated_results(self, mock_api_client, tmp_path):
         """Partial list requests must not replace the full cached snapshot."""
         repos = [Mock(id="1", full_name="user/repo1", description="", stars_count=1, language=None, topics=[], url="")]
+        mock_api_client.return_value.get_starred_repos.return_value = repos
 
-        server = Mock()
-        server.github_client = Mock()
-        server.github_client.get_starred_repos.return_value = repos
-        server.folder_manager = Mock()
+        server = GangerMCPServer(auth=Mock(spec=GitHubAuth), cache_path=tmp_path / "test.db")
         server.cache = AsyncMock()
-        server.cache.get_starred_repos.return_value = None
 
         result = await _handle_tool_call(
             "list_starred_repos",
@@ -218,6 +257,32 @@ class TestToolCaching:
         server.cache.set_starred_repos.assert_not_awaited()
         assert result["count"] == 1
 
+    @pytest.mark.asyncio
+    @patch("ganger.mcp.server.GitHubAPIClient")
+    async def test_concurrent_fetches_share_one_crawl(self, mock_api_client, tmp_path):
+        """Callers arriving during a fetch await it instead of crawling again."""
+        release = threading.Event()
+        repos = [Mock(id="1")]
+
+        def slow_fetch(max_count=None, use_graphql=True):
+            release.wait(5)
+            return repos
+
+        github = mock_api_client.return_value
+        github.get_starred_repos.side_effect = slow_fetch
+        server = GangerMCPServer(auth=Mock(spec=GitHubAuth), cache_path=tmp_path / "test.db")
+        server.cache = AsyncMock()
+
+        tasks = [asyncio.ensure_future(server.fetch_starred_repos()) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert all(result is repos for result in results)
+        github.get_starred_repos.assert_called_once()
+        server.cache.set_starred_repos.assert_awaited_once_with(repos)
+        assert server._starred_inflight == {}
+
     @pytest.mark.asyncio
     async def test_list_starred_repos_slices_cached_results_for_max_count(self):
         """Cached snapshots can satisfy max_count requests without a network call."""
@@ -241,3 +306,120 @@ class TestToolCaching:
         server.github_client.get_starred_repos.assert_not_called()
         assert result["count"] == 1
         assert result["repos"][0]["id"] == "1"
+        assert result["next_offset"] == 1
+
+    @pytest.mark.asyncio
+    async def test_list_starred_repos_pages_with_offset(self):
+        """offset skips repos; next_offset is None on the last page."""
+        repos = [
+            Mock(id=str(i), full_name=f"user/repo{i}", description="", stars_count=i, language=None, topics=[], url="")
+            for i in range(3)
+        ]
+        server = Mock()
+        server.cache = AsyncMock()
+        server.cache.get_starred_repos.return_value = repos
+
+        result = await _handle_tool_call(
+            "list_starred_repos", {"max_count": 2, "offset": 2}, server
+        )
+
+        assert [r["id"] for r in result["repos"]] == ["2"]
+        assert result["offset"] == 2
+        assert result["next_offset"] is None
+
+        with pytest.raises(GangerError, match="offset"):
+            await _handle_tool_call("list_starred_repos", {"offset": -1}, server)
+
+
+class TestFolderStatsTool:
+    """Test the get_folder_stats tool."""
+
+    @pytest.mark.asyncio
+    async def test_without_folder_id_returns_all_folders(self, mcp_server):
+        """Omitting folder_id batches every folder's stats into one call."""
+        server = mcp_server
+        server.folder_manager.get_all_folder_stats.return_value = {
+            "a": {"folder_id": "a", "repo_count": 1},
+            "b": {"folder_id": "b", "repo_count": 0},
+        }
+
+        result = await _handle_tool_call("get_folder_stats", {}, server)
+
+        server.folder_manager.get_folder_stats.assert_not_awaited()
+        assert [f["folder_id"] for f in result["folders"]] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_repeat_polls_are_memoized(self, mcp_server):
+        """Stats are computed once per TTL, per folder."""
+        mcp_server.folder_manager.get_folder_stats.return_value = {"repo_count": 1}
+
+        for _ in range(3):
+            await _handle_tool_call("get_folder_stats", {"folder_id": "a"}, mcp_server)
+        await _handle_tool_call("get_folder_stats", {"folder_id": "b"}, mcp_server)
+
+        assert mcp_server.folder_manager.get_folder_stats.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate_stats(self, mcp_server):
+        """A write tool drops memoized stats so the next poll recomputes."""
+        mcp_server.cache.get_stats.return_value = {"repos_count": 1}
+        await _handle_tool_call("get_cache_stats", {}, mcp_server)
+
+        await _handle_tool_call(
+            "add_repo_to_folder", {"repo_id": "1", "folder_id": "a"}, mcp_server
+        )
+        mcp_server.cache.get_stats.return_value = {"repos_count": 2}
+
+        assert await _handle_tool_call("get_cache_stats", {}, mcp_server) == {"repos_count": 2}
+        assert mcp_server.cache.get_stats.await_count == 2
+
+
+class TestToolDispatch:
+    """Test the name -> handler dispatch table."""
+
+    def test_every_catalog_tool_has_a_handler(self):
+        assert {tool.name for tool in _TOOLS_CATALOG} == set(_HANDLERS)
+
+    @pytest.mark.asyncio
+    async def test_dispatches_to_handler(self, mcp_server):
+        """A known tool name routes to its handler."""
+        mcp_server.cache.get_stats.return_value = {"repos": 3}
+
+        assert "get_cache_stats" in _HANDLERS
+        assert await _handle_tool_call("get_cache_stats", {}, mcp_server) == {"repos": 3}
+
+    @pytest.mark.asyncio
+    async def test_unknown_tool(self):
+        result = await _handle_tool_call("no_such_tool", {}, Mock())
+        assert result == {"error": "Unknown tool: no_such_tool"}
+
+    @pytest.mark.asyncio
+    async def test_missing_required_argument(self):
+        with pytest.raises(GangerError, match="Missing required argument: full_name"):
+            await _handle_tool_call("star_repository", {}, Mock())
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "name, arguments",
+        [
+            ("list_starred_repos", {"max_count": "10"}),
+            ("list_starred_repos", {"use_cache": 1}),
+            ("search_starred_repos", {"query": "x", "max_results": True}),
+            ("create_virtual_folder", {"name": "f", "auto_tags": ["ok", 3]}),
+        ],
+    )
+    async def test_wrong_argument_type(self, name, arguments):
+        server = Mock()
+        with pytest.raises(GangerError, match="Argument"):
+            await _handle_tool_call(name, arguments, server)
+
+
+class TestJsonText:
+    """Test tool-result serialization."""
+
+    def test_result_is_json(self):
+        from ganger.utils import fastjson
+
+        text = _json_text({"error": "it's", "path": Path("/tmp/x")})
+
+        assert fastjson.loads(text) == {"error": "it's", "path": "/tmp/x"}
@@ -14,7 +14,10 @@ from ganger.core.models import (
     ClipboardItem,
     RepoMetadata,
     FolderRepoLink,
+    PrivacyStatus,
+    _parse_timestamp,
 )
+from tests.utils import assert_folder_equals
 
 
 class TestStarredRepo:
@@ -52,11 +55,97 @@ class TestStarredRepo:
         data = repo.to_dict()
         repo2 = StarredRepo.from_dict(data)
 
+        assert data["topics"] == ["python", "ml"]
         assert repo2.id == repo.id
         assert repo2.full_name == repo.full_name
         assert repo2.topics == repo.topics
         assert repo2.created_at == repo.created_at
 
+    def test_from_rest_json(self):
+        """Raw REST payloads map directly, tolerating null optional fields."""
+        repo = StarredRepo.from_rest_json(
+            {
+                "id": 7,
+                "full_name": "octocat/Hello-World",
+                "name": "Hello-World",
+                "owner": {"login": "octocat"},
+                "description": None,
+                "topics": ["api"],
+                "license": {"name": "MIT License"},
+                "created_at": "2020-01-01T00:00:00Z",
+                "pushed_at": None,
+            },
+            starred_at="2024-06-01T12:00:00Z",
+        )
+
+        assert repo.id == "7"
+        assert repo.owner == "octocat"
+        assert repo.description == ""
+        assert repo.topics == ["api"]
+        assert repo.license == "MIT License"
+        assert repo.created_at == datetime(2020, 1, 1, tzinfo=timezone.utc)
+        assert repo.pushed_at is None
+        assert repo.starred_at == datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+
+    def test_from_row_matches_from_dict(self):
+        """from_row on a cache row equals the from_dict(dict(row)) result."""
+        import sqlite3
+
+        repo = StarredRepo(
+            id="12345",
+            full_name="octocat/Hello-World",
+            name="Hello-World",
+            owner="octocat",
+            topics=["python", "ml"],
+            created_at=datetime(2023, 1, 1, tzinfo=timezone.utc),
+            pushed_at=datetime(2023, 2, 1, 12, 30),
+        )
+        data = repo.to_dict()
+        data["topics"] = json.dumps(data["topics"])  # as the cache stores it
+        data["cached_at"] = data["accessed_at"] = "2024-01-01T00:00:00"
+
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        columns = ", ".join(f"? AS {key}" for key in data)
+        row = conn.execute(f"SELECT {columns}", tuple(data.values())).fetchone()
+        conn.close()
+
+        assert StarredRepo.from_row(row) == StarredRepo.from_dict(dict(row))
+        assert StarredRepo.from_row(row).is_stub is False
+
+    def test_match_keys(self):
+        """match_keys lowercases topics and includes the language."""
+        repo = StarredRepo(
+            id="1", full_name="a/b", name="b", owner="a",
+            language="Rust", topics=["CLI", "tui"],
+        )
+
+        assert repo.match_keys() == {"cli", "tui", "rust"}
+
+    def test_slotted(self):
+        """StarredRepo carries no per-instance __dict__ but stays mutable."""
+        repo = StarredRepo(id="1", full_name="a/b", name="b", owner="a")
+
+        assert not hasattr(repo, "__dict__")
+        repo.user_tags = ["x"]
+        repo.is_selected = True
+        with pytest.raises(AttributeError):
+            repo.not_a_field = 1
+
+    @pytest.mark.parametrize(
+        "instance",
+        [
+            VirtualFolder(id="f", name="F"),
+            RepoMetadata(repo_id="1"),
+            ClipboardItem(repo=StarredRepo(id="1", full_name="o/r", name="r", owner="o")),
+            Clipboard(),
+            FolderRepoLink(folder_id="f", repo_id="1"),
+        ],
+    )
+    def test_other_models_slotted(self, instance):
+        """Every other model is slotted too."""
+        assert not hasattr(instance, "__dict__")
+
     def test_format_stars(self):
         """Test star count formatting."""
         repo1 = StarredRepo(
@@ -74,6 +163,16 @@ class TestStarredRepo:
         )
         assert repo3.format_stars() == "45.2k"
 
+    def test_format_stars_tracks_star_changes(self):
+        """Memoizing by count means a refreshed stars_count shows immediately."""
+        repo = StarredRepo(
+            id="1", full_name="test/repo1", name="repo1", owner="test", stars_count=999
+        )
+        assert repo.format_stars() == "999"
+
+        repo.stars_count = 1000
+        assert repo.format_stars() == "1.0k"
+
     def test_format_updated(self):
         """Test updated time formatting."""
         now = datetime.now(timezone.utc)
@@ -143,6 +242,22 @@ class TestVirtualFolder:
         )
         assert not folder.matches_repo(repo3)
 
+    def test_auto_tag_keys_follow_auto_tags_changes(self):
+        """The lowercased tag memo is rebuilt when auto_tags is edited."""
+        folder = VirtualFolder(id="f", name="F", auto_tags=["Rust"])
+        repo = StarredRepo(id="1", full_name="o/r", name="r", owner="o", topics=["go"])
+
+        assert folder.auto_tag_keys() == {"rust"}
+        assert not folder.matches_repo(repo)
+
+        folder.auto_tags.append("GO")
+        assert folder.matches_repo(repo)
+
+        folder.auto_tags = []
+        assert folder.auto_tag_keys() == frozenset()
+        assert not folder.matches_repo(repo)
+        assert folder == VirtualFolder(id="f", name="F")
+
     def test_to_dict_from_dict(self):
         """Test folder serialization."""
         folder = VirtualFolder(
@@ -155,10 +270,22 @@ class TestVirtualFolder:
         data = folder.to_dict()
         folder2 = VirtualFolder.from_dict(data)
 
+        assert data["auto_tags"] == ["ai", "machine-learning"]
         assert folder2.id == folder.id
         assert folder2.name == folder.name
         assert folder2.auto_tags == folder.auto_tags
 
+        # Only one side has its auto-tag memo filled; that's not a difference.
+        folder.auto_tag_keys()
+        assert_folder_equals(folder, folder2)
+        with pytest.raises(AssertionError):
+            assert_folder_equals(folder, VirtualFolder.from_dict({**data, "name": "Other"}))
+        assert_folder_equals(
+            folder,
+            VirtualFolder.from_dict({**data, "name": "Other"}),
+            ignore_fields=["name"],
+        )
+
 
 class TestClipboard:
     """Test Clipboard model."""
@@ -205,6 +332,42 @@ class TestClipboard:
         assert clipboard.is_empty()
         assert clipboard.get_operation() is None
 
+    def test_is_cut_and_is_copied(self):
+        """Membership checks follow copy, cut and clear."""
+        clipboard = Clipboard()
+        repos = [
+            StarredRepo(id="1", full_name="test/repo1", name="repo1", owner="test"),
+            StarredRepo(id="2", full_name="test/repo2", name="repo2", owner="test"),
+        ]
+
+        clipboard.cut(repos[:1], source_folder_id="folder1")
+        assert clipboard.is_cut("1")
+        assert not clipboard.is_cut("2")
+        assert not clipboard.is_copied("1")
+
+        clipboard.copy(repos)
+        assert clipboard.is_copied("2")
+        assert not clipboard.is_cut("1")
+
+        clipboard.clear()
+        assert not clipboard.is_copied("1")
+
+    def test_paste_snapshot_survives_refill(self):
+        """paste() hands out a read-only snapshot; items themselves are frozen."""
+        clipboard = Clipboard()
+        first = StarredRepo(id="1", full_name="test/repo1", name="repo1", owner="test")
+        second = StarredRepo(id="2", full_name="test/repo2", name="repo2", owner="test")
+
+        clipboard.cut([first], source_folder_id="folder1")
+        pasted = clipboard.paste()
+        clipboard.copy([second])
+
+        assert isinstance(pasted, tuple)
+        assert [item.repo.id for item in pasted] == ["1"]
+        assert clipboard.get_operation() == "copy"
+        with pytest.raises(AttributeError):
+            pasted[0].operation = "copy"
+
 
 class TestRepoMetadata:
     """Test RepoMetadata model."""
@@ -316,6 +479,30 @@ class TestStarredRepoFormatting:
 
         assert repo.format_updated() == "2y ago"
 
+    @pytest.mark.parametrize(
+        "days, expected",
+        [(1, "1d ago"), (6, "6d ago"), (7, "1w ago"), (29, "4w ago"),
+         (30, "1mo ago"), (364, "12mo ago"), (365, "1y ago")],
+    )
+    def test_format_updated_with_shared_now(self, days, expected):
+        """A caller-supplied clock gives the same buckets at each boundary."""
+        now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        repo = StarredRepo(
+            id="1", full_name="test/repo", name="repo", owner="test",
+            updated_at=now - timedelta(days=days),
+        )
+
+        assert repo.format_updated(now) == expected
+
+    def test_format_updated_mixed_timezone_awareness(self):
+        """An aware shared clock still works for naive (local) timestamps."""
+        repo = StarredRepo(
+            id="1", full_name="test/repo", name="repo", owner="test",
+            updated_at=datetime.now() - timedelta(days=3),
+        )
+
+        assert repo.format_updated(datetime.now(timezone.utc)) == "3d ago"
+
 
 class TestFolderRepoLink:
     """Test FolderRepoLink model."""
@@ -348,3 +535,38 @@ class TestFolderRepoLink:
         assert link2.folder_id == link.folder_id
         assert link2.is_manual == link.is_manual
         assert link2.added_at == link.added_at
+
+
+class TestPrivacyStatus:
+    """Test PrivacyStatus."""
+
+    def test_members_are_plain_strings(self):
+        assert PrivacyStatus.PRIVATE == "private"
+        assert PrivacyStatus("public") is PrivacyStatus.PUBLIC
+        assert json.dumps([PrivacyStatus.PUBLIC]) == '["public"]'
+
+
+class TestParseTimestamp:
+    """Test the ISO fast path used by the from_dict constructors."""
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("2023-01-01T12:00:00+00:00", datetime(2023, 1, 1, 12, tzinfo=timezone.utc)),
+            ("2023-01-01T12:00:00Z", datetime(2023, 1, 1, 12, tzinfo=timezone.utc)),
+            ("2023-01-01T12:00:00.250000", datetime(2023, 1, 1, 12, 0, 0, 250000)),
+            # Not ISO: handled by the dateutil fallback
+            ("Jan 1 2023 12:00", datetime(2023, 1, 1, 12)),
+        ],
+    )
+    def test_formats(self, value, expected):
+        assert _parse_timestamp(value) == expected
+
+    def test_from_dict_constructors_round_trip(self):
+        when = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        meta = RepoMetadata(repo_id="1", readme_content=None, cached_at=when)
+        folder = VirtualFolder(id="f", name="F", created_at=when, updated_at=when)
+
+        assert RepoMetadata.from_dict(meta.to_dict()).cached_at == when
+        restored = VirtualFolder.from_dict(folder.to_dict())
+        assert (restored.created_at, restored.updated_at) == (when, when)
@@ -4,10 +4,11 @@ Tests for rate limiter.
 Modified: 2025-11-07
 """
 
+import asyncio
 import pytest
 import time
 from datetime import datetime, timedelta
-from ganger.utils.rate_limiter import RateLimiter
+from ganger.utils.rate_limiter import AsyncTokenBucket, RateLimiter
 
 
 class TestRateLimiter:
@@ -161,3 +162,58 @@ class TestRateLimiter:
 
         # Verify quota wasn't reset (still has original value)
         assert limiter.quota_used == 100
+
+    def test_wait_if_needed_fast_path_skips_slow_checks(self, monkeypatch):
+        """With quota left, neither wait helper touches the slow path."""
+        limiter = RateLimiter()
+        limiter.quota_used = limiter.hourly_quota - 1
+
+        def fail():
+            raise AssertionError("slow path taken")
+
+        monkeypatch.setattr(limiter, "get_wait_time", fail)
+
+        limiter.wait_if_needed()
+        asyncio.run(limiter.wait_if_needed_async())
+
+
+class TestAsyncTokenBucket:
+    """Test AsyncTokenBucket pacing."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """Fake monotonic clock that asyncio.sleep advances instantly."""
+        now = [0.0]
+
+        async def fake_sleep(seconds):
+            now[0] += seconds
+
+        monkeypatch.setattr("ganger.utils.rate_limiter.asyncio.sleep", fake_sleep)
+        return now
+
+    def test_burst_up_to_capacity_is_free(self, clock):
+        bucket = AsyncTokenBucket(rate=1, capacity=3, timer=lambda: clock[0])
+
+        async def run():
+            for _ in range(3):
+                await bucket.acquire()
+
+        asyncio.run(run())
+        assert clock[0] == 0
+
+    def test_waits_for_tokens_to_refill(self, clock):
+        bucket = AsyncTokenBucket(rate=2, capacity=1, timer=lambda: clock[0])
+
+        async def run():
+            await bucket.acquire()
+            await bucket.acquire()
+            await bucket.acquire(cost=1)
+
+        asyncio.run(run())
+        assert clock[0] == pytest.approx(1.0)
+
+    def test_cost_above_capacity_rejected(self):
+        bucket = AsyncTokenBucket(rate=1, capacity=2)
+
+        with pytest.raises(ValueError):
+            asyncio.run(bucket.acquire(cost=3))
@@ -89,6 +89,90 @@ class TestSettings:
         assert settings.github.token == "env_token"
         assert settings.cache.repos_ttl == 9999
 
+    def test_cache_path_env_override_without_config_file(self, monkeypatch, tmp_path):
+        """Env overrides apply even when no config file exists."""
+        monkeypatch.setenv("GANGER_CACHE_PATH", "/tmp/custom.db")
+        monkeypatch.setenv("GANGER_CACHE_TTL", "")
+
+        settings = Settings.load(tmp_path / "missing.yaml")
+
+        assert settings.cache.db_path == "/tmp/custom.db"
+        assert settings.cache.repos_ttl == CacheSettings().repos_ttl
+
+    def test_load_utf8_yaml(self, tmp_path):
+        """Non-ASCII YAML decodes as UTF-8 regardless of locale."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_bytes("mcp:\n  name: gänger\n".encode("utf-8"))
+
+        assert Settings.load(config_file).mcp.name == "gänger"
+
+    def test_load_partial_sections_use_dataclass_defaults(self, tmp_path):
+        """Missing keys fall back to dataclass defaults; unknown keys are ignored."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            yaml.dump(
+                {
+                    "cache": {"metadata_ttl": 60, "unknown": 1},
+                    "mcp": None,
+                    "future_section": {"x": 1},
+                }
+            )
+        )
+
+        settings = Settings.load(config_file)
+
+        assert settings.cache.metadata_ttl == 60
+        assert settings.cache.repos_ttl == CacheSettings().repos_ttl
+        assert settings.mcp == MCPSettings()
+        assert settings.github == GitHubSettings()
+
+    def test_load_reuses_parse_until_file_changes(self, tmp_path, monkeypatch):
+        """Repeated loads of an unchanged file skip the YAML parse."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump({"cache": {"repos_ttl": 1800}}))
+
+        calls = []
+        real_load = yaml.load
+
+        def counting_load(*args, **kwargs):
+            calls.append(1)
+            return real_load(*args, **kwargs)
+
+        monkeypatch.setattr(yaml, "load", counting_load)
+
+        first = Settings.load(config_file)
+        second = Settings.load(config_file)
+        assert first.cache.repos_ttl == second.cache.repos_ttl == 1800
+        assert len(calls) == 1
+
+        # Mutating loaded settings must not leak into the cached parse.
+        first.folders.default_folders.append({"name": "Scratch"})
+        assert Settings.load(config_file).folders.default_folders == second.folders.default_folders
+
+        config_file.write_text(yaml.dump({"cache": {"repos_ttl": 900, "db_path": "/x.db"}}))
+        assert Settings.load(config_file).cache.repos_ttl == 900
+        assert len(calls) == 2
+
+    def test_toml_and_json_take_precedence_over_yaml(self, tmp_path):
+        """A config.toml / config.json next to config.yaml is preferred."""
+        yaml_file = tmp_path / "config.yaml"
+        yaml_file.write_text(yaml.dump({"cache": {"repos_ttl": 100}}))
+        assert Settings.load(yaml_file).cache.repos_ttl == 100
+
+        (tmp_path / "config.json").write_text('{"cache": {"repos_ttl": 200}}')
+        assert Settings.load(yaml_file).cache.repos_ttl == 200
+
+        (tmp_path / "config.toml").write_text("[cache]\nrepos_ttl = 300\n")
+        assert Settings.load(yaml_file).cache.repos_ttl == 300
+
+    def test_explicit_path_ignores_siblings(self, tmp_path):
+        """An explicitly named file is read even when a same-stem sibling exists."""
+        prod_file = tmp_path / "prod.yaml"
+        prod_file.write_text(yaml.dump({"cache": {"repos_ttl": 100}}))
+        (tmp_path / "prod.toml").write_text("[cache]\nrepos_ttl = 300\n")
+
+        assert Settings.load(prod_file).cache.repos_ttl == 100
+
     def test_to_dict(self):
         """Test converting settings to dictionary."""
         settings = Settings()
@@ -103,6 +187,14 @@ class TestSettings:
         assert settings_dict["github"]["auth_method"] == "auto"
         assert settings_dict["cache"]["repos_ttl"] == 86400
 
+    def test_to_dict_omits_token(self):
+        """The GitHub token never ends up in the serialized settings."""
+        settings = Settings(github=GitHubSettings(token="ghp_secret"))
+        settings_dict = settings.to_dict()
+
+        assert "token" not in settings_dict["github"]
+        assert settings.github.token == "ghp_secret"
+
     def test_get_config_dir(self):
         """Test getting config directory."""
         config_dir = get_config_dir()
@@ -119,6 +211,11 @@ class TestSettings:
         assert cache_dir.is_dir()
         assert str(cache_dir).endswith("ganger")
 
+    def test_dirs_are_memoized(self):
+        """Repeated calls return the same resolved path object."""
+        assert get_config_dir() is get_config_dir()
+        assert get_cache_dir() is get_cache_dir()
+
 
 class TestIndividualSettings:
     """Test individual settings dataclasses."""
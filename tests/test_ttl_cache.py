@@ -0,0 +1,96 @@
+"""
+Tests for the TTL cache.
+
+Modified: 2025-11-07
+"""
+
+from ganger.utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Test TTLCache class."""
+
+    def test_get_within_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=4, ttl=5, timer=clock)
+
+        cache.set("a", 1)
+        clock.now = 4.9
+
+        assert cache.get("a") == 1
+
+    def test_entry_expires(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=4, ttl=5, timer=clock)
+
+        cache.set("a", 1)
+        clock.now = 5
+
+        assert cache.get("a") is None
+        assert cache.get("a", "missing") == "missing"
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_pop_and_clear(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert cache.pop("a") == 1
+        assert cache.pop("a") is None
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_weight_bound_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=10, ttl=60, maxweight=100)
+
+        cache.set("a", 1, weight=40)
+        cache.set("b", 2, weight=40)
+        cache.get("a")
+        cache.set("c", 3, weight=40)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.weight == 80
+
+    def test_overweight_entry_is_not_stored(self):
+        cache = TTLCache(maxsize=10, ttl=60, maxweight=100)
+
+        cache.set("a", 1, weight=10)
+        cache.set("a", 2, weight=101)
+
+        assert cache.get("a") is None
+        assert cache.weight == 0
+
+    def test_weight_released_on_expiry_and_pop(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=5, timer=clock, maxweight=100)
+        cache.set("a", 1, weight=30)
+        cache.set("b", 2, weight=30)
+
+        clock.now = 5
+        cache.get("a")
+        cache.pop("b")
+
+        assert cache.weight == 0
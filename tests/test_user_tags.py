@@ -28,7 +28,8 @@ from ganger.core.models import StarredRepo
 async def cache(tmp_path: Path) -> PersistentCache:
     db = PersistentCache(db_path=tmp_path / "tags.db")
     await db.initialize()
-    return db
+    yield db
+    await db.close()
 
 
 @pytest_asyncio.fixture
@@ -176,9 +177,37 @@ async def test_get_starred_repos_hydrates_user_tags(
     assert by_id["2"].user_tags == []
 
 
+@pytest.mark.asyncio
+async def test_get_starred_repos_can_skip_user_tags(
+    seeded_cache: PersistentCache,
+) -> None:
+    await seeded_cache.add_user_tag("1", "alpha")
+    repos = await seeded_cache.get_starred_repos(
+        force_refresh=True, include_user_tags=False
+    )
+    assert repos is not None
+    assert all(r.user_tags == [] for r in repos)
+
+
 @pytest.mark.asyncio
 async def test_get_repo_hydrates_user_tags(seeded_cache: PersistentCache) -> None:
     await seeded_cache.add_user_tag("1", "single")
     repo = await seeded_cache.get_repo("1")
     assert repo is not None
     assert repo.user_tags == ["single"]
+
+
+@pytest.mark.asyncio
+async def test_hydration_beyond_bound_parameter_limit(cache: PersistentCache) -> None:
+    """Hydration binds ids as one JSON array, not one parameter per repo."""
+    repos = [
+        StarredRepo(id=str(i), full_name=f"o/r{i}", name=f"r{i}", owner="o")
+        for i in range(33_000)
+    ]
+    await cache.set_starred_repos(repos)
+    await cache.add_user_tag("32999", "last")
+
+    loaded = await cache.get_starred_repos(force_refresh=True)
+
+    assert len(loaded) == 33_000
+    assert {r.id: r.user_tags for r in loaded}["32999"] == ["last"]
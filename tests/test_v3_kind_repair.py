@@ -68,6 +68,7 @@ async def test_repair_all_stars_to_system(tmp_path: Path) -> None:
 
     # Re-initialize to trigger repair
     await cache.initialize()
+    await cache.close()
     assert await _kind_of(db_path, "all-stars") == "system"
 
 
@@ -81,6 +82,7 @@ async def test_repair_auto_tags_only_to_rule(tmp_path: Path) -> None:
         db_path, "py-folder", "Python", auto_tags='["python"]'
     )
     await cache.initialize()  # repair runs
+    await cache.close()
     assert await _kind_of(db_path, "py-folder") == "rule"
 
 
@@ -114,6 +116,7 @@ async def test_repair_auto_tags_with_manual_link_to_hybrid(tmp_path: Path) -> No
         await db.commit()
 
     await cache.initialize()  # repair
+    await cache.close()
     assert await _kind_of(db_path, "ml") == "hybrid"
 
 
@@ -141,6 +144,7 @@ async def test_repair_does_not_touch_correct_rows(tmp_path: Path) -> None:
         await db.commit()
 
     await cache.initialize()
+    await cache.close()
     assert await _kind_of(db_path, "plain") == "curated"
     assert await _kind_of(db_path, "py") == "rule"
     assert await _kind_of(db_path, "hyb") == "hybrid"
@@ -162,6 +166,7 @@ async def test_repair_is_idempotent(tmp_path: Path) -> None:
         await _kind_of(db_path, "py"),
     )
     await cache.initialize()
+    await cache.close()
     after_second = (
         await _kind_of(db_path, "all-stars"),
         await _kind_of(db_path, "py"),
@@ -132,8 +132,10 @@ def assert_folder_equals(
     """
     ignore_fields = ignore_fields or []
 
-    dict1 = folder1.__dict__.copy()
-    dict2 = folder2.__dict__.copy()
+    # VirtualFolder is slotted (no __dict__); to_dict() also leaves out the
+    # auto-tag memo fields.
+    dict1 = folder1.to_dict()
+    dict2 = folder2.to_dict()
 
     # Remove ignored fields
     for field in ignore_fields:
@@ -248,6 +250,78 @@ class MockGraphQLResponse:
         }
 
 
+class MockStarredREST:
+    """Mock ``/user/starred`` endpoint (``star+json`` items, Link pagination)."""
+
+    @staticmethod
+    def create_item(full_name: str, id: int = 1, **repo_overrides) -> Dict[str, Any]:
+        """Create one ``star+json`` item: ``{"starred_at": ..., "repo": {...}}``."""
+        owner, name = full_name.split("/", 1)
+        repo = {
+            "id": id,
+            "full_name": full_name,
+            "name": name,
+            "owner": {"login": owner},
+            "description": "Test repository",
+            "stargazers_count": 1000,
+            "forks_count": 500,
+            "watchers_count": 750,
+            "language": "Python",
+            "topics": ["python", "test"],
+            "archived": False,
+            "private": False,
+            "fork": False,
+            "created_at": "2020-01-01T00:00:00Z",
+            "updated_at": "2023-01-01T00:00:00Z",
+            "pushed_at": "2023-01-01T00:00:00Z",
+            "html_url": f"https://github.com/{full_name}",
+            "clone_url": f"https://github.com/{full_name}.git",
+            "homepage": None,
+            "default_branch": "main",
+            "license": None,
+        }
+        repo.update(repo_overrides)
+        return {"starred_at": "2024-06-01T12:00:00Z", "repo": repo}
+
+    @staticmethod
+    def transport(items: List[Dict[str, Any]], status_code: int = 200, body: str = ""):
+        """Build an ``httpx.MockTransport`` serving ``items`` page by page.
+
+        Requested pages are recorded on the returned transport's
+        ``requested_pages`` list.
+        """
+        import httpx
+
+        requested_pages: List[int] = []
+
+        def handler(request):
+            page = int(request.url.params.get("page", "1"))
+            per_page = int(request.url.params.get("per_page", "30"))
+            requested_pages.append(page)
+            if status_code != 200:
+                return httpx.Response(status_code, text=body)
+
+            last = max(1, -(-len(items) // per_page))
+            headers = {}
+            if last > 1:
+                headers["Link"] = (
+                    f'<https://api.github.com/user/starred?per_page={per_page}&page={last}>; rel="last"'
+                )
+            start = (page - 1) * per_page
+            return httpx.Response(200, json=items[start:start + per_page], headers=headers)
+
+        transport = httpx.MockTransport(handler)
+        transport.requested_pages = requested_pages
+        return transport
+
+    @staticmethod
+    def install(client: Any, transport: Any) -> None:
+        """Point ``client``'s shared HTTP client at ``transport``."""
+        import httpx
+
+        client._http = httpx.Client(base_url="https://api.github.com", transport=transport)
+
+
 def create_batch_repos(count: int, prefix: str = "repo", **common_overrides) -> List[StarredRepo]:
     """Create a batch of test repos with sequential IDs.
 